@@ -0,0 +1,361 @@
+"""Micro-benchmarks for the model hot paths.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_models              # compare with the saved baseline
+    python -m benchmarks.bench_models --save       # record a new baseline
+    python -m benchmarks.bench_models --threshold 15 --only blackjack
+
+The command exits with status 1 when a benchmark is slower, or allocates more
+per operation, than the baseline by more than ``--threshold`` percent.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from model.blackjack import CARDS, BlackjackGame, hand_value
+from model.High_and_Low import HighLowGame
+
+BASELINE_PATH = Path(__file__).resolve().parent.parent / ".cache" / "benchmarks" / "baseline.json"
+DEFAULT_THRESHOLD = 20.0
+ALLOCATION_SAMPLES = 200
+
+# A benchmark body runs ``ops`` operations and returns the seconds spent in the
+# measured call only, so per-iteration setup does not count against it.
+Body = Callable[[int], float]
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    setup: Callable[[int], Body]
+    ops: int
+
+
+@dataclass(frozen=True)
+class Measurement:
+    name: str
+    ops_per_sec: float
+    peak_bytes_per_op: float
+
+
+# ----------------------------------------------------------------------
+# Benchmarks
+def _hand_value(scale: int) -> Body:
+    rng = random.Random(0)
+    hands = [rng.sample(CARDS, rng.randint(2, 6)) for _ in range(1000)]
+
+    def body(ops: int) -> float:
+        start = time.perf_counter()
+        for index in range(ops):
+            hand_value(hands[index % 1000])
+        return time.perf_counter() - start
+
+    return body
+
+
+def _blackjack_game(scale: int) -> BlackjackGame:
+    return BlackjackGame(initial_chips=10**12, rng=random.Random(0), decks=max(1, scale))
+
+
+def _start_round(scale: int) -> Body:
+    game = _blackjack_game(scale)
+    clock = time.perf_counter
+
+    def body(ops: int) -> float:
+        elapsed = 0.0
+        for _ in range(ops):
+            start = clock()
+            game.start_round(1)
+            elapsed += clock() - start
+            if game.is_player_turn:
+                game.stand()
+            game.next_round()
+        return elapsed
+
+    return body
+
+
+def _hit(scale: int) -> Body:
+    game = _blackjack_game(scale)
+    clock = time.perf_counter
+
+    def body(ops: int) -> float:
+        elapsed = 0.0
+        done = 0
+        while done < ops:
+            game.start_round(1)
+            while game.is_player_turn and done < ops:
+                start = clock()
+                game.hit()
+                elapsed += clock() - start
+                done += 1
+            if game.is_player_turn:
+                game.stand()
+            game.next_round()
+        return elapsed
+
+    return body
+
+
+def _stand(scale: int) -> Body:
+    game = _blackjack_game(scale)
+    clock = time.perf_counter
+
+    def body(ops: int) -> float:
+        elapsed = 0.0
+        done = 0
+        while done < ops:
+            game.start_round(1)
+            if game.is_player_turn:
+                start = clock()
+                game.stand()
+                elapsed += clock() - start
+                done += 1
+            game.next_round()
+        return elapsed
+
+    return body
+
+
+def _ensure_deck(scale: int) -> Body:
+    # Every call reshuffles: the worst case, paid once per shoe in play.
+    game = _blackjack_game(scale * 6)
+    clock = time.perf_counter
+
+    def body(ops: int) -> float:
+        elapsed = 0.0
+        for _ in range(ops):
+            game.reset_shoe()
+            start = clock()
+            game._ensure_deck()
+            elapsed += clock() - start
+        return elapsed
+
+    return body
+
+
+def _synthetic_payload(scale: int) -> Dict:
+    """A recording with ``scale * 10000`` rounds over a deck that never runs out."""
+
+    rng = random.Random(0)
+    rounds = scale * 10000
+    deck = [rank for rank in range(1, 14) for _ in range(rounds // 6 + 2)]
+    pool = list(deck)
+    rng.shuffle(pool)
+    payload_rounds = []
+    for number in range(1, rounds + 1):
+        base_card, result_card = pool.pop(), pool.pop()
+        payload_rounds.append({"round": number, "base_card": base_card, "result_card": result_card})
+    return {"initial_chips": 10**12, "deck": deck, "rounds": payload_rounds}
+
+
+def _synthetic_game(scale: int) -> HighLowGame:
+    payload = _synthetic_payload(scale)
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "synthetic.json"
+        path.write_text(json.dumps(payload), encoding="utf-8")
+        return HighLowGame.from_file(path)
+
+
+def _play_round(scale: int) -> Body:
+    game = _synthetic_game(scale)
+    clock = time.perf_counter
+
+    def body(ops: int) -> float:
+        elapsed = 0.0
+        for index in range(ops):
+            if game.is_finished:
+                game.reset()
+            start = clock()
+            game.play_round("High" if index % 2 else "Low", 1)
+            elapsed += clock() - start
+        return elapsed
+
+    return body
+
+
+def _remove_card(scale: int) -> Body:
+    game = _synthetic_game(scale)
+    cards = list(game.deck)
+    random.Random(0).shuffle(cards)
+    clock = time.perf_counter
+    position = 0
+
+    def body(ops: int) -> float:
+        nonlocal position
+        elapsed = 0.0
+        start = clock()
+        for _ in range(ops):
+            if position == len(cards):
+                elapsed += clock() - start
+                game.reset()
+                position = 0
+                start = clock()
+            game._remove_card(cards[position])
+            position += 1
+        return elapsed + clock() - start
+
+    return body
+
+
+def _from_file(scale: int) -> Body:
+    # Referenced from ``body`` so the file lives exactly as long as the benchmark.
+    directory = tempfile.TemporaryDirectory(prefix="bench-highlow-")
+    Path(directory.name, "synthetic.json").write_text(json.dumps(_synthetic_payload(scale)), encoding="utf-8")
+
+    def body(ops: int) -> float:
+        path = Path(directory.name, "synthetic.json")
+        start = time.perf_counter()
+        for _ in range(ops):
+            HighLowGame.from_file(path)
+        return time.perf_counter() - start
+
+    return body
+
+
+BENCHMARKS = (
+    Benchmark("blackjack.hand_value", _hand_value, ops=20000),
+    Benchmark("blackjack.start_round", _start_round, ops=5000),
+    Benchmark("blackjack.hit", _hit, ops=5000),
+    Benchmark("blackjack.stand", _stand, ops=5000),
+    Benchmark("blackjack.ensure_deck", _ensure_deck, ops=500),
+    Benchmark("highlow.play_round", _play_round, ops=5000),
+    Benchmark("highlow.remove_card", _remove_card, ops=20000),
+    Benchmark("highlow.from_file", _from_file, ops=3),
+)
+
+
+# ----------------------------------------------------------------------
+def measure(benchmark: Benchmark, scale: int = 1, repeat: int = 5) -> Measurement:
+    """Best ops/sec over ``repeat`` runs, plus the memory one operation allocates.
+
+    Allocations are the traced peak during a single operation, averaged over
+    up to ``ALLOCATION_SAMPLES`` operations, so transient objects count too.
+    """
+
+    body = benchmark.setup(scale)
+    body(max(1, benchmark.ops // 10))
+    # Like timeit, keep garbage collection pauses out of the timings.
+    gc.collect()
+    gc.disable()
+    try:
+        best = min(body(benchmark.ops) for _ in range(repeat))
+    finally:
+        gc.enable()
+
+    samples = min(benchmark.ops, ALLOCATION_SAMPLES)
+    allocated = 0
+    tracemalloc.start()
+    try:
+        for _ in range(samples):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            body(1)
+            _, peak = tracemalloc.get_traced_memory()
+            allocated += peak - before
+    finally:
+        tracemalloc.stop()
+
+    return Measurement(
+        name=benchmark.name,
+        ops_per_sec=benchmark.ops / best if best > 0 else float("inf"),
+        peak_bytes_per_op=allocated / samples,
+    )
+
+
+def compare(
+    results: List[Measurement], baseline: Dict[str, Dict[str, float]], threshold: float
+) -> List[str]:
+    """Regressions of ``results`` against ``baseline`` beyond ``threshold`` percent."""
+
+    regressions = []
+    for result in results:
+        previous = baseline.get(result.name)
+        if previous is None:
+            continue
+        slowest = previous["ops_per_sec"] * (1 - threshold / 100)
+        if result.ops_per_sec < slowest:
+            regressions.append(
+                f"{result.name}: {result.ops_per_sec:,.0f} ops/s, "
+                f"baseline {previous['ops_per_sec']:,.0f} ops/s"
+            )
+        # One extra byte per operation keeps tiny allocation counts from flapping.
+        largest = previous["peak_bytes_per_op"] * (1 + threshold / 100) + 1
+        if result.peak_bytes_per_op > largest:
+            regressions.append(
+                f"{result.name}: {result.peak_bytes_per_op:,.1f} B/op peak, "
+                f"baseline {previous['peak_bytes_per_op']:,.1f} B/op"
+            )
+    return regressions
+
+
+def load_baseline(path: Path) -> Dict[str, Dict[str, float]]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))["results"]
+
+
+def save_baseline(path: Path, results: List[Measurement], scale: int) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "scale": scale,
+        "results": {result.name: asdict(result) for result in results},
+    }
+    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed regression in percent (default: %(default)s)",
+    )
+    parser.add_argument("--scale", type=int, default=1, help="multiplier for the synthetic input sizes")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", default="", help="run benchmarks whose name contains this text")
+    args = parser.parse_args(argv)
+
+    results = []
+    for benchmark in BENCHMARKS:
+        if args.only not in benchmark.name:
+            continue
+        result = measure(benchmark, scale=args.scale, repeat=args.repeat)
+        results.append(result)
+        print(f"{result.name:<24} {result.ops_per_sec:>14,.0f} ops/s {result.peak_bytes_per_op:>12,.1f} B/op peak")
+
+    if args.save:
+        save_baseline(args.baseline, results, args.scale)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if not baseline:
+        print(f"No baseline at {args.baseline}; run with --save to record one.")
+        return 0
+    regressions = compare(results, baseline, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
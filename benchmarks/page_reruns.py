@@ -0,0 +1,241 @@
+"""Per-click server time and payload of the Streamlit pages.
+
+Run from the repository root::
+
+    python -m benchmarks.page_reruns                       # both game pages
+    python -m benchmarks.page_reruns --page pages/Blackjack.py --rounds 50
+
+Each page is served by a real ``streamlit run`` process and driven over its
+websocket the way the browser does: every click sends a rerun request, with
+the fragment id when the button sits in a fragment, and the time until the
+server reports the run finished is the per-click server time. The payload is
+the size of every message the run sent back. The browser's message cache is
+not emulated, so the payload is what an empty cache would receive.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from websockets.sync.client import ClientConnection, connect
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+ROOT = Path(__file__).resolve().parent.parent
+PAGES = ("pages/Blackjack.py", "pages/High_and_Low.py")
+FINISHED = {
+    ForwardMsg.FINISHED_SUCCESSFULLY: "app",
+    ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY: "fragment",
+}
+
+
+@dataclass(frozen=True)
+class Button:
+    widget_id: str
+    label: str
+    fragment_id: str
+
+
+@dataclass(frozen=True)
+class Click:
+    label: str
+    scope: str
+    seconds: float
+    payload: int
+
+
+class PageClient:
+    """One browser session: tracks the rendered buttons and clicks them."""
+
+    def __init__(self, websocket: ClientConnection) -> None:
+        self._socket = websocket
+        # Buttons by delta path, as the frontend would keep them on screen.
+        self._buttons: Dict[Tuple[int, ...], Button] = {}
+        self._radios: Dict[str, str] = {}
+        # Chosen radio options, sent with every rerun like the frontend does.
+        self._choices: Dict[str, str] = {}
+        self.clicks: List[Click] = []
+
+    def load(self) -> None:
+        self._run(BackMsg(), "load")
+
+    def labels(self) -> List[str]:
+        return [button.label for button in self._buttons.values()]
+
+    def choose(self, label: str, option: str) -> None:
+        """Select ``option`` of the radio ``label``; sent with the next click."""
+
+        self._choices[self._radios[label]] = option
+
+    def click(self, label: str) -> None:
+        button = next(button for button in self._buttons.values() if button.label == label)
+        message = BackMsg()
+        for widget_id, option in self._choices.items():
+            state = message.rerun_script.widget_states.widgets.add()
+            state.id = widget_id
+            state.string_value = option
+        state = message.rerun_script.widget_states.widgets.add()
+        state.id = button.widget_id
+        state.trigger_value = True
+        message.rerun_script.fragment_id = button.fragment_id
+        self._run(message, label)
+
+    def _run(self, message: BackMsg, label: str) -> None:
+        if not message.HasField("rerun_script"):
+            message.rerun_script.query_string = ""
+        started = time.perf_counter()
+        self._socket.send(message.SerializeToString())
+        payload = 0
+        received: Dict[Tuple[int, ...], Button] = {}
+        fragments = set()
+        while True:
+            data = self._socket.recv()
+            payload += len(data)
+            reply = ForwardMsg()
+            reply.ParseFromString(data)
+            kind = reply.WhichOneof("type")
+            if kind == "delta":
+                path = tuple(reply.metadata.delta_path)
+                fragments.add(reply.delta.fragment_id)
+                element = reply.delta.new_element
+                if reply.delta.WhichOneof("type") != "new_element":
+                    continue
+                if element.WhichOneof("type") == "button":
+                    received[path] = Button(element.button.id, element.button.label, reply.delta.fragment_id)
+                elif element.WhichOneof("type") == "radio":
+                    self._radios[element.radio.label] = element.radio.id
+            elif kind == "script_finished" and reply.script_finished in FINISHED:
+                break
+        seconds = time.perf_counter() - started
+
+        scope = FINISHED[reply.script_finished]
+        if scope == "app":
+            self._buttons = received
+        else:
+            self._buttons = {
+                path: button for path, button in self._buttons.items() if button.fragment_id not in fragments
+            }
+            self._buttons.update(received)
+        self.clicks.append(Click(label, scope, seconds, payload))
+
+
+def play_blackjack(client: PageClient, rounds: int) -> None:
+    for _ in range(rounds):
+        if "カードを配る" not in client.labels():
+            client.click("ゲームをリセット")
+        client.click("カードを配る")
+        if "ヒット" in client.labels():
+            client.click("ヒット")
+        if "スタンド" in client.labels():
+            client.click("スタンド")
+        client.click("次のラウンドへ")
+
+
+def play_highlow(client: PageClient, rounds: int) -> None:
+    # The three-round sample game would mostly measure its end screen.
+    client.choose("ゲームの種類", "ランダム生成")
+    for _ in range(rounds):
+        labels = client.labels()
+        if "Start" in labels:
+            client.click("Start")
+        elif "結果を見る" in labels:
+            client.click("結果を見る")
+        else:
+            client.click("リセット")
+
+
+def measure_page(page: str, rounds: int) -> List[Click]:
+    port = _free_port()
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "streamlit",
+            "run",
+            page,
+            "--server.headless",
+            "true",
+            "--server.port",
+            str(port),
+            "--browser.gatherUsageStats",
+            "false",
+        ],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_until_healthy(port)
+        with connect(f"ws://127.0.0.1:{port}/_stcore/stream", max_size=None) as websocket:
+            client = PageClient(websocket)
+            client.load()
+            if "Blackjack" in page:
+                play_blackjack(client, rounds)
+            else:
+                play_highlow(client, rounds)
+    finally:
+        process.terminate()
+        process.wait()
+    return client.clicks[1:]
+
+
+def report(page: str, clicks: List[Click]) -> None:
+    print(page)
+    groups: Dict[Tuple[str, str], List[Click]] = defaultdict(list)
+    for click in clicks:
+        groups[click.label, click.scope].append(click)
+    print(f"  {'click':<16}{'scope':<10}{'count':>6}{'median ms':>12}{'mean KiB':>11}")
+    for (label, scope), group in groups.items():
+        median = statistics.median(click.seconds for click in group) * 1000
+        payload = statistics.mean(click.payload for click in group) / 1024
+        print(f"  {label:<16}{scope:<10}{len(group):>6}{median:>12.1f}{payload:>11.1f}")
+    median = statistics.median(click.seconds for click in clicks) * 1000
+    payload = statistics.mean(click.payload for click in clicks) / 1024
+    print(f"  {'all clicks':<26}{len(clicks):>6}{median:>12.1f}{payload:>11.1f}")
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _wait_until_healthy(port: int, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("The Streamlit server did not start")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page", action="append", help="page script, repeatable (default: both games)")
+    parser.add_argument("--rounds", type=int, default=30)
+    args = parser.parse_args(argv)
+
+    for page in args.page or PAGES:
+        report(page, measure_page(page, args.rounds))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""Bot load generator for ``model.table_server``.
+
+Run from the repository root::
+
+    python -m benchmarks.table_load --tables 200 --seconds 10
+    python -m benchmarks.table_load --game highlow --connect 127.0.0.1:8765
+
+Without ``--connect`` a server is started in a separate process on a free
+port, so bots and server do not share an event loop. Each table is played
+by one bot over its own connection; the report gives client-side
+throughput and round-trip latency, plus the server's batching statistics.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from model.table_server import percentile
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class Bot:
+    """One table, one connection, one command in flight at a time."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._reader = reader
+        self._writer = writer
+        self.latencies = array("d")
+
+    async def send(self, command: str) -> Dict:
+        started = time.perf_counter()
+        self._writer.write(f"{command}\n".encode("utf-8"))
+        line = await self._reader.readline()
+        self.latencies.append(time.perf_counter() - started)
+        status, _, payload = line.decode("utf-8").rstrip("\n").partition(" ")
+        if status != "OK":
+            raise RuntimeError(payload)
+        return json.loads(payload)
+
+    async def play_blackjack(self, table: int, deadline: float) -> None:
+        while time.perf_counter() < deadline:
+            state = await self.send(f"{table} BET 1")
+            while state["state"] == "PLAYER_TURN":
+                action = "HIT" if state["player_total"] < 17 else "STAND"
+                state = await self.send(f"{table} {action}")
+            state = await self.send(f"{table} NEXT")
+            if state["chips"] <= 0:
+                await self.send(f"{table} RESET")
+
+    async def play_highlow(self, table: int, deadline: float) -> None:
+        choice = "High"
+        while time.perf_counter() < deadline:
+            state = await self.send(f"{table} PLAY {choice} 1")
+            choice = "Low" if choice == "High" else "High"
+            if state["finished"] or state["chips"] <= 0:
+                await self.send(f"{table} RESET")
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+async def run_bots(host: str, port: int, tables: int, seconds: float, game: str) -> Tuple[List[Bot], float]:
+    """Play ``tables`` tables for ``seconds``; returns the bots and the elapsed time."""
+
+    bots = []
+    table_ids = []
+    for index in range(tables):
+        reader, writer = await asyncio.open_connection(host, port)
+        bot = Bot(reader, writer)
+        table_ids.append((await bot.send(f"OPEN {game} {index}"))["table"])
+        bots.append(bot)
+    for bot in bots:
+        bot.latencies = array("d")
+
+    started = time.perf_counter()
+    deadline = started + seconds
+    play = [
+        bot.play_blackjack(table, deadline) if game == "blackjack" else bot.play_highlow(table, deadline)
+        for bot, table in zip(bots, table_ids)
+    ]
+    await asyncio.gather(*play)
+    elapsed = time.perf_counter() - started
+    for bot in bots:
+        bot.close()
+    return bots, elapsed
+
+
+async def server_stats(host: str, port: int) -> Dict:
+    reader, writer = await asyncio.open_connection(host, port)
+    bot = Bot(reader, writer)
+    stats = await bot.send("STATS")
+    bot.close()
+    return stats
+
+
+def spawn_server() -> Tuple[subprocess.Popen, int]:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "model.table_server", "--port", "0"],
+        cwd=ROOT,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    assert process.stdout is not None
+    line = process.stdout.readline()
+    if not line.startswith("LISTENING "):
+        process.kill()
+        raise RuntimeError("The table server did not start")
+    return process, int(line.split()[1])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tables", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--game", choices=("blackjack", "highlow"), default="blackjack")
+    parser.add_argument("--connect", help="HOST:PORT of a running server")
+    args = parser.parse_args(argv)
+
+    process = None
+    if args.connect:
+        host, _, port_text = args.connect.rpartition(":")
+        port = int(port_text)
+    else:
+        process, port = spawn_server()
+        host = "127.0.0.1"
+
+    try:
+        bots, elapsed = asyncio.run(run_bots(host, port, args.tables, args.seconds, args.game))
+        stats = asyncio.run(server_stats(host, port))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    latencies = sorted(value for bot in bots for value in bot.latencies)
+    print(f"{args.tables} {args.game} tables for {elapsed:.1f} s")
+    print(f"  actions        {len(latencies):>12,}")
+    print(f"  throughput     {len(latencies) / elapsed:>12,.0f} actions/s")
+    print(f"  round trip p50 {percentile(latencies, 50) * 1000:>12.2f} ms")
+    print(f"  round trip p99 {percentile(latencies, 99) * 1000:>12.2f} ms")
+    print(f"  server p50     {stats['p50_ms']:>12.2f} ms (queued to executed)")
+    print(f"  server p99     {stats['p99_ms']:>12.2f} ms")
+    print(f"  mean batch     {stats['mean_batch']:>12.1f} actions (largest {stats['largest_batch']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""MkDocs hook serving resized WebP/PNG variants instead of the full-size images.
+
+Registered in ``mkdocs.yml``. Before each build the PNGs in ``docs/assets`` are
+resized into ``docs/assets/generated`` (unchanged ones are skipped), and every
+``<img src="assets/....png" width="N">`` in the Markdown becomes a ``<picture>``
+with 1x/2x WebP sources and a PNG fallback. Without Pillow the pages are left
+untouched.
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+from pathlib import Path
+from typing import Dict
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from model import assets  # noqa: E402
+
+GENERATED = "generated"
+
+_IMAGE = re.compile(
+    r'<img src="(?P<prefix>(?:\.\./)*assets/)(?P<name>[^"/]+\.png)"(?P<attributes>[^>]*?)\s*/?>'
+)
+_WIDTH = re.compile(r'width="(\d+)"')
+
+_manifest: Dict[str, Dict[str, Dict[str, str]]] = {}
+
+
+def on_pre_build(config, **kwargs) -> None:
+    global _manifest
+    if assets.Image is None:
+        _manifest = {}
+        return
+    source_dir = Path(config["docs_dir"]) / "assets"
+    output_dir = source_dir / GENERATED
+    _manifest = assets.build(sorted(source_dir.glob("*.png")), output_dir)
+    assets.clean(output_dir)
+
+
+def on_page_markdown(markdown: str, **kwargs) -> str:
+    if not _manifest:
+        return markdown
+    return _IMAGE.sub(_picture, markdown)
+
+
+def _picture(match: re.Match) -> str:
+    entry = _manifest.get(match["name"])
+    width = _WIDTH.search(match["attributes"])
+    if entry is None or width is None:
+        return match[0]
+
+    display = int(width[1])
+    base = f"{match['prefix']}{GENERATED}/"
+    single = entry[str(assets.pick_width(display))]
+    double = entry[str(assets.pick_width(display * 2))]
+    return (
+        "<picture>"
+        f'<source type="image/webp" srcset="{base}{single["webp"]} 1x, {base}{double["webp"]} 2x" />'
+        f'<img src="{base}{double["png"]}"{match["attributes"]} loading="lazy" />'
+        "</picture>"
+    )
@@ -1,9 +1,27 @@
 from __future__ import annotations
 
 import json
+import random
+import threading
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Sequence
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from model import instrumentation
+from model.history_store import HistoryStore
+from model.snapshot import SnapshotReader, SnapshotWriter, pack_int_array, unpack_int_array
+
+OUTCOMES = ("win", "lose", "draw")
+OUTCOME_RESULTS = {"win": 1, "lose": -1, "draw": 0}
+CHOICES = ("High", "Low")
+# Four suits of the values 1 (ace) to 13 (king), the deck of generated games.
+STANDARD_DECK = tuple(range(1, 14)) * 4
+# Snapshot kind tag; bumped when the snapshot layout changes so that old
+# snapshots are rejected instead of misread.
+SNAPSHOT_KIND = b"highlow2"
 
 
 @dataclass(frozen=True)
@@ -13,38 +31,201 @@ class RecordedRound:
     round: int
     base_card: int
     result_card: int
-    remaining_deck: List[int]
+    remaining_deck: Tuple[int, ...]
 
     @classmethod
     def from_payload(cls, payload: Dict) -> "RecordedRound":
+        if not isinstance(payload, dict):
+            raise ValueError("Round definition must be an object")
+        for key in ("round", "base_card", "result_card"):
+            if not isinstance(payload.get(key), int):
+                raise ValueError(f"Round definition needs an integer '{key}'")
         return cls(
             round=payload["round"],
             base_card=payload["base_card"],
             result_card=payload["result_card"],
-            remaining_deck=payload.get("remaining_deck", []),
+            remaining_deck=tuple(payload.get("remaining_deck", ())),
         )
 
 
+@dataclass(frozen=True)
+class HighLowOdds:
+    """Chances that the next card is higher than, lower than or equal to the base card."""
+
+    high: float
+    low: float
+    draw: float
+
+    @property
+    def recommended_choice(self) -> str:
+        return "High" if self.high >= self.low else "Low"
+
+    @property
+    def kelly_fraction(self) -> float:
+        """Share of the chips to bet on the recommended choice; draws return the bet."""
+
+        win = max(self.high, self.low)
+        lose = min(self.high, self.low)
+        if win + lose == 0:
+            return 0.0
+        return (win - lose) / (win + lose)
+
+    def kelly_bet(self, chips: int) -> int:
+        return int(chips * self.kelly_fraction)
+
+
+class JsonlRounds:
+    """Rounds of a JSON Lines recording, read lazily from disk.
+
+    The first line of the file is the header; every following line holds one
+    round. Each iteration reopens the file, so only the round being played is
+    kept in memory and a game can be replayed from the start.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+
+    def __iter__(self) -> Iterator[RecordedRound]:
+        with self.path.open(encoding="utf-8") as stream:
+            next(stream, None)
+            for line_number, line in enumerate(stream, start=2):
+                if not line.strip():
+                    continue
+                try:
+                    yield RecordedRound.from_payload(json.loads(line))
+                except ValueError as exc:
+                    raise ValueError(f"{self.path}, line {line_number}: {exc}") from exc
+
+
+class DeckSnapshot(Sequence):
+    """Remaining deck at one point of a game, expanded to a list only on demand.
+
+    A snapshot shares the game's append-only log of removed cards and just
+    remembers how much of it had been written, so taking one is O(1).
+    """
+
+    __slots__ = ("_initial_deck", "_removed", "_removed_count")
+
+    def __init__(self, initial_deck: Tuple[int, ...], removed: List[int], removed_count: int) -> None:
+        self._initial_deck = initial_deck
+        self._removed = removed
+        self._removed_count = removed_count
+
+    def to_list(self) -> List[int]:
+        pending = Counter(self._removed[: self._removed_count])
+        cards: List[int] = []
+        for card in self._initial_deck:
+            if pending[card] > 0:
+                pending[card] -= 1
+            else:
+                cards.append(card)
+        return cards
+
+    def __len__(self) -> int:
+        return len(self._initial_deck) - self._removed_count
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.to_list())
+
+    def __getitem__(self, index):
+        return self.to_list()[index]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (DeckSnapshot, list, tuple)):
+            return self.to_list() == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(self.to_list())
+
+
+class GeneratedRounds:
+    """Rounds dealt from a seeded RNG over ``deck``, produced one at a time.
+
+    Base and result cards are drawn without replacement, so the rounds stay
+    consistent with the game's deck, and the same seed always deals the same
+    rounds. Only per-value counts are kept, never a list of rounds.
+    """
+
+    def __init__(self, deck: Sequence[int], seed: int, rounds: Optional[int] = None) -> None:
+        counts = Counter(deck)
+        self.seed = seed
+        self._values = tuple(sorted(counts))
+        self._counts = tuple(counts[value] for value in self._values)
+        available = len(deck) // 2
+        if rounds is None:
+            rounds = available
+        if not 0 < rounds <= available:
+            raise ValueError(f"A deck of {len(deck)} cards allows 1 to {available} rounds")
+        self.total_rounds = rounds
+
+    def __iter__(self) -> Iterator[RecordedRound]:
+        rng = random.Random(self.seed)
+        counts = list(self._counts)
+        remaining = sum(counts)
+        for number in range(1, self.total_rounds + 1):
+            base_card = self._draw(rng, counts, remaining)
+            result_card = self._draw(rng, counts, remaining - 1)
+            remaining -= 2
+            yield RecordedRound(round=number, base_card=base_card, result_card=result_card, remaining_deck=())
+
+    def _draw(self, rng: random.Random, counts: List[int], remaining: int) -> int:
+        position = rng.randrange(remaining)
+        for index, count in enumerate(counts):
+            if position < count:
+                counts[index] -= 1
+                return self._values[index]
+            position -= count
+        raise AssertionError("counts do not add up to the remaining cards")
+
+
 class HighLowGame:
     """High and Low game that replays rounds defined in sample data."""
 
-    def __init__(self, initial_chips: int, rounds: List[RecordedRound], deck: List[int]):
-        if not rounds:
-            raise ValueError("At least one round definition is required")
+    def __init__(
+        self,
+        initial_chips: int,
+        rounds: Iterable[RecordedRound],
+        deck: List[int],
+        history_limit: int = 1000,
+        total_rounds: Optional[int] = None,
+    ):
+        """``rounds`` is iterated lazily and again from the start on every reset.
+
+        ``total_rounds`` defaults to ``len(rounds)`` when the rounds support it.
+        """
 
         self.initial_chips = initial_chips
         self._rounds = rounds
-        self._initial_deck = list(deck)
+        if total_rounds is None and isinstance(rounds, Sequence):
+            total_rounds = len(rounds)
+        self._total_rounds = total_rounds
+        self._initial_deck = tuple(deck)
         if not self._initial_deck:
             raise ValueError("Deck must contain at least one card")
-
+        self._rank_values = tuple(sorted(set(self._initial_deck)))
+        self._rank_index = {value: index for index, value in enumerate(self._rank_values)}
+
+        self.history_store = HistoryStore(
+            OUTCOMES,
+            OUTCOME_RESULTS,
+            columns=("round", "base_card", "result_card", "player_choice"),
+            capacity=history_limit,
+        )
+        # Called with (outcome, bet, net, chips_after) after every round; see
+        # ``ResultsStore.recorder``.
+        self.on_round: Optional[Callable[[str, int, int, int], None]] = None
         self.reset()
+        if self._current_round is None:
+            raise ValueError("At least one round definition is required")
 
     # ------------------------------------------------------------------
     # Public properties
     @property
-    def total_rounds(self) -> int:
-        return len(self._rounds)
+    def total_rounds(self) -> Optional[int]:
+        """Number of rounds in the game, or ``None`` if the source does not say."""
+
+        return self._total_rounds
 
     @property
     def round_number(self) -> int:
@@ -52,21 +233,79 @@ class HighLowGame:
 
     @property
     def is_finished(self) -> bool:
-        return self._current_index >= len(self._rounds)
+        return self._current_round is None
 
     @property
     def current_round(self) -> Optional[RecordedRound]:
-        if self.is_finished:
-            return None
-        return self._rounds[self._current_index]
+        return self._current_round
 
     @property
     def deck(self) -> List[int]:
-        return list(self._deck)
+        return self.deck_snapshot().to_list()
+
+    @property
+    def deck_size(self) -> int:
+        return len(self._initial_deck) - len(self._removed)
+
+    def card_count(self, card: int) -> int:
+        return self._deck_counts[card]
+
+    def odds(self, base_card: Optional[int] = None) -> HighLowOdds:
+        """Chances for the next card against ``base_card``, in O(1).
+
+        Defaults to the current round's base card, which should already be
+        exposed so that it is no longer counted in the deck.
+        """
+
+        if base_card is None:
+            round_def = self.current_round
+            if round_def is None:
+                raise RuntimeError("No round is available")
+            base_card = round_def.base_card
+
+        below = self._cards_below
+        total = below[-1]
+        if total == 0:
+            raise RuntimeError("The deck is empty")
+        index = self._rank_index.get(base_card)
+        if index is None:
+            lower = below[bisect_left(self._rank_values, base_card)]
+            equal = 0
+        else:
+            lower = below[index]
+            equal = below[index + 1] - lower
+        higher = total - lower - equal
+        return HighLowOdds(high=higher / total, low=lower / total, draw=equal / total)
+
+    def deck_snapshot(self) -> DeckSnapshot:
+        return DeckSnapshot(self._initial_deck, self._removed, len(self._removed))
 
     @property
     def history(self) -> List[Dict]:
-        return list(self._history)
+        """The most recent rounds (up to ``history_limit``), oldest first.
+
+        ``remaining_deck`` is a ``DeckSnapshot``; expanding it costs O(deck),
+        so only do so for the rows actually shown.
+        """
+
+        return [self.history_entry(row) for row in self.history_store.rows()]
+
+    def history_entry(self, row: Dict) -> Dict:
+        """Result dict, as returned by ``play_round``, of a ``history_store`` row."""
+
+        return {
+            "round": row["round"],
+            "base_card": row["base_card"],
+            "result_card": row["result_card"],
+            "player_choice": CHOICES[row["player_choice"]],
+            "bet": row["bet"],
+            "outcome": row["outcome"],
+            "delta": row["delta"],
+            "chips_before": row["chips_after"] - row["delta"],
+            "chips_after": row["chips_after"],
+            # Every played round removed exactly two cards: its base and result cards.
+            "remaining_deck": DeckSnapshot(self._initial_deck, self._removed, 2 * row["number"]),
+        }
 
     # ------------------------------------------------------------------
     def expose_base_card(self) -> int:
@@ -90,15 +329,20 @@ class HighLowGame:
         if bet > self.chips:
             raise ValueError("Bet cannot exceed the current number of chips")
 
+        normalized_choice = player_choice.capitalize()
+        if normalized_choice not in {"High", "Low"}:
+            raise ValueError("player_choice must be either 'High' or 'Low'")
+
         round_def = self.current_round
         assert round_def is not None
 
         base_card = self.expose_base_card()
         result_card = round_def.result_card
-
-        normalized_choice = player_choice.capitalize()
-        if normalized_choice not in {"High", "Low"}:
-            raise ValueError("player_choice must be either 'High' or 'Low'")
+        if self._deck_counts[result_card] <= 0:
+            raise ValueError(f"Card {result_card} is not available in the deck")
+        # Read the next round before changing anything, so a malformed
+        # definition leaves this round unplayed instead of half-applied.
+        next_round = self._peek_next_round()
 
         if result_card == base_card:
             outcome = "draw"
@@ -126,47 +370,289 @@ class HighLowGame:
             "delta": delta,
             "chips_before": chips_before,
             "chips_after": self.chips,
-            "remaining_deck": self.deck,
+            "remaining_deck": self.deck_snapshot(),
         }
 
-        self._history.append(result)
+        self.history_store.append(
+            outcome,
+            bet,
+            delta,
+            self.chips,
+            round=round_def.round,
+            base_card=base_card,
+            result_card=result_card,
+            player_choice=CHOICES.index(normalized_choice),
+        )
         self._current_index += 1
+        self._current_round = next_round
+        self._upcoming = None
         self._base_drawn = False
+        if self.on_round is not None:
+            self.on_round(outcome, bet, delta, self.chips)
         return result
 
     def reset(self) -> None:
         self.chips = self.initial_chips
-        self._deck = list(self._initial_deck)
+        self._deck_counts = Counter(self._initial_deck)
+        # _cards_below[i] counts the cards left whose value ranks below _rank_values[i].
+        self._cards_below = [0]
+        for value in self._rank_values:
+            self._cards_below.append(self._cards_below[-1] + self._deck_counts[value])
+        # A fresh list so that snapshots taken before the reset stay valid.
+        self._removed: List[int] = []
         self._current_index = 0
-        self._history: List[Dict] = []
+        self.history_store.clear(self.chips)
         self._base_drawn = False
+        self._round_iterator = iter(self._rounds)
+        # (round after the current one, error reading it), once read.
+        self._upcoming: Optional[Tuple[Optional[RecordedRound], Optional[ValueError]]] = None
+        self._current_round = self._next_round(0)
+
+    def snapshot(self) -> bytes:
+        """Compact binary encoding of the play state.
+
+        The round definitions are not included; restore into a game built from
+        the same definition.
+        """
+
+        writer = SnapshotWriter(SNAPSHOT_KIND)
+        writer.write_int(self.initial_chips)
+        writer.write_int(self.chips)
+        writer.write_int(self._current_index)
+        writer.write_int(int(self._base_drawn))
+        # Removed cards as 16-bit indices into the deck's distinct values.
+        rank_index = self._rank_index
+        writer.write_blob(pack_int_array((rank_index[card] for card in self._removed), "H"))
+        writer.write_int(self.history_store.capacity)
+        writer.write_blob(self.history_store.snapshot())
+        return writer.getvalue()
+
+    def restore(self, data: bytes) -> None:
+        reader = SnapshotReader(data, SNAPSHOT_KIND)
+        if reader.read_int() != self.initial_chips:
+            raise ValueError("Snapshot belongs to a different game")
+        chips = reader.read_int()
+        current_index = reader.read_int()
+        base_drawn = bool(reader.read_int())
+        indices = unpack_int_array(reader.read_blob(), "H")
+        if any(index >= len(self._rank_values) for index in indices):
+            raise ValueError("Snapshot belongs to a different game")
+        removed = [self._rank_values[index] for index in indices]
+
+        self.reset()
+        for card in removed:
+            self._remove_card(card)
+        for index in range(current_index):
+            self._current_index = index + 1
+            self._current_round = self._next_round(index + 1)
+        self.chips = chips
+        self._base_drawn = base_drawn
+
+        capacity = reader.read_int()
+        if capacity != self.history_store.capacity:
+            self.history_store = HistoryStore(
+                OUTCOMES,
+                OUTCOME_RESULTS,
+                columns=self.history_store.columns[len(HistoryStore.BASE_COLUMNS) :],
+                capacity=capacity,
+            )
+        self.history_store.restore(reader.read_blob())
 
     # ------------------------------------------------------------------
+    def _next_round(self, index: int) -> Optional[RecordedRound]:
+        """Read round ``index`` (0-based) from the iterator, or ``None`` at the end."""
+
+        round_def = next(self._round_iterator, None)
+        expected = self._total_rounds
+        if round_def is None:
+            if expected is not None and index < expected:
+                raise ValueError(f"Expected {expected} rounds but the data ended after {index}")
+            return None
+        if not isinstance(round_def, RecordedRound):
+            raise ValueError("Rounds must be RecordedRound instances")
+        if expected is not None and index >= expected:
+            raise ValueError(f"The data holds more than the expected {expected} rounds")
+        return round_def
+
+    def _peek_next_round(self) -> Optional[RecordedRound]:
+        """The round after the current one, read once; a read error is kept and raised again."""
+
+        if self._upcoming is None:
+            try:
+                self._upcoming = (self._next_round(self._current_index + 1), None)
+            except ValueError as exc:
+                self._upcoming = (None, exc)
+        round_def, error = self._upcoming
+        if error is not None:
+            raise ValueError(str(error)) from error
+        return round_def
+
     def _remove_card(self, card: int) -> None:
-        try:
-            self._deck.remove(card)
-        except ValueError as exc:
-            raise ValueError(f"Card {card} is not available in the deck") from exc
+        if self._deck_counts[card] <= 0:
+            raise ValueError(f"Card {card} is not available in the deck")
+        self._deck_counts[card] -= 1
+        self._removed.append(card)
+        below = self._cards_below
+        for index in range(self._rank_index[card] + 1, len(below)):
+            below[index] -= 1
 
     # ------------------------------------------------------------------
+    @classmethod
+    def from_definition(cls, definition: GameDefinition, history_limit: int = 1000) -> "HighLowGame":
+        """New game over a shared definition; only the play state is per game."""
+
+        return cls(
+            initial_chips=definition.initial_chips,
+            rounds=definition.rounds,
+            deck=definition.deck,
+            history_limit=history_limit,
+            total_rounds=definition.total_rounds,
+        )
+
     @classmethod
     def from_file(cls, path: Path | str) -> "HighLowGame":
-        payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls.from_definition(read_definition(path))
+
+    @classmethod
+    def generated(
+        cls,
+        seed: int,
+        initial_chips: int = 100,
+        decks: int = 1,
+        rounds: Optional[int] = None,
+        history_limit: int = 1000,
+    ) -> "HighLowGame":
+        """New game dealt lazily from ``decks`` standard decks by a seeded RNG.
+
+        Without ``rounds`` the game lasts until the decks run out, so a long
+        game only needs more decks, not more memory per round.
+        """
+
+        if decks <= 0:
+            raise ValueError("decks must be a positive integer")
+        deck = STANDARD_DECK * decks
+        generated_rounds = GeneratedRounds(deck, seed, rounds)
+        return cls(
+            initial_chips=initial_chips,
+            rounds=generated_rounds,
+            deck=list(deck),
+            history_limit=history_limit,
+            total_rounds=generated_rounds.total_rounds,
+        )
+
+    @classmethod
+    def from_jsonl(cls, path: Path | str) -> "HighLowGame":
+        """Open a JSON Lines recording without reading its rounds up front."""
+
+        return cls.from_definition(read_jsonl_definition(path))
+
+
+instrumentation.instrument(HighLowGame, "play_round", "highlow.play_round")
+instrumentation.instrument(HighLowGame, "expose_base_card", "highlow.expose_base_card")
+instrumentation.instrument(HighLowGame, "_remove_card", "highlow.remove_card")
+instrumentation.instrument(HighLowGame, "_next_round", "highlow.next_round")
+instrumentation.instrument(HighLowGame, "deck_snapshot", "highlow.deck_snapshot")
+instrumentation.instrument(HighLowGame, "history", "highlow.history")
+
+
+@dataclass(frozen=True)
+class GameDefinition:
+    """Immutable content of a recorded game, safe to share between sessions."""
+
+    initial_chips: int
+    rounds: Iterable[RecordedRound]
+    deck: Tuple[int, ...]
+    total_rounds: Optional[int] = None
+
+
+def read_definition(path: Path | str) -> GameDefinition:
+    if Path(path).suffix == ".jsonl":
+        return read_jsonl_definition(path)
+
+    payload = json.loads(Path(path).read_text(encoding="utf-8"))
+
+    initial_chips = payload.get("initial_chips")
+    if initial_chips is None:
+        raise ValueError("'initial_chips' not found in sample data")
+
+    deck = payload.get("deck")
+    if not isinstance(deck, list):
+        raise ValueError("'deck' must be a list in sample data")
+
+    rounds_payload = payload.get("rounds")
+    if not isinstance(rounds_payload, list):
+        raise ValueError("'rounds' must be a list in sample data")
+
+    rounds = tuple(RecordedRound.from_payload(item) for item in rounds_payload)
+    return GameDefinition(
+        initial_chips=initial_chips,
+        rounds=rounds,
+        deck=tuple(deck),
+        total_rounds=len(rounds),
+    )
+
+
+def read_jsonl_definition(path: Path | str) -> GameDefinition:
+    """Read the header of a JSON Lines recording; rounds stay on disk.
+
+    The header line holds ``initial_chips``, ``deck`` and optionally
+    ``total_rounds``; every following line is one round definition.
+    """
+
+    with Path(path).open(encoding="utf-8") as stream:
+        header_line = stream.readline()
+    try:
+        header = json.loads(header_line)
+    except ValueError as exc:
+        raise ValueError(f"Invalid header line in {path}") from exc
+    if not isinstance(header, dict):
+        raise ValueError("The header line must be an object")
+
+    initial_chips = header.get("initial_chips")
+    if initial_chips is None:
+        raise ValueError("'initial_chips' not found in the header")
+
+    deck = header.get("deck")
+    if not isinstance(deck, list):
+        raise ValueError("'deck' must be a list in the header")
+
+    total_rounds = header.get("total_rounds")
+    if total_rounds is not None and not isinstance(total_rounds, int):
+        raise ValueError("'total_rounds' must be an integer in the header")
+
+    return GameDefinition(
+        initial_chips=initial_chips,
+        rounds=JsonlRounds(path),
+        deck=tuple(deck),
+        total_rounds=total_rounds,
+    )
+
+
+_definition_cache: Dict[Path, Tuple[Tuple[int, int], GameDefinition]] = {}
+_definition_cache_lock = threading.Lock()
+
+
+def load_definition(path: Path | str) -> GameDefinition:
+    """Parsed definition of ``path``, shared process-wide until the file changes."""
 
-        initial_chips = payload.get("initial_chips")
-        if initial_chips is None:
-            raise ValueError("'initial_chips' not found in sample data")
+    resolved = Path(path).resolve()
+    stat = resolved.stat()
+    # The size catches rewrites within the mtime resolution of coarse filesystems.
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _definition_cache_lock:
+        cached = _definition_cache.get(resolved)
+        if cached is not None and cached[0] == version:
+            return cached[1]
 
-        deck = payload.get("deck")
-        if not isinstance(deck, list):
-            raise ValueError("'deck' must be a list in sample data")
+    definition = read_definition(resolved)
+    with _definition_cache_lock:
+        _definition_cache[resolved] = (version, definition)
+    return definition
 
-        rounds_payload = payload.get("rounds")
-        if not isinstance(rounds_payload, list):
-            raise ValueError("'rounds' must be a list in sample data")
 
-        rounds = [RecordedRound.from_payload(item) for item in rounds_payload]
-        return cls(initial_chips=initial_chips, rounds=rounds, deck=deck)
+def clear_definition_cache() -> None:
+    with _definition_cache_lock:
+        _definition_cache.clear()
 
 
 def load_sample_game(sample_name: str = "highlow_round3.json") -> HighLowGame:
@@ -174,4 +660,4 @@ def load_sample_game(sample_name: str = "highlow_round3.json") -> HighLowGame:
     if not sample_path.exists():
         raise FileNotFoundError(f"Sample data '{sample_name}' not found at {sample_path}")
 
-    return HighLowGame.from_file(sample_path)
+    return HighLowGame.from_definition(load_definition(sample_path))
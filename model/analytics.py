@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from model.history_store import HistoryStore
+
+# Two-sided 95% quantile of the standard normal distribution.
+Z_95 = 1.959963984540054
+
+_COLUMNS = {"outcome": np.int8, "net": np.int64, "chips": np.int64, "drawdown": np.int64}
+
+
+class BankrollAnalytics:
+    """Bankroll curve, drawdown, win rate and outcome breakdown of a history.
+
+    ``update`` copies only the rounds appended to ``history`` since its last
+    call into NumPy columns and folds them into the aggregates, so keeping the
+    analytics current costs O(new rounds). The aggregates cover every round
+    since the last reset; the columns behind ``curve`` keep the latest
+    ``max_rounds`` of them, so memory stays bounded however long a session
+    runs. If rounds were overwritten before ``update`` saw them, the analytics
+    restart at the oldest stored round.
+    """
+
+    def __init__(self, history: HistoryStore, max_rounds: int = 10_000) -> None:
+        if max_rounds <= 0:
+            raise ValueError("max_rounds must be a positive integer")
+
+        self.history = history
+        self.max_rounds = max_rounds
+        self.outcomes = history.outcomes
+        # Net chips per unit of bet of every outcome code.
+        self._results = np.array(history.results, dtype=np.int64)
+        self._generation: Optional[int] = None
+        self._clear(history.initial_chips, first_round=1)
+
+    # ------------------------------------------------------------------
+    def update(self) -> int:
+        """Take in the rounds appended since the last call; returns how many."""
+
+        history = self.history
+        if history.generation != self._generation or history.total_rounds < self._synced:
+            self._generation = history.generation
+            self._clear(history.initial_chips, first_round=1)
+
+        new = history.total_rounds - self._synced
+        if new == 0:
+            return 0
+        gap = new > len(history)
+        if gap:
+            new = len(history)
+
+        codes = np.frombuffer(history.tail("outcome", new), dtype=np.int8)
+        bets = np.frombuffer(history.tail("bet", new), dtype=np.int64)
+        chips = np.frombuffer(history.tail("chips_after", new), dtype=np.int64)
+        nets = bets * self._results[codes]
+        if gap:
+            self._clear(int(chips[0] - nets[0]), first_round=history.total_rounds - new + 1)
+
+        peaks = np.maximum(np.maximum.accumulate(chips), self.peak_chips)
+        drawdowns = peaks - chips
+        self._append(outcome=codes, net=nets, chips=chips, drawdown=drawdowns)
+
+        self._synced = history.total_rounds
+        self.total_rounds += new
+        self.first_round = history.total_rounds - self._size + 1
+        self.peak_chips = int(peaks[-1])
+        self.max_drawdown = max(self.max_drawdown, int(drawdowns.max()))
+        self.net += int(nets.sum())
+        self.wins += int(np.count_nonzero(self._results[codes] > 0))
+        self._outcome_counts += np.bincount(codes, minlength=len(self.outcomes))
+        np.add.at(self._outcome_nets, codes, nets)
+        return new
+
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        """Number of rounds kept in the columns."""
+
+        return self._size
+
+    @property
+    def rounds(self) -> np.ndarray:
+        """Round numbers of the columns below."""
+
+        return np.arange(self.first_round, self.first_round + self._size)
+
+    @property
+    def bankroll(self) -> np.ndarray:
+        """Chips after every kept round."""
+
+        return self._columns["chips"][: self._size]
+
+    @property
+    def drawdown(self) -> np.ndarray:
+        """Distance of every kept round's chips below the highest bankroll so far."""
+
+        return self._columns["drawdown"][: self._size]
+
+    @property
+    def nets(self) -> np.ndarray:
+        return self._columns["net"][: self._size]
+
+    @property
+    def outcome_codes(self) -> np.ndarray:
+        return self._columns["outcome"][: self._size]
+
+    @property
+    def win_rate(self) -> float:
+        if not self.total_rounds:
+            return 0.0
+        return self.wins / self.total_rounds
+
+    def win_rate_interval(self, z: float = Z_95) -> Tuple[float, float]:
+        """Wilson score interval of the win rate; 95% by default."""
+
+        n = self.total_rounds
+        if not n:
+            return 0.0, 1.0
+        p = self.wins / n
+        denominator = 1 + z * z / n
+        centre = (p + z * z / (2 * n)) / denominator
+        half_width = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+        return max(0.0, centre - half_width), min(1.0, centre + half_width)
+
+    def outcome_breakdown(self) -> Dict[str, Dict[str, float]]:
+        """Rounds, share of rounds and net chips of every outcome."""
+
+        total = self.total_rounds
+        return {
+            outcome: {
+                "rounds": int(self._outcome_counts[code]),
+                "share": float(self._outcome_counts[code] / total) if total else 0.0,
+                "net": int(self._outcome_nets[code]),
+            }
+            for code, outcome in enumerate(self.outcomes)
+        }
+
+    def curve(self, max_points: int = 1000) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Round numbers, chips and running peak, thinned to about ``max_points``.
+
+        Thinning is a strided view that always keeps the latest round, so
+        charting costs O(max_points) however long the history is. The curve
+        starts at the oldest kept round.
+        """
+
+        if max_points <= 0:
+            raise ValueError("max_points must be a positive integer")
+        count = self._size
+        step = max(1, -(-count // max_points))
+        indices = np.arange(count - 1, -1, -step)[::-1]
+        chips = self.bankroll[indices]
+        return indices + self.first_round, chips, chips + self.drawdown[indices]
+
+    # ------------------------------------------------------------------
+    def _clear(self, start_chips: int, first_round: int) -> None:
+        self.start_chips = start_chips
+        self.first_round = first_round
+        self.total_rounds = 0
+        self._size = 0
+        self._synced = first_round - 1
+        size = min(64, 2 * self.max_rounds)
+        self._columns = {name: np.empty(size, dtype=dtype) for name, dtype in _COLUMNS.items()}
+        self.peak_chips = start_chips
+        self.max_drawdown = 0
+        self.net = 0
+        self.wins = 0
+        self._outcome_counts = np.zeros(len(self.outcomes), dtype=np.int64)
+        self._outcome_nets = np.zeros(len(self.outcomes), dtype=np.int64)
+
+    def _append(self, **values: np.ndarray) -> None:
+        size = self._size
+        count = len(values["chips"])
+        if count > self.max_rounds:
+            # Only the newest max_rounds survive; the kept rows would not follow on.
+            values = {name: value[-self.max_rounds :] for name, value in values.items()}
+            size, count = 0, self.max_rounds
+        end = size + count
+        limit = 2 * self.max_rounds
+        # Past twice the cap, compact down to the newest max_rounds rows, so
+        # the copy happens once every max_rounds appends.
+        drop = end - self.max_rounds if end > limit else 0
+        for name, column in self._columns.items():
+            if drop:
+                column[: size - drop] = column[drop:size]
+            elif end > len(column):
+                # Doubling keeps appends amortised O(1) per round.
+                grown = np.empty(min(limit, max(end, 2 * len(column))), dtype=column.dtype)
+                grown[:size] = column[:size]
+                self._columns[name] = column = grown
+            column[end - drop - count : end - drop] = values[name]
+        self._size = end - drop
+
+
+__all__ = ["BankrollAnalytics", "Z_95"]
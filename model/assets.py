@@ -0,0 +1,211 @@
+"""Resized, recompressed variants of the repository images.
+
+Run ``python -m model.assets`` to build every variant ahead of time; the docs
+hook also builds missing ones on first use. Variant names carry a hash of the
+source content and settings, so unchanged images are skipped and changed ones
+never collide with stale files.
+
+Pillow is optional: without it no variants are built and callers fall back to
+the original files.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - depends on the environment
+    Image = None
+
+ROOT = Path(__file__).resolve().parent.parent
+CACHE_DIR = ROOT / ".cache" / "assets"
+SOURCES = ("Black_Jack_png.png", "High_and_Low_pic.png", "2025-09-29-11-04-22.png")
+WIDTHS = (160, 320, 640)
+FORMATS = ("webp", "png")
+MANIFEST = "manifest.json"
+
+# Bump when the encoder settings below change, so every variant is rebuilt.
+_SETTINGS = "webp-q80-m6;png-optimize-p256"
+
+# variant_path builds on first use, and may be called from several threads at once.
+_build_lock = threading.Lock()
+
+
+def variant_name(source: Path, width: int, image_format: str) -> str:
+    """``<stem>-<hash>-w<width>.<format>`` for the current content of ``source``."""
+
+    stat = source.stat()
+    digest = hashlib.sha256(_content_digest(source.resolve(), stat.st_mtime_ns, stat.st_size))
+    digest.update(f"{width};{image_format};{_SETTINGS}".encode("ascii"))
+    return f"{source.stem}-{digest.hexdigest()[:12]}-w{width}.{image_format}"
+
+
+@lru_cache(maxsize=64)
+def _content_digest(source: Path, mtime_ns: int, size: int) -> bytes:
+    # Keyed by modification time and size so reruns do not rehash unchanged files.
+    return hashlib.sha256(source.read_bytes()).digest()
+
+
+def build(
+    sources: Iterable[Path] = (),
+    output_dir: Path = CACHE_DIR,
+    widths: Iterable[int] = WIDTHS,
+) -> Dict[str, Dict[str, Dict[str, str]]]:
+    """Write the missing variants of ``sources`` and return the manifest.
+
+    The manifest maps each source file name to ``{width: {format: file name}}``.
+    Sources narrower than a width are not scaled up. Files are written under
+    unique temporary names and renamed into place, so concurrent builds never
+    see a partial file.
+    """
+
+    if Image is None:
+        raise RuntimeError("Building image variants needs Pillow (pip install pillow)")
+
+    sources = [Path(source) for source in sources] or [ROOT / name for name in SOURCES]
+    output_dir = Path(output_dir)
+    with _build_lock:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        return _build(sources, output_dir, tuple(widths))
+
+
+def variant_path(
+    name: str,
+    width: int,
+    image_format: str = "webp",
+    output_dir: Path = CACHE_DIR,
+) -> Path:
+    """Smallest variant of ``name`` at least ``width`` wide, building it if needed.
+
+    Falls back to the original image when Pillow is not installed.
+    """
+
+    source = ROOT / name
+    if Image is None:
+        return source
+    file_name = variant_name(source, pick_width(width), image_format)
+    path = Path(output_dir) / file_name
+    if not path.exists():
+        build([source], output_dir)
+    return path
+
+
+def pick_width(width: int) -> int:
+    """Smallest built width that covers ``width``, or the largest one."""
+
+    return min((candidate for candidate in WIDTHS if candidate >= width), default=max(WIDTHS))
+
+
+def clean(output_dir: Path = CACHE_DIR) -> List[Path]:
+    """Delete variants no longer listed in the manifest; returns what was removed."""
+
+    output_dir = Path(output_dir)
+    current = {
+        file_name
+        for entry in _read_manifest(output_dir).values()
+        for names in entry.values()
+        for file_name in names.values()
+    }
+    removed = []
+    for path in output_dir.glob("*-w*.*"):
+        # Dot files are temporary files a build is still writing.
+        if path.name not in current and not path.name.startswith("."):
+            path.unlink()
+            removed.append(path)
+    return removed
+
+
+# ----------------------------------------------------------------------
+def _build(
+    sources: List[Path], output_dir: Path, widths: Tuple[int, ...]
+) -> Dict[str, Dict[str, Dict[str, str]]]:
+    manifest = _read_manifest(output_dir)
+    for source in sources:
+        entry: Dict[str, Dict[str, str]] = {}
+        image = None
+        for width in widths:
+            names = {image_format: variant_name(source, width, image_format) for image_format in FORMATS}
+            if not all((output_dir / name).exists() for name in names.values()):
+                if image is None:
+                    image = Image.open(source)
+                    image.load()
+                _write_variants(image, width, output_dir, names)
+            entry[str(width)] = names
+        manifest[source.name] = entry
+
+    data = json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8")
+    _write_atomic(output_dir / MANIFEST, lambda stream: stream.write(data))
+    return manifest
+
+
+def _read_manifest(output_dir: Path) -> Dict:
+    path = output_dir / MANIFEST
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _write_variants(image, width: int, output_dir: Path, names: Dict[str, str]) -> None:
+    if image.width > width:
+        height = round(image.height * width / image.width)
+        image = image.resize((width, height), Image.LANCZOS)
+
+    _write_atomic(output_dir / names["webp"], lambda stream: image.save(stream, "WEBP", quality=80, method=6))
+
+    # A 256-colour palette keeps screenshots and illustrations sharp at a fraction of the size.
+    palette = image.convert("RGBA").quantize(256, method=Image.FASTOCTREE)
+    _write_atomic(output_dir / names["png"], lambda stream: palette.save(stream, "PNG", optimize=True))
+
+
+def _write_atomic(path: Path, write: Callable[[BinaryIO], object]) -> None:
+    """Write ``path`` through a uniquely named temporary file in the same directory."""
+
+    with tempfile.NamedTemporaryFile(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False
+    ) as stream:
+        temporary = Path(stream.name)
+        try:
+            write(stream)
+        except BaseException:
+            stream.close()
+            temporary.unlink()
+            raise
+    # Temporary files are private to the owner; variants are plain readable files.
+    os.chmod(temporary, 0o644)
+    temporary.replace(path)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build resized image variants.")
+    parser.add_argument("--output", type=Path, default=CACHE_DIR)
+    parser.add_argument("--clean", action="store_true", help="also delete stale variants")
+    args = parser.parse_args(argv)
+
+    manifest = build(output_dir=args.output)
+    for name, entry in sorted(manifest.items()):
+        original = (ROOT / name).stat().st_size if (ROOT / name).exists() else 0
+        for width, names in entry.items():
+            sizes = ", ".join(
+                f"{image_format} {(args.output / file_name).stat().st_size / 1024:.0f} KiB"
+                for image_format, file_name in names.items()
+            )
+            print(f"{name} ({original / 1024:.0f} KiB) w{width}: {sizes}")
+    if args.clean:
+        for path in clean(args.output):
+            print(f"removed {path.name}")
+
+
+__all__ = ["build", "clean", "pick_width", "variant_name", "variant_path"]
+
+
+if __name__ == "__main__":
+    main()
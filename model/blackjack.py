@@ -1,8 +1,17 @@
 ﻿from __future__ import annotations
 
 import random
-from dataclasses import dataclass
-from typing import Dict, List, Optional
+from array import array
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from model import event_log, instrumentation
+from model.event_log import EventLog
+from model.history_store import HistoryStore
+from model.shoe import CARDS_PER_DECK, HI_LO_TAGS, ContinuousShoe, Shoe
+from model.snapshot import SnapshotReader, SnapshotWriter, pack_rng_state, unpack_rng_state
 
 SUITS = ("Spades", "Hearts", "Diamonds", "Clubs")
 RANKS = ("A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K")
@@ -22,9 +31,40 @@ RANK_VALUES = {
     "K": 10,
 }
 
+DEALER_STAND_TOTAL = 17
+RESHUFFLE_THRESHOLD = 15
+OUTCOMES = (
+    "player_blackjack",
+    "player_win",
+    "dealer_bust",
+    "push",
+    "player_bust",
+    "dealer_win",
+    "dealer_blackjack",
+)
+# Whether each outcome counts as a won (+1), pushed (0) or lost (-1) round.
+OUTCOME_RESULTS = {
+    "player_blackjack": 1,
+    "player_win": 1,
+    "dealer_bust": 1,
+    "push": 0,
+    "player_bust": -1,
+    "dealer_win": -1,
+    "dealer_blackjack": -1,
+}
+# Chips returned by ``_finish_round`` per unit of bet; the bet is taken when the round starts.
+PAYOUT_MULTIPLIERS = {
+    "player_win": 2,
+    "dealer_bust": 2,
+    "player_blackjack": 2,
+    "push": 1,
+}
+
 
 @dataclass(frozen=True)
 class Card:
+    __slots__ = ("rank", "suit")
+
     rank: str
     suit: str
 
@@ -36,6 +76,12 @@ class Card:
         return f"{self.rank} of {self.suit}"
 
 
+# One shared instance per card, indexed by the codes dealt from a ``Shoe``.
+CARDS = tuple(Card(rank=rank, suit=suit) for suit in SUITS for rank in RANKS)
+_CODE_VALUES = tuple(card.base_value for card in CARDS)
+_CARD_CODES = {card: code for code, card in enumerate(CARDS)}
+
+
 def hand_value(cards: List[Card]) -> int:
     total = sum(card.base_value for card in cards)
     aces = sum(1 for card in cards if card.rank == "A")
@@ -45,36 +91,171 @@ def hand_value(cards: List[Card]) -> int:
     return total
 
 
+class Hand(Sequence):
+    """Cards held by one side, with totals kept up to date on every append.
+
+    ``total`` always agrees with ``hand_value`` over the same cards.
+    """
+
+    def __init__(self, cards: Iterable[Card] = ()) -> None:
+        self._cards: List[Card] = []
+        self.hard_total = 0
+        self.aces = 0
+        for card in cards:
+            self.append(card)
+
+    def append(self, card: Card) -> None:
+        self._cards.append(card)
+        self.hard_total += card.base_value
+        if card.rank == "A":
+            self.aces += 1
+
+    @property
+    def is_soft(self) -> bool:
+        return self.aces > 0 and self.hard_total + 10 <= 21
+
+    @property
+    def total(self) -> int:
+        if self.is_soft:
+            return self.hard_total + 10
+        return self.hard_total
+
+    def __len__(self) -> int:
+        return len(self._cards)
+
+    def __iter__(self) -> Iterator[Card]:
+        return iter(self._cards)
+
+    def __getitem__(self, index: int) -> Card:
+        return self._cards[index]
+
+
+# Headless policies: ``(player_total, is_soft, dealer_upcard_value) -> "hit" | "stand"``
+# and ``(chips) -> bet``.
+PlayPolicy = Callable[[int, bool, int], str]
+BetPolicy = Callable[[int], int]
+
+
+@dataclass
+class RunSummary:
+    """Compact statistics of rounds played through ``BlackjackGame.run_rounds``."""
+
+    initial_chips: int
+    outcome_counts: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(OUTCOMES, 0))
+    chips_trajectory: array = field(default_factory=lambda: array("q"))
+    max_drawdown: int = 0
+
+    @property
+    def rounds_played(self) -> int:
+        return len(self.chips_trajectory)
+
+    @property
+    def final_chips(self) -> int:
+        if not self.chips_trajectory:
+            return self.initial_chips
+        return self.chips_trajectory[-1]
+
+    @property
+    def net(self) -> int:
+        return self.final_chips - self.initial_chips
+
+
+def stand_on(threshold: int) -> PlayPolicy:
+    """Policy that hits while the player total is below ``threshold``."""
+
+    return partial(_stand_on, threshold)
+
+
+def flat_bet(amount: int) -> BetPolicy:
+    """Bet policy that always wagers ``amount``, or everything left if less."""
+
+    return partial(min, amount)
+
+
+# Module-level so the policies above can be pickled into worker processes.
+def _stand_on(threshold: int, total: int, soft: bool, upcard_value: int) -> str:
+    return "hit" if total < threshold else "stand"
+
+
 class BlackjackGame:
     """Stateful single player blackjack implementation."""
 
-    def __init__(self, initial_chips: int = 100, rng: Optional[random.Random] = None) -> None:
+    def __init__(
+        self,
+        initial_chips: int = 100,
+        rng: Optional[random.Random] = None,
+        decks: int = 1,
+        penetration: Optional[float] = None,
+        history_limit: int = 1000,
+        record_events: bool = False,
+        continuous_shuffle: bool = False,
+    ) -> None:
+        """With ``continuous_shuffle`` the shoe is never reshuffled; the cards
+        of every finished round go straight back into a continuous shuffler.
+        """
+
         if initial_chips <= 0:
             raise ValueError("initial_chips must be a positive integer")
+        if continuous_shuffle and penetration is not None:
+            raise ValueError("A continuous shuffler has no penetration")
 
         self.initial_chips = initial_chips
+        self.continuous_shuffle = continuous_shuffle
         self._rng = rng or random.Random()
+        if continuous_shuffle:
+            self._shoe = ContinuousShoe(decks, rng=self._rng)
+        elif penetration is None:
+            self._shoe = Shoe(decks, rng=self._rng, cut_card=RESHUFFLE_THRESHOLD)
+        else:
+            self._shoe = Shoe(decks, rng=self._rng, penetration=penetration)
+        self.history_store = HistoryStore(
+            OUTCOMES,
+            OUTCOME_RESULTS,
+            columns=("player_total", "dealer_total"),
+            capacity=history_limit,
+        )
+        self.record_events = record_events
+        self.events: Optional[EventLog] = None
+        # Called with (outcome, bet, net, chips_after) after every round finished
+        # through the public actions; see ``ResultsStore.recorder``.
+        self.on_round: Optional[Callable[[str, int, int, int], None]] = None
+        # While ``replay`` goes through a ``run_rounds`` call: whether its rounds
+        # reach the history. Such rounds never become ``last_record``.
+        self._replaying_run: Optional[bool] = None
         self.reset()
 
     # ------------------------------------------------------------------
     def reset(self) -> None:
+        if self.record_events:
+            # Reseed from the game's own RNG so the log alone is enough to replay.
+            seed = self._rng.getrandbits(64)
+            self._rng.seed(seed)
+            self.events = EventLog(
+                self.initial_chips, self._shoe.decks, self._shoe.cut_card, self.continuous_shuffle
+            )
+            self.events.seed(seed)
+            self._shoe.on_shuffle = partial(self.events.append, event_log.RESHUFFLE)
         self.chips = self.initial_chips
-        self.history: List[Dict] = []
-        self._deck: List[Card] = []
-        self._player_cards: List[Card] = []
-        self._dealer_cards: List[Card] = []
+        self.history_store.clear(self.chips)
+        # (outcome, bet, payout, player hand, dealer hand, chips after) of the latest round.
+        self._last_round: Optional[Tuple[str, int, int, Hand, Hand, int]] = None
+        self._shoe.discard()
+        self._player_cards = Hand()
+        self._dealer_cards = Hand()
         self.current_bet = 0
         self.state = "BETTING"
         self.round_outcome: Optional[str] = None
 
     # ------------------------------------------------------------------
+    # The hands are handed out as tuples: appending to the live ``Hand`` would
+    # bypass the game's bookkeeping.
     @property
-    def player_cards(self) -> List[Card]:
-        return list(self._player_cards)
+    def player_cards(self) -> Tuple[Card, ...]:
+        return tuple(self._player_cards)
 
     @property
-    def dealer_cards(self) -> List[Card]:
-        return list(self._dealer_cards)
+    def dealer_cards(self) -> Tuple[Card, ...]:
+        return tuple(self._dealer_cards)
 
     @property
     def dealer_upcard(self) -> Optional[Card]:
@@ -84,11 +265,19 @@ class BlackjackGame:
 
     @property
     def player_total(self) -> int:
-        return hand_value(self._player_cards)
+        return self._player_cards.total
 
     @property
     def dealer_total(self) -> int:
-        return hand_value(self._dealer_cards)
+        return self._dealer_cards.total
+
+    @property
+    def player_is_soft(self) -> bool:
+        return self._player_cards.is_soft
+
+    @property
+    def dealer_is_soft(self) -> bool:
+        return self._dealer_cards.is_soft
 
     @property
     def is_player_turn(self) -> bool:
@@ -100,17 +289,86 @@ class BlackjackGame:
 
     @property
     def cards_remaining(self) -> int:
-        return len(self._deck)
+        return self._shoe.remaining
+
+    @property
+    def rank_counts(self) -> Dict[str, int]:
+        """Undealt cards per rank, kept up to date on every draw."""
+
+        return dict(zip(RANKS, self._shoe.rank_counts))
+
+    @property
+    def shoe_composition(self) -> Tuple[int, ...]:
+        """Undealt cards per value, from the ace (index 0) to the ten-valued ranks."""
+
+        counts = self._shoe.rank_counts
+        return counts[:9] + (sum(counts[9:]),)
+
+    @property
+    def running_count(self) -> int:
+        """Hi-Lo count of the cards the player has seen since the last shuffle."""
+
+        count = self._shoe.running_count
+        if self._hole_card_hidden:
+            count -= HI_LO_TAGS[RANKS.index(self._dealer_cards[1].rank)]
+        return count
+
+    @property
+    def true_count(self) -> float:
+        """Running count per deck of cards the player has not seen."""
+
+        unseen = self._shoe.remaining + self._hole_card_hidden
+        if not unseen:
+            return 0.0
+        return self.running_count * CARDS_PER_DECK / unseen
+
+    @property
+    def unseen_composition(self) -> Tuple[int, ...]:
+        """Like ``shoe_composition``, plus the dealer's hole card while it is hidden."""
+
+        counts = list(self.shoe_composition)
+        if self._hole_card_hidden:
+            counts[self._dealer_cards[1].base_value - 1] += 1
+        return tuple(counts)
+
+    @property
+    def fresh_shoe_composition(self) -> Tuple[int, ...]:
+        counts = [0] * 10
+        for card in CARDS:
+            counts[card.base_value - 1] += self._shoe.decks
+        return tuple(counts)
+
+    @property
+    def _hole_card_hidden(self) -> bool:
+        return self.is_player_turn and len(self._dealer_cards) > 1
 
     @property
     def is_bankrupt(self) -> bool:
         return self.chips <= 0
 
+    @property
+    def history(self) -> List[Dict]:
+        """The most recent rounds (up to ``history_limit``), oldest first."""
+
+        return list(self.history_store.rows())
+
     @property
     def last_record(self) -> Optional[Dict]:
-        if not self.history:
+        """Full record of the latest round finished through the public actions."""
+
+        if self._last_round is None:
             return None
-        return self.history[-1]
+        outcome, bet, payout, player_cards, dealer_cards, chips_after = self._last_round
+        return {
+            "outcome": outcome,
+            "bet": bet,
+            "delta": payout,
+            "player_cards": [card.label() for card in player_cards],
+            "dealer_cards": [card.label() for card in dealer_cards],
+            "player_total": player_cards.total,
+            "dealer_total": dealer_cards.total,
+            "chips_after": chips_after,
+        }
 
     # ------------------------------------------------------------------
     def start_round(self, bet: int) -> None:
@@ -121,11 +379,13 @@ class BlackjackGame:
         if bet > self.chips:
             raise ValueError("Bet cannot exceed current chips")
 
+        if self.events is not None:
+            self.events.bet(bet)
         self._ensure_deck()
         self.current_bet = bet
         self.chips -= bet
-        self._player_cards = [self._draw_card(), self._draw_card()]
-        self._dealer_cards = [self._draw_card(), self._draw_card()]
+        self._player_cards = Hand([self._draw_card(), self._draw_card()])
+        self._dealer_cards = Hand([self._draw_card(), self._draw_card()])
         self.round_outcome = None
         self.state = "PLAYER_TURN"
 
@@ -142,6 +402,8 @@ class BlackjackGame:
         if self.state != "PLAYER_TURN":
             raise RuntimeError("Hit is only available during the player turn")
 
+        if self.events is not None:
+            self.events.append(event_log.HIT)
         card = self._draw_card()
         self._player_cards.append(card)
         if self.player_total > 21:
@@ -152,6 +414,8 @@ class BlackjackGame:
         if self.state != "PLAYER_TURN":
             raise RuntimeError("Stand is only available during the player turn")
 
+        if self.events is not None:
+            self.events.append(event_log.STAND)
         self._dealer_play()
         dealer_total = self.dealer_total
         player_total = self.player_total
@@ -168,58 +432,323 @@ class BlackjackGame:
         if self.state != "ROUND_OVER":
             raise RuntimeError("Next round can only start after the current round ends")
 
-        self._player_cards = []
-        self._dealer_cards = []
+        if self.events is not None:
+            self.events.append(event_log.NEXT)
+        self._player_cards = Hand()
+        self._dealer_cards = Hand()
         self.current_bet = 0
         self.round_outcome = None
         self.state = "BETTING"
 
     def reset_shoe(self) -> None:
-        self._deck = []
+        if self.events is not None:
+            self.events.append(event_log.RESET_SHOE)
+        self._shoe.discard()
+
+    def run_rounds(
+        self,
+        rounds: int,
+        policy: PlayPolicy,
+        bet_policy: BetPolicy,
+        record_history: bool = False,
+    ) -> RunSummary:
+        """Play up to ``rounds`` rounds without going through the public actions.
+
+        Rounds are dealt and resolved exactly as ``start_round``/``hit``/``stand``
+        would, but on bare card codes. Play stops early once the chips run out.
+        When events are recorded, each round is logged as the equivalent public
+        actions, enclosed in a run marker that tells ``replay`` whether the rounds
+        went into the history, so it reaches the same state.
+        """
+
+        if self.state != "BETTING":
+            raise RuntimeError("Round already in progress")
+        if rounds < 0:
+            raise ValueError("rounds must not be negative")
+
+        summary = RunSummary(initial_chips=self.chips)
+        counts = summary.outcome_counts
+        trajectory = summary.chips_trajectory
+        peak = self.chips
+        draw = self._shoe.draw
+        collect = self._shoe.collect if self.continuous_shuffle else None
+        values = _CODE_VALUES
+        events = self.events
+        if events is not None:
+            events.run(record_history)
+
+        try:
+            for _ in range(rounds):
+                if self.chips <= 0:
+                    break
+                bet = bet_policy(self.chips)
+                if bet <= 0:
+                    raise ValueError("Bet must be a positive integer")
+                if bet > self.chips:
+                    raise ValueError("Bet cannot exceed current chips")
+
+                if events is not None:
+                    events.bet(bet)
+                self._ensure_deck()
+                self.chips -= bet
+                player = [draw(), draw()]
+                dealer = [draw(), draw()]
+                player_hard = values[player[0]] + values[player[1]]
+                player_aces = (values[player[0]] == 1) + (values[player[1]] == 1)
+                dealer_hard = values[dealer[0]] + values[dealer[1]]
+                dealer_aces = (values[dealer[0]] == 1) + (values[dealer[1]] == 1)
+                player_soft = player_aces > 0 and player_hard + 10 <= 21
+                player_total = player_hard + 10 if player_soft else player_hard
+                dealer_total = dealer_hard + 10 if dealer_aces and dealer_hard + 10 <= 21 else dealer_hard
+
+                if player_total == 21 and dealer_total == 21:
+                    outcome = "push"
+                elif player_total == 21:
+                    outcome = "player_blackjack"
+                elif dealer_total == 21:
+                    outcome = "dealer_blackjack"
+                else:
+                    upcard_value = values[dealer[0]]
+                    while player_total <= 21 and policy(player_total, player_soft, upcard_value) == "hit":
+                        if events is not None:
+                            events.append(event_log.HIT)
+                        code = draw()
+                        player.append(code)
+                        player_hard += values[code]
+                        player_aces += values[code] == 1
+                        player_soft = player_aces > 0 and player_hard + 10 <= 21
+                        player_total = player_hard + 10 if player_soft else player_hard
+
+                    if player_total > 21:
+                        outcome = "player_bust"
+                    else:
+                        if events is not None:
+                            events.append(event_log.STAND)
+                        while dealer_total < DEALER_STAND_TOTAL:
+                            code = draw()
+                            dealer.append(code)
+                            dealer_hard += values[code]
+                            dealer_aces += values[code] == 1
+                            dealer_total = (
+                                dealer_hard + 10 if dealer_aces and dealer_hard + 10 <= 21 else dealer_hard
+                            )
+                        if dealer_total > 21:
+                            outcome = "dealer_bust"
+                        elif dealer_total > player_total:
+                            outcome = "dealer_win"
+                        elif dealer_total < player_total:
+                            outcome = "player_win"
+                        else:
+                            outcome = "push"
+
+                payout = bet * PAYOUT_MULTIPLIERS.get(outcome, 0)
+                self.chips += payout
+                if collect is not None:
+                    collect()
+                if events is not None:
+                    events.append(event_log.NEXT)
+                counts[outcome] += 1
+                trajectory.append(self.chips)
+                if self.chips > peak:
+                    peak = self.chips
+                elif peak - self.chips > summary.max_drawdown:
+                    summary.max_drawdown = peak - self.chips
+
+                if record_history:
+                    self.history_store.append(
+                        outcome,
+                        bet,
+                        payout,
+                        self.chips,
+                        player_total=player_total,
+                        dealer_total=dealer_total,
+                    )
+        finally:
+            if events is not None:
+                events.append(event_log.RUN_END)
+        return summary
+
+    @classmethod
+    def replay(cls, log: EventLog, until: Optional[int] = None, history_limit: int = 1000) -> "BlackjackGame":
+        """Rebuild the game recorded in ``log`` after its first ``until`` events.
+
+        Every action goes through the public methods, so the replayed game is
+        in exactly the state the recorded one was, cards and RNG included.
+        Rounds logged by ``run_rounds`` reach the history only if they did
+        when they were played, and never become ``last_record``.
+        """
+
+        game = cls(
+            initial_chips=log.initial_chips,
+            decks=log.decks,
+            history_limit=history_limit,
+            continuous_shuffle=log.continuous,
+        )
+        game._shoe.cut_card = log.cut_card
+        applied = 0
+        for code, argument in log:
+            if until is not None and applied >= until:
+                break
+            applied += 1
+            if code == event_log.SEED:
+                game._rng.seed(argument)
+                game._shoe.discard()
+            elif code == event_log.BET:
+                game.start_round(argument)
+            elif code == event_log.HIT:
+                game.hit()
+            elif code == event_log.STAND:
+                game.stand()
+            elif code == event_log.NEXT:
+                game.next_round()
+            elif code == event_log.RESET_SHOE:
+                game.reset_shoe()
+            elif code == event_log.RUN:
+                game._replaying_run = bool(argument)
+            elif code == event_log.RUN_END:
+                game._replaying_run = None
+            # RESHUFFLE only marks where the shoe ran out; replay reshuffles on its own.
+        return game
+
+    # ------------------------------------------------------------------
+    def snapshot(self) -> bytes:
+        """Compact binary encoding of the whole game, RNG state included."""
+
+        writer = SnapshotWriter(b"blackjack")
+        writer.write_int(self.initial_chips)
+        writer.write_int(self.chips)
+        writer.write_int(self.current_bet)
+        writer.write_text(self.state)
+        writer.write_text(self.round_outcome)
+        writer.write_blob(pack_rng_state(self._rng))
+        writer.write_int(self._shoe.decks)
+        writer.write_int(self._shoe.cut_card)
+        writer.write_int(int(self.continuous_shuffle))
+        writer.write_blob(self._shoe.snapshot())
+        writer.write_blob(bytes(_CARD_CODES[card] for card in self._player_cards))
+        writer.write_blob(bytes(_CARD_CODES[card] for card in self._dealer_cards))
+
+        last_round = self._last_round
+        writer.write_text(None if last_round is None else last_round[0])
+        if last_round is not None:
+            _, bet, payout, player_cards, dealer_cards, chips_after = last_round
+            writer.write_int(bet)
+            writer.write_int(payout)
+            writer.write_int(chips_after)
+            writer.write_blob(bytes(_CARD_CODES[card] for card in player_cards))
+            writer.write_blob(bytes(_CARD_CODES[card] for card in dealer_cards))
+
+        writer.write_int(self.history_store.capacity)
+        writer.write_blob(self.history_store.snapshot())
+        return writer.getvalue()
+
+    def restore(self, data: bytes) -> None:
+        """Replace this game's state with one produced by ``snapshot``."""
+
+        reader = SnapshotReader(data, b"blackjack")
+        # A snapshot carries no event log, so recording resumes only after ``reset``.
+        self.events = None
+        self.initial_chips = reader.read_int()
+        self.chips = reader.read_int()
+        self.current_bet = reader.read_int()
+        self.state = reader.read_text() or "BETTING"
+        self.round_outcome = reader.read_text()
+        self._rng.setstate(unpack_rng_state(reader.read_blob()))
+        decks = reader.read_int()
+        cut_card = reader.read_int()
+        self.continuous_shuffle = bool(reader.read_int())
+        if self.continuous_shuffle:
+            self._shoe = ContinuousShoe(decks, rng=self._rng)
+        else:
+            self._shoe = Shoe(decks, rng=self._rng, cut_card=cut_card)
+        self._shoe.restore(reader.read_blob())
+        self._player_cards = Hand(CARDS[code] for code in reader.read_blob())
+        self._dealer_cards = Hand(CARDS[code] for code in reader.read_blob())
+
+        self._last_round = None
+        outcome = reader.read_text()
+        if outcome is not None:
+            bet = reader.read_int()
+            payout = reader.read_int()
+            chips_after = reader.read_int()
+            player_cards = Hand(CARDS[code] for code in reader.read_blob())
+            dealer_cards = Hand(CARDS[code] for code in reader.read_blob())
+            self._last_round = (outcome, bet, payout, player_cards, dealer_cards, chips_after)
+
+        self.history_store = HistoryStore(
+            OUTCOMES,
+            OUTCOME_RESULTS,
+            columns=("player_total", "dealer_total"),
+            capacity=reader.read_int(),
+        )
+        self.history_store.restore(reader.read_blob())
 
     # ------------------------------------------------------------------
     def _dealer_play(self) -> None:
-        while self.dealer_total < 17:
+        while self.dealer_total < DEALER_STAND_TOTAL:
             self._dealer_cards.append(self._draw_card())
 
     def _finish_round(self, outcome: str) -> None:
         self.state = "ROUND_OVER"
         self.round_outcome = outcome
 
-        chips_before = self.chips
-        payout = 0
-        if outcome in {"player_win", "dealer_bust"}:
-            payout = self.current_bet * 2
-        elif outcome == "player_blackjack":
-            payout = self.current_bet * 2
-        elif outcome == "push":
-            payout = self.current_bet
-
+        payout = self.current_bet * PAYOUT_MULTIPLIERS.get(outcome, 0)
         self.chips += payout
-        delta = self.chips - chips_before
 
-        record: Dict = {
-            "outcome": outcome,
-            "bet": self.current_bet,
-            "delta": delta,
-            "player_cards": [card.label() for card in self._player_cards],
-            "dealer_cards": [card.label() for card in self._dealer_cards],
-            "player_total": self.player_total,
-            "dealer_total": self.dealer_total,
-            "chips_after": self.chips,
-        }
-        self.history.append(record)
+        if self._replaying_run is not False:
+            self.history_store.append(
+                outcome,
+                self.current_bet,
+                payout,
+                self.chips,
+                player_total=self.player_total,
+                dealer_total=self.dealer_total,
+            )
+        if self._replaying_run is None:
+            # The hands are replaced, never mutated, once the round is over.
+            self._last_round = (
+                outcome,
+                self.current_bet,
+                payout,
+                self._player_cards,
+                self._dealer_cards,
+                self.chips,
+            )
+            if self.on_round is not None:
+                self.on_round(outcome, self.current_bet, payout - self.current_bet, self.chips)
         self.current_bet = 0
+        if self.continuous_shuffle:
+            self._shoe.collect()
 
     def _ensure_deck(self) -> None:
-        if len(self._deck) < 15:
-            self._deck = [Card(rank=rank, suit=suit) for suit in SUITS for rank in RANKS]
-            self._rng.shuffle(self._deck)
+        if self._shoe.needs_shuffle:
+            self._shoe.shuffle()
 
     def _draw_card(self) -> Card:
-        if not self._deck:
-            self._ensure_deck()
-        return self._deck.pop()
-
-
-__all__ = ["BlackjackGame", "Card", "hand_value"]
+        return CARDS[self._shoe.draw()]
+
+
+instrumentation.instrument(Hand, "total", "blackjack.hand_total")
+instrumentation.instrument(BlackjackGame, "start_round", "blackjack.start_round")
+instrumentation.instrument(BlackjackGame, "hit", "blackjack.hit")
+instrumentation.instrument(BlackjackGame, "stand", "blackjack.stand")
+instrumentation.instrument(BlackjackGame, "_ensure_deck", "blackjack.ensure_deck")
+instrumentation.instrument(BlackjackGame, "_dealer_play", "blackjack.dealer_play")
+instrumentation.instrument(BlackjackGame, "_finish_round", "blackjack.finish_round")
+
+
+__all__ = [
+    "BlackjackGame",
+    "CARDS",
+    "Card",
+    "DEALER_STAND_TOTAL",
+    "Hand",
+    "OUTCOMES",
+    "OUTCOME_RESULTS",
+    "PAYOUT_MULTIPLIERS",
+    "RESHUFFLE_THRESHOLD",
+    "RunSummary",
+    "flat_bet",
+    "hand_value",
+    "stand_on",
+]
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+from model.blackjack import (
+    DEALER_STAND_TOTAL,
+    OUTCOMES,
+    RANK_VALUES,
+    RANKS,
+    RESHUFFLE_THRESHOLD,
+    SUITS,
+)
+
+DECK_SIZE = len(SUITS) * len(RANKS)
+
+# Card codes follow the build order of ``BlackjackGame._ensure_deck``:
+# ``code = suit_index * len(RANKS) + rank_index``.
+CODE_VALUES = np.array(
+    [RANK_VALUES[rank] for _ in SUITS for rank in RANKS], dtype=np.int8
+)
+
+OUTCOME_CODES = {outcome: code for code, outcome in enumerate(OUTCOMES)}
+# Chip delta of each outcome in units of the bet, matching ``_finish_round``.
+OUTCOME_BET_MULTIPLIERS = np.array(
+    [
+        {
+            "player_blackjack": 1,
+            "player_win": 1,
+            "dealer_bust": 1,
+            "push": 0,
+        }.get(outcome, -1)
+        for outcome in OUTCOMES
+    ],
+    dtype=np.int64,
+)
+
+
+@dataclass(frozen=True)
+class SimulationResult:
+    """Outcome of a batched blackjack simulation.
+
+    ``outcomes`` has shape ``(tables, rounds)`` and holds indices into
+    ``OUTCOMES``; ``deltas`` holds the net chip change of every round.
+    """
+
+    outcomes: np.ndarray
+    deltas: np.ndarray
+
+    @property
+    def total_rounds(self) -> int:
+        return int(self.outcomes.size)
+
+    @property
+    def outcome_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.outcomes.ravel(), minlength=len(OUTCOMES))
+        return {outcome: int(counts[code]) for code, outcome in enumerate(OUTCOMES)}
+
+    @property
+    def table_deltas(self) -> np.ndarray:
+        return self.deltas.sum(axis=1)
+
+    @property
+    def total_delta(self) -> int:
+        return int(self.deltas.sum())
+
+    def bankroll_curves(self, initial_chips: int = 0) -> np.ndarray:
+        return initial_chips + np.cumsum(self.deltas, axis=1)
+
+
+class _Shoes:
+    """One single-deck shoe per table, stored as rows of card codes."""
+
+    def __init__(self, tables: int, rng: np.random.Generator) -> None:
+        self._rng = rng
+        self.cards = np.zeros((tables, DECK_SIZE), dtype=np.int8)
+        # Every shoe starts empty, like a fresh ``BlackjackGame``.
+        self.position = np.full(tables, DECK_SIZE, dtype=np.int64)
+
+    def shuffle(self, lanes: np.ndarray) -> None:
+        if lanes.size == 0:
+            return
+        keys = self._rng.random((lanes.size, DECK_SIZE))
+        self.cards[lanes] = np.argsort(keys, axis=1).astype(np.int8)
+        self.position[lanes] = 0
+
+    def ensure(self) -> None:
+        remaining = DECK_SIZE - self.position
+        self.shuffle(np.flatnonzero(remaining < RESHUFFLE_THRESHOLD))
+
+    def draw(self, lanes: np.ndarray) -> np.ndarray:
+        self.shuffle(lanes[self.position[lanes] >= DECK_SIZE])
+        codes = self.cards[lanes, self.position[lanes]]
+        self.position[lanes] += 1
+        return CODE_VALUES[codes]
+
+
+class _Hands:
+    """Running hard totals and ace counts for one hand per table."""
+
+    def __init__(self, tables: int) -> None:
+        self.hard = np.zeros(tables, dtype=np.int64)
+        self.aces = np.zeros(tables, dtype=np.int64)
+
+    def add(self, lanes: np.ndarray, values: np.ndarray) -> None:
+        self.hard[lanes] += values
+        self.aces[lanes] += values == 1
+
+    def totals(self) -> np.ndarray:
+        soft = (self.aces > 0) & (self.hard + 10 <= 21)
+        return np.where(soft, self.hard + 10, self.hard)
+
+
+def simulate_rounds(
+    rounds: int,
+    tables: int = 1,
+    *,
+    bet: int = 1,
+    stand_on: int = DEALER_STAND_TOTAL,
+    seed: Optional[int] = None,
+) -> SimulationResult:
+    """Play ``rounds`` consecutive rounds at each of ``tables`` independent tables.
+
+    Every table follows the rules of ``BlackjackGame`` with its own single-deck
+    shoe; the player hits while their total is below ``stand_on``.
+    """
+
+    if rounds <= 0:
+        raise ValueError("rounds must be a positive integer")
+    if tables <= 0:
+        raise ValueError("tables must be a positive integer")
+    if bet <= 0:
+        raise ValueError("Bet must be a positive integer")
+    if not 2 <= stand_on <= 21:
+        raise ValueError("stand_on must be between 2 and 21")
+
+    shoes = _Shoes(tables, np.random.default_rng(seed))
+    outcomes = np.empty((tables, rounds), dtype=np.int8)
+    all_lanes = np.arange(tables)
+
+    for round_index in range(rounds):
+        outcomes[:, round_index] = _play_round(shoes, all_lanes, stand_on)
+
+    deltas = OUTCOME_BET_MULTIPLIERS[outcomes] * bet
+    return SimulationResult(outcomes=outcomes, deltas=deltas)
+
+
+def _play_round(shoes: _Shoes, lanes: np.ndarray, stand_on: int) -> np.ndarray:
+    tables = lanes.size
+    player = _Hands(tables)
+    dealer = _Hands(tables)
+    outcome = np.full(tables, -1, dtype=np.int8)
+
+    shoes.ensure()
+    # Same dealing order as ``start_round``: two player cards, then two dealer cards.
+    player.add(lanes, shoes.draw(lanes))
+    player.add(lanes, shoes.draw(lanes))
+    dealer.add(lanes, shoes.draw(lanes))
+    dealer.add(lanes, shoes.draw(lanes))
+
+    player_natural = player.totals() == 21
+    dealer_natural = dealer.totals() == 21
+    outcome[player_natural & dealer_natural] = OUTCOME_CODES["push"]
+    outcome[player_natural & ~dealer_natural] = OUTCOME_CODES["player_blackjack"]
+    outcome[~player_natural & dealer_natural] = OUTCOME_CODES["dealer_blackjack"]
+
+    while True:
+        hitting = np.flatnonzero((outcome < 0) & (player.totals() < stand_on))
+        if hitting.size == 0:
+            break
+        player.add(hitting, shoes.draw(hitting))
+    player_totals = player.totals()
+    outcome[(outcome < 0) & (player_totals > 21)] = OUTCOME_CODES["player_bust"]
+
+    while True:
+        drawing = np.flatnonzero((outcome < 0) & (dealer.totals() < DEALER_STAND_TOTAL))
+        if drawing.size == 0:
+            break
+        dealer.add(drawing, shoes.draw(drawing))
+    dealer_totals = dealer.totals()
+
+    standing = outcome < 0
+    outcome[standing & (dealer_totals > 21)] = OUTCOME_CODES["dealer_bust"]
+    standing = outcome < 0
+    outcome[standing & (dealer_totals > player_totals)] = OUTCOME_CODES["dealer_win"]
+    outcome[standing & (dealer_totals < player_totals)] = OUTCOME_CODES["player_win"]
+    outcome[standing & (dealer_totals == player_totals)] = OUTCOME_CODES["push"]
+    return outcome
+
+
+__all__ = ["OUTCOME_CODES", "SimulationResult", "simulate_rounds"]
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from array import array
+from functools import lru_cache
+from typing import Dict, Sequence, Tuple
+
+from model.blackjack import DEALER_STAND_TOTAL, BlackjackGame
+
+DEALER_RESULTS = ("17", "18", "19", "20", "21", "bust")
+# Compositions count the cards per value: index 0 is the ace, index 9 the ten-valued ranks.
+VALUE_COUNT = 10
+# Keys hold unsigned 16-bit counts: one byte per value overflowed from 16 decks on.
+_KEY_TYPE = "H"
+
+Distribution = Tuple[float, ...]
+
+
+def composition_key(counts: Sequence[int]) -> bytes:
+    """Compact cache signature of a composition, two bytes per card value."""
+
+    if len(counts) != VALUE_COUNT:
+        raise ValueError("Composition must hold one count per card value (A, 2-10)")
+    try:
+        return array(_KEY_TYPE, counts).tobytes()
+    except OverflowError as exc:
+        raise ValueError("Card counts must be between 0 and 65535") from exc
+
+
+def dealer_final_distribution(
+    upcard_value: int,
+    counts: Sequence[int],
+    refill: Sequence[int],
+    no_blackjack: bool = False,
+) -> Dict[str, float]:
+    """Exact probabilities of the dealer's final total.
+
+    ``counts`` is the composition of the unseen cards, hole card included, and
+    ``refill`` the composition of a fresh shoe, dealt from if the shoe runs out
+    mid-hand. With ``no_blackjack`` the hole card is conditioned on the dealer
+    not holding a natural, which the player knows once their turn has started.
+    """
+
+    if not 1 <= upcard_value <= VALUE_COUNT:
+        raise ValueError("upcard_value must be between 1 and 10")
+
+    refill_key = composition_key(refill)
+    key = composition_key(counts)
+    if not any(key):
+        key = refill_key
+
+    totals = [0.0] * len(DEALER_RESULTS)
+    weight = 0
+    for index, count in enumerate(_counts(key)):
+        value = index + 1
+        if count == 0 or (no_blackjack and {upcard_value, value} == {1, 10}):
+            continue
+        weight += count
+        branch = _resolve(
+            upcard_value + value, 1 in (upcard_value, value), _after_draw(key, index), refill_key
+        )
+        for slot, probability in enumerate(branch):
+            totals[slot] += count * probability
+
+    if weight == 0:
+        raise ValueError("No hole card is possible for this composition")
+    return {result: total / weight for result, total in zip(DEALER_RESULTS, totals)}
+
+
+def dealer_odds(game: BlackjackGame) -> Dict[str, float]:
+    """Dealer final-total probabilities as seen by the player of ``game``."""
+
+    upcard = game.dealer_upcard
+    if not game.is_player_turn or upcard is None:
+        raise RuntimeError("Dealer odds are only available during the player turn")
+    return dealer_final_distribution(
+        upcard.base_value,
+        game.unseen_composition,
+        game.fresh_shoe_composition,
+        no_blackjack=True,
+    )
+
+
+def clear_cache() -> None:
+    _resolve.cache_clear()
+
+
+@lru_cache(maxsize=1 << 16)
+def _resolve(hard_total: int, has_ace: bool, key: bytes, refill_key: bytes) -> Distribution:
+    total = hard_total + 10 if has_ace and hard_total + 10 <= 21 else hard_total
+    result = [0.0] * len(DEALER_RESULTS)
+    if total > 21:
+        result[-1] = 1.0
+        return tuple(result)
+    if total >= DEALER_STAND_TOTAL:
+        result[total - DEALER_STAND_TOTAL] = 1.0
+        return tuple(result)
+
+    if not any(key):
+        key = refill_key
+    counts = _counts(key)
+    remaining = sum(counts)
+    for index, count in enumerate(counts):
+        if count == 0:
+            continue
+        branch = _resolve(
+            hard_total + index + 1, has_ace or index == 0, _after_draw(key, index), refill_key
+        )
+        for slot, probability in enumerate(branch):
+            result[slot] += count * probability
+    return tuple(value / remaining for value in result)
+
+
+def _counts(key: bytes) -> memoryview:
+    return memoryview(key).cast(_KEY_TYPE)
+
+
+def _after_draw(key: bytes, index: int) -> bytes:
+    counts = array(_KEY_TYPE, key)
+    counts[index] -= 1
+    return counts.tobytes()
+
+
+__all__ = [
+    "DEALER_RESULTS",
+    "clear_cache",
+    "composition_key",
+    "dealer_final_distribution",
+    "dealer_odds",
+]
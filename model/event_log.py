@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import struct
+from typing import Iterator, List, Optional, Tuple
+
+# Action codes. SEED, BET and RUN carry an argument; RESHUFFLE is informational
+# and marks where the shoe was reshuffled relative to the surrounding actions.
+# RUN ... RUN_END encloses the rounds of one ``run_rounds`` call; its argument
+# is 1 if those rounds were added to the history, 0 if not.
+SEED = 1
+BET = 2
+HIT = 3
+STAND = 4
+NEXT = 5
+RESET_SHOE = 6
+RESHUFFLE = 7
+RUN = 8
+RUN_END = 9
+
+EVENT_NAMES = {
+    SEED: "seed",
+    BET: "bet",
+    HIT: "hit",
+    STAND: "stand",
+    NEXT: "next",
+    RESET_SHOE: "reset_shoe",
+    RESHUFFLE: "reshuffle",
+    RUN: "run",
+    RUN_END: "run_end",
+}
+
+_HEADER = struct.Struct("<4sqqq?")
+_MAGIC = b"BJE2"
+_SEED = struct.Struct("<Q")
+
+Event = Tuple[int, Optional[int]]
+
+
+class EventLog:
+    """Append-only log of blackjack actions, one byte per action.
+
+    Together with the table settings in the header, the log is enough to
+    rebuild any past state of a game with ``BlackjackGame.replay``.
+    """
+
+    def __init__(self, initial_chips: int, decks: int, cut_card: int, continuous: bool = False) -> None:
+        self.initial_chips = initial_chips
+        self.decks = decks
+        self.cut_card = cut_card
+        self.continuous = continuous
+        self._data = bytearray()
+
+    # ------------------------------------------------------------------
+    def seed(self, seed: int) -> None:
+        self._data.append(SEED)
+        self._data += _SEED.pack(seed)
+
+    def bet(self, amount: int) -> None:
+        self._data.append(BET)
+        _write_varint(self._data, amount)
+
+    def run(self, record_history: bool) -> None:
+        self._data.append(RUN)
+        _write_varint(self._data, int(record_history))
+
+    def append(self, code: int) -> None:
+        if code in (SEED, BET, RUN) or code not in EVENT_NAMES:
+            raise ValueError(f"Invalid event code {code}")
+        self._data.append(code)
+
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __iter__(self) -> Iterator[Event]:
+        data = self._data
+        offset = 0
+        while offset < len(data):
+            code = data[offset]
+            offset += 1
+            argument: Optional[int] = None
+            if code == SEED:
+                argument = _SEED.unpack_from(data, offset)[0]
+                offset += _SEED.size
+            elif code in (BET, RUN):
+                argument, offset = _read_varint(data, offset)
+            elif code not in EVENT_NAMES:
+                raise ValueError(f"Corrupt event log: unknown code {code} at byte {offset - 1}")
+            yield code, argument
+
+    def describe(self) -> List[str]:
+        """Human readable events, e.g. for bug reports."""
+
+        return [
+            EVENT_NAMES[code] if argument is None else f"{EVENT_NAMES[code]} {argument}"
+            for code, argument in self
+        ]
+
+    @property
+    def nbytes(self) -> int:
+        return _HEADER.size + len(self._data)
+
+    def to_bytes(self) -> bytes:
+        header = _HEADER.pack(_MAGIC, self.initial_chips, self.decks, self.cut_card, self.continuous)
+        return header + bytes(self._data)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "EventLog":
+        if len(data) < _HEADER.size:
+            raise ValueError("Event log is truncated")
+        magic, initial_chips, decks, cut_card, continuous = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError("Not a blackjack event log")
+        log = cls(initial_chips, decks, cut_card, continuous)
+        log._data = bytearray(data[_HEADER.size :])
+        return log
+
+
+def _write_varint(buffer: bytearray, value: int) -> None:
+    if value < 0:
+        raise ValueError("Event arguments must not be negative")
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(data: bytearray, offset: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        if offset >= len(data):
+            raise ValueError("Corrupt event log: truncated argument")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+__all__ = ["EVENT_NAMES", "EventLog"]
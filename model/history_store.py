@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+from array import array
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from model.snapshot import SnapshotReader, SnapshotWriter, pack_int_array, unpack_int_array
+
+Row = Dict[str, Union[int, str]]
+
+
+class HistoryStore:
+    """Recent rounds kept in fixed-width columns, with running aggregates.
+
+    Once ``capacity`` rows are stored the oldest row is overwritten, so memory
+    stays constant however long a session runs. The aggregates cover every
+    round appended since the last ``clear`` and are updated in O(1).
+    """
+
+    BASE_COLUMNS = ("outcome", "bet", "delta", "chips_after")
+    _COUNTERS = (
+        "initial_chips",
+        "total_rounds",
+        "wins",
+        "losses",
+        "pushes",
+        "current_streak",
+        "longest_win_streak",
+        "longest_loss_streak",
+        "chips",
+        "peak_chips",
+        "max_drawdown",
+    )
+
+    def __init__(
+        self,
+        outcomes: Sequence[str],
+        results: Mapping[str, int],
+        columns: Sequence[str] = (),
+        capacity: int = 1000,
+        initial_chips: int = 0,
+    ) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be a positive integer")
+        unknown = set(results) - set(outcomes)
+        if unknown:
+            raise ValueError(f"Results given for unknown outcomes: {sorted(unknown)}")
+
+        self.outcomes = tuple(outcomes)
+        self.columns = self.BASE_COLUMNS + tuple(columns)
+        self.capacity = capacity
+        self._outcome_codes = {outcome: code for code, outcome in enumerate(self.outcomes)}
+        # +1 for a won round, -1 for a lost one, 0 for a push or draw.
+        self._results = tuple(results.get(outcome, 0) for outcome in self.outcomes)
+        self._data: Dict[str, array] = {}
+        for name in self.columns:
+            column = array("b" if name == "outcome" else "q")
+            column.frombytes(bytes(capacity * column.itemsize))
+            self._data[name] = column
+        # Bumped by every ``clear`` and ``restore`` so that derived views notice.
+        self.generation = 0
+        self.clear(initial_chips)
+
+    # ------------------------------------------------------------------
+    def clear(self, initial_chips: int = 0) -> None:
+        self.generation += 1
+        self.initial_chips = initial_chips
+        self.total_rounds = 0
+        self.wins = 0
+        self.losses = 0
+        self.pushes = 0
+        self.current_streak = 0
+        self.longest_win_streak = 0
+        self.longest_loss_streak = 0
+        self.chips = initial_chips
+        self.peak_chips = initial_chips
+        self.max_drawdown = 0
+        self._outcome_counts = [0] * len(self.outcomes)
+
+    def append(self, outcome: str, bet: int, delta: int, chips_after: int, **values: int) -> None:
+        try:
+            code = self._outcome_codes[outcome]
+        except KeyError as exc:
+            raise ValueError(f"Unknown outcome '{outcome}'") from exc
+
+        slot = self.total_rounds % self.capacity
+        data = self._data
+        data["outcome"][slot] = code
+        data["bet"][slot] = bet
+        data["delta"][slot] = delta
+        data["chips_after"][slot] = chips_after
+        for name in self.columns[len(self.BASE_COLUMNS) :]:
+            data[name][slot] = values.get(name, 0)
+
+        self.total_rounds += 1
+        self._outcome_counts[code] += 1
+        result = self._results[code]
+        if result > 0:
+            self.wins += 1
+            self.current_streak = self.current_streak + 1 if self.current_streak > 0 else 1
+            self.longest_win_streak = max(self.longest_win_streak, self.current_streak)
+        elif result < 0:
+            self.losses += 1
+            self.current_streak = self.current_streak - 1 if self.current_streak < 0 else -1
+            self.longest_loss_streak = max(self.longest_loss_streak, -self.current_streak)
+        else:
+            self.pushes += 1
+            self.current_streak = 0
+
+        self.chips = chips_after
+        if chips_after > self.peak_chips:
+            self.peak_chips = chips_after
+        elif self.peak_chips - chips_after > self.max_drawdown:
+            self.max_drawdown = self.peak_chips - chips_after
+
+    # ------------------------------------------------------------------
+    @property
+    def net(self) -> int:
+        return self.chips - self.initial_chips
+
+    @property
+    def win_rate(self) -> float:
+        if not self.total_rounds:
+            return 0.0
+        return self.wins / self.total_rounds
+
+    @property
+    def results(self) -> Tuple[int, ...]:
+        """+1, -1 or 0 for each outcome code, as given by ``results``."""
+
+        return self._results
+
+    @property
+    def outcome_counts(self) -> Dict[str, int]:
+        return dict(zip(self.outcomes, self._outcome_counts))
+
+    def __len__(self) -> int:
+        return min(self.total_rounds, self.capacity)
+
+    def rows(self, limit: Optional[int] = None, newest_first: bool = False) -> Iterator[Row]:
+        """Yield stored rounds as dicts; ``number`` is the 1-based round number."""
+
+        count = len(self) if limit is None else min(limit, len(self))
+        first = self.total_rounds - count
+        numbers: Sequence[int] = range(first, self.total_rounds)
+        if newest_first:
+            numbers = numbers[::-1]
+        for number in numbers:
+            yield self._row(number)
+
+    def row(self, number: int) -> Row:
+        """The round with 1-based ``number``, if it is still stored."""
+
+        if not self.total_rounds - len(self) < number <= self.total_rounds:
+            raise IndexError(f"Round {number} is not stored")
+        return self._row(number - 1)
+
+    def last(self) -> Optional[Row]:
+        if not self.total_rounds:
+            return None
+        return self._row(self.total_rounds - 1)
+
+    def column(self, name: str) -> List[int]:
+        """Stored values of one column, oldest first."""
+
+        values = self._data[name]
+        first = self.total_rounds - len(self)
+        return [values[number % self.capacity] for number in range(first, self.total_rounds)]
+
+    def tail(self, name: str, count: int) -> array:
+        """The last ``count`` stored values of one column, oldest first, in O(count)."""
+
+        count = min(count, len(self))
+        values = self._data[name]
+        end = self.total_rounds % self.capacity
+        if count <= end:
+            return values[end - count : end]
+        return values[end - count :] + values[:end]
+
+    # ------------------------------------------------------------------
+    def snapshot(self) -> bytes:
+        """Aggregates plus the filled part of every column, as compact bytes."""
+
+        writer = SnapshotWriter(b"history")
+        writer.write_int(self.capacity)
+        for name in self._COUNTERS:
+            writer.write_int(getattr(self, name))
+        writer.write_blob(pack_int_array(self._outcome_counts))
+        stored = len(self)
+        for name in self.columns:
+            writer.write_blob(self._data[name][:stored].tobytes())
+        return writer.getvalue()
+
+    def restore(self, data: bytes) -> None:
+        reader = SnapshotReader(data, b"history")
+        if reader.read_int() != self.capacity:
+            raise ValueError("Snapshot was taken with a different history capacity")
+        for name in self._COUNTERS:
+            setattr(self, name, reader.read_int())
+        counts = list(unpack_int_array(reader.read_blob()))
+        if len(counts) != len(self.outcomes):
+            raise ValueError("Snapshot was taken with different outcomes")
+        self._outcome_counts = counts
+        self.generation += 1
+        for name in self.columns:
+            column = self._data[name]
+            values = unpack_int_array(reader.read_blob(), column.typecode)
+            column[: len(values)] = values
+
+    def _row(self, number: int) -> Row:
+        slot = number % self.capacity
+        row: Row = {"number": number + 1}
+        for name in self.columns:
+            value = self._data[name][slot]
+            row[name] = self.outcomes[value] if name == "outcome" else value
+        return row
+
+
+__all__ = ["HistoryStore"]
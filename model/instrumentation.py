@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from functools import wraps
+from typing import Callable, Dict, List, Tuple
+
+# Set to a non-empty value to start every process with instrumentation on.
+ENV_VARIABLE = "CARD_GAMES_INSTRUMENT"
+
+
+class Metric:
+    """Call count and cumulative wall time of one instrumented operation."""
+
+    __slots__ = ("calls", "seconds")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.seconds = 0.0
+
+
+# Instrumentation is off by default and then costs nothing: the hot methods are
+# only swapped for timing wrappers while it is enabled, and restored afterwards.
+_enabled = False
+_metrics: Dict[str, Metric] = {}
+_targets: List[Tuple[type, str, str]] = []
+_originals: Dict[Tuple[type, str], object] = {}
+_lock = threading.Lock()
+
+
+def instrument(owner: type, attribute: str, name: str) -> None:
+    """Register the method or property ``owner.attribute`` under metric ``name``."""
+
+    with _lock:
+        _targets.append((owner, attribute, name))
+        if _enabled:
+            _patch(owner, attribute, name)
+
+
+def enable() -> None:
+    global _enabled
+    with _lock:
+        if _enabled:
+            return
+        for owner, attribute, name in _targets:
+            _patch(owner, attribute, name)
+        _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    with _lock:
+        for (owner, attribute), original in _originals.items():
+            setattr(owner, attribute, original)
+        _originals.clear()
+        _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def record(name: str, seconds: float) -> None:
+    """Add one timed observation, e.g. a page render; ignored while disabled."""
+
+    if _enabled:
+        metric = _metric(name)
+        metric.calls += 1
+        metric.seconds += seconds
+
+
+def reset() -> None:
+    with _lock:
+        for metric in _metrics.values():
+            metric.calls = 0
+            metric.seconds = 0.0
+
+
+def report() -> List[Dict]:
+    """One row per metric that has been hit, slowest in total first."""
+
+    rows = [
+        {
+            "name": name,
+            "calls": metric.calls,
+            "total_ms": metric.seconds * 1000,
+            "mean_us": metric.seconds / metric.calls * 1e6,
+        }
+        for name, metric in _metrics.items()
+        if metric.calls
+    ]
+    rows.sort(key=lambda row: row["total_ms"], reverse=True)
+    return rows
+
+
+def to_json() -> str:
+    return json.dumps({"enabled": _enabled, "metrics": report()}, indent=2)
+
+
+# ----------------------------------------------------------------------
+def _metric(name: str) -> Metric:
+    metric = _metrics.get(name)
+    if metric is None:
+        metric = _metrics.setdefault(name, Metric())
+    return metric
+
+
+def _timed(function: Callable, metric: Metric) -> Callable:
+    clock = time.perf_counter
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            metric.seconds += clock() - start
+            metric.calls += 1
+
+    return wrapper
+
+
+def _patch(owner: type, attribute: str, name: str) -> None:
+    original = owner.__dict__[attribute]
+    metric = _metric(name)
+    if isinstance(original, property):
+        replacement: object = property(_timed(original.fget, metric), original.fset, original.fdel, original.__doc__)
+    else:
+        replacement = _timed(original, metric)
+    _originals[(owner, attribute)] = original
+    setattr(owner, attribute, replacement)
+
+
+if os.environ.get(ENV_VARIABLE):
+    enable()
+
+
+__all__ = ["Metric", "disable", "enable", "instrument", "is_enabled", "record", "report", "reset", "to_json"]
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from model.blackjack import OUTCOMES, BetPolicy, BlackjackGame, PlayPolicy
+
+# Shards when none are given. Fixed rather than derived from the CPU count, so
+# the same master seed gives the same result on every machine.
+DEFAULT_SHARDS = 16
+
+
+@dataclass(frozen=True)
+class ShardResult:
+    """Statistics of the rounds one shard played at its own table."""
+
+    shard: int
+    seed: int
+    rounds_played: int
+    outcome_counts: Dict[str, int]
+    initial_chips: int
+    final_chips: int
+    max_drawdown: int
+    # Sum and sum of squares of the per-round chip changes, for merging variances.
+    delta_sum: int
+    delta_square_sum: int
+
+    @property
+    def net(self) -> int:
+        return self.final_chips - self.initial_chips
+
+
+@dataclass(frozen=True)
+class ParallelResult:
+    """Merged statistics of a sharded simulation, shards in index order."""
+
+    master_seed: int
+    shards: Tuple[ShardResult, ...]
+
+    @property
+    def rounds_played(self) -> int:
+        return sum(shard.rounds_played for shard in self.shards)
+
+    @property
+    def outcome_counts(self) -> Dict[str, int]:
+        counts = dict.fromkeys(OUTCOMES, 0)
+        for shard in self.shards:
+            for outcome, count in shard.outcome_counts.items():
+                counts[outcome] += count
+        return counts
+
+    @property
+    def net(self) -> int:
+        return sum(shard.net for shard in self.shards)
+
+    @property
+    def max_drawdown(self) -> int:
+        return max((shard.max_drawdown for shard in self.shards), default=0)
+
+    @property
+    def mean_delta(self) -> float:
+        if not self.rounds_played:
+            return 0.0
+        return sum(shard.delta_sum for shard in self.shards) / self.rounds_played
+
+    @property
+    def delta_std(self) -> float:
+        rounds = self.rounds_played
+        if rounds < 2:
+            return 0.0
+        square_sum = sum(shard.delta_square_sum for shard in self.shards)
+        variance = (square_sum - rounds * self.mean_delta**2) / (rounds - 1)
+        return math.sqrt(max(variance, 0.0))
+
+
+def shard_seeds(master_seed: int, shards: int) -> List[int]:
+    """Independent, reproducible 128-bit seeds for each shard."""
+
+    children = np.random.SeedSequence(master_seed).spawn(shards)
+    return [int.from_bytes(child.generate_state(4, np.uint32).tobytes(), "little") for child in children]
+
+
+def simulate_parallel(
+    rounds: int,
+    policy: PlayPolicy,
+    bet_policy: BetPolicy,
+    master_seed: int = 0,
+    shards: int = DEFAULT_SHARDS,
+    max_workers: Optional[int] = None,
+    initial_chips: int = 1000,
+    decks: int = 1,
+) -> ParallelResult:
+    """Split ``rounds`` over ``shards`` independent tables run in worker processes.
+
+    Results depend only on ``master_seed`` and the shard count, never on the
+    number of workers. Policies must be picklable: module-level functions,
+    ``functools.partial`` objects or methods of picklable objects such as
+    ``StrategyTable.action``.
+    """
+
+    if rounds < 0:
+        raise ValueError("rounds must not be negative")
+    if shards <= 0:
+        raise ValueError("shards must be a positive integer")
+    workers = max_workers or os.cpu_count() or 1
+
+    base, extra = divmod(rounds, shards)
+    tasks = [
+        (index, seed, base + (1 if index < extra else 0), policy, bet_policy, initial_chips, decks)
+        for index, seed in enumerate(shard_seeds(master_seed, shards))
+    ]
+
+    if workers == 1 or shards == 1:
+        results = [_run_shard(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, shards)) as executor:
+            results = list(executor.map(_run_shard, tasks))
+    return ParallelResult(master_seed=master_seed, shards=tuple(results))
+
+
+def _run_shard(task: Tuple) -> ShardResult:
+    index, seed, rounds, policy, bet_policy, initial_chips, decks = task
+    game = BlackjackGame(initial_chips=initial_chips, rng=random.Random(seed), decks=decks)
+    summary = game.run_rounds(rounds, policy, bet_policy)
+
+    chips = np.frombuffer(summary.chips_trajectory, dtype=np.int64)
+    deltas = np.diff(chips, prepend=initial_chips)
+    return ShardResult(
+        shard=index,
+        seed=seed,
+        rounds_played=summary.rounds_played,
+        outcome_counts=summary.outcome_counts,
+        initial_chips=initial_chips,
+        final_chips=summary.final_chips,
+        max_drawdown=summary.max_drawdown,
+        delta_sum=int(deltas.sum()),
+        delta_square_sum=int(np.square(deltas).sum()),
+    )
+
+
+__all__ = ["DEFAULT_SHARDS", "ParallelResult", "ShardResult", "shard_seeds", "simulate_parallel"]
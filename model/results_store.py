@@ -0,0 +1,292 @@
+"""Round results of every player, persisted across sessions in SQLite.
+
+Games report each finished round through their ``on_round`` callback; bind one
+with ``ResultsStore.recorder``. ``record`` only queues the row in memory. A
+background thread writes the queue in batched transactions to a WAL-mode
+database, so a round never waits for the disk.
+
+Alongside the raw ``rounds`` table the writer keeps a ``totals`` row per
+player and game, updated in the same transaction. Leaderboards and player
+stats read those rows through indexes, so they cost the same with millions of
+stored rounds. Queries see rows once they are written, at most
+``flush_interval`` seconds after the round; call ``flush`` to wait for them.
+"""
+
+from __future__ import annotations
+
+import atexit
+import sqlite3
+import threading
+import time
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from model.blackjack import OUTCOME_RESULTS as BLACKJACK_RESULTS
+from model.High_and_Low import OUTCOME_RESULTS as HIGHLOW_RESULTS
+
+DB_PATH = Path(__file__).resolve().parent.parent / ".cache" / "results.sqlite3"
+
+# +1 for a won round, -1 for a lost one, 0 for a push or draw, per game.
+GAME_RESULTS: Dict[str, Dict[str, int]] = {
+    "blackjack": BLACKJACK_RESULTS,
+    "highlow": HIGHLOW_RESULTS,
+}
+LEADERBOARD_ORDERS = ("net", "best_chips")
+
+Row = Tuple[str, str, str, int, int, int, float]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rounds (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    game TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    bet INTEGER NOT NULL,
+    net INTEGER NOT NULL,
+    chips_after INTEGER NOT NULL,
+    played_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS rounds_by_player ON rounds (player, game, id);
+CREATE TABLE IF NOT EXISTS totals (
+    player TEXT NOT NULL,
+    game TEXT NOT NULL,
+    rounds INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    losses INTEGER NOT NULL,
+    pushes INTEGER NOT NULL,
+    net INTEGER NOT NULL,
+    wagered INTEGER NOT NULL,
+    best_chips INTEGER NOT NULL,
+    last_played REAL NOT NULL,
+    PRIMARY KEY (player, game)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS totals_by_net ON totals (game, net DESC);
+CREATE INDEX IF NOT EXISTS totals_by_best_chips ON totals (game, best_chips DESC);
+"""
+
+_INSERT_ROUND = (
+    "INSERT INTO rounds (player, game, outcome, bet, net, chips_after, played_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+_UPSERT_TOTALS = """
+INSERT INTO totals (player, game, rounds, wins, losses, pushes, net, wagered, best_chips, last_played)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (player, game) DO UPDATE SET
+    rounds = rounds + excluded.rounds,
+    wins = wins + excluded.wins,
+    losses = losses + excluded.losses,
+    pushes = pushes + excluded.pushes,
+    net = net + excluded.net,
+    wagered = wagered + excluded.wagered,
+    best_chips = max(best_chips, excluded.best_chips),
+    last_played = max(last_played, excluded.last_played)
+"""
+_TOTAL_COLUMNS = (
+    "player",
+    "game",
+    "rounds",
+    "wins",
+    "losses",
+    "pushes",
+    "net",
+    "wagered",
+    "best_chips",
+    "last_played",
+)
+
+
+class ResultsStore:
+    """Queues round results and writes them to SQLite from a background thread.
+
+    The queue is written once it holds ``batch_size`` rows or has waited
+    ``flush_interval`` seconds, whichever comes first.
+    """
+
+    def __init__(self, path: Path = DB_PATH, batch_size: int = 500, flush_interval: float = 1.0) -> None:
+        if batch_size <= 0:
+            raise ValueError("batch_size must be a positive integer")
+
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._reader = _connect(self.path)
+        self._reader.executescript(_SCHEMA)
+        self._read_lock = threading.Lock()
+
+        self._pending: List[Row] = []
+        self._queued = 0
+        self._written = 0
+        self._closing = False
+        self._flush_requested = False
+        self._error: Optional[sqlite3.Error] = None
+        self._condition = threading.Condition()
+        self._writer = threading.Thread(target=self._run, name="results-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    # ------------------------------------------------------------------
+    def record(self, player: str, game: str, outcome: str, bet: int, net: int, chips_after: int) -> None:
+        """Queue one finished round; returns without touching the disk."""
+
+        results = GAME_RESULTS.get(game)
+        if results is None:
+            raise ValueError(f"Unknown game '{game}'")
+        if outcome not in results:
+            raise ValueError(f"Unknown outcome '{outcome}'")
+        if not player:
+            raise ValueError("player must not be empty")
+
+        row = (player, game, outcome, bet, net, chips_after, time.time())
+        with self._condition:
+            if self._closing:
+                raise RuntimeError("The results store is closed")
+            self._pending.append(row)
+            self._queued += 1
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify_all()
+
+    def recorder(self, player: str, game: str) -> Callable[[str, int, int, int], None]:
+        """Callback for a game's ``on_round`` that records as ``player``."""
+
+        if game not in GAME_RESULTS:
+            raise ValueError(f"Unknown game '{game}'")
+        return partial(self.record, player, game)
+
+    def flush(self) -> None:
+        """Block until every round queued so far is written."""
+
+        with self._condition:
+            target = self._queued
+            self._flush_requested = True
+            self._condition.notify_all()
+            while self._written < target and self._writer.is_alive():
+                self._condition.wait()
+            if self._error is not None:
+                raise RuntimeError(f"Writing results failed: {self._error}")
+
+    def close(self) -> None:
+        """Write what is still queued and stop the writer thread."""
+
+        with self._condition:
+            if self._closing:
+                return
+            self._closing = True
+            self._condition.notify_all()
+        self._writer.join()
+        with self._read_lock:
+            self._reader.close()
+        atexit.unregister(self.close)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    # ------------------------------------------------------------------
+    def leaderboard(self, game: str, limit: int = 10, order: str = "net") -> List[Dict]:
+        """Top ``limit`` players of ``game`` by total ``net`` or ``best_chips``."""
+
+        if order not in LEADERBOARD_ORDERS:
+            raise ValueError(f"order must be one of {LEADERBOARD_ORDERS}")
+        query = f"SELECT * FROM totals WHERE game = ? ORDER BY {order} DESC LIMIT ?"
+        with self._read_lock:
+            rows = self._reader.execute(query, (game, limit)).fetchall()
+        return [_totals(row) for row in rows]
+
+    def player_stats(self, player: str, game: str) -> Optional[Dict]:
+        """Totals of ``player`` in ``game`` with win rate and rank, or ``None``."""
+
+        with self._read_lock:
+            row = self._reader.execute(
+                "SELECT * FROM totals WHERE player = ? AND game = ?", (player, game)
+            ).fetchone()
+            if row is None:
+                return None
+            stats = _totals(row)
+            (better,) = self._reader.execute(
+                "SELECT COUNT(*) FROM totals WHERE game = ? AND net > ?", (game, stats["net"])
+            ).fetchone()
+        stats["rank"] = better + 1
+        return stats
+
+    def recent_rounds(self, player: str, game: str, limit: int = 20) -> List[Dict]:
+        """The latest ``limit`` stored rounds of ``player`` in ``game``, newest first."""
+
+        with self._read_lock:
+            rows = self._reader.execute(
+                "SELECT outcome, bet, net, chips_after, played_at FROM rounds "
+                "WHERE player = ? AND game = ? ORDER BY id DESC LIMIT ?",
+                (player, game, limit),
+            ).fetchall()
+        return [
+            {"outcome": outcome, "bet": bet, "net": net, "chips_after": chips_after, "played_at": played_at}
+            for outcome, bet, net, chips_after, played_at in rows
+        ]
+
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        connection = _connect(self.path)
+        try:
+            while True:
+                with self._condition:
+                    if len(self._pending) < self.batch_size and not (self._closing or self._flush_requested):
+                        self._condition.wait(self.flush_interval)
+                    batch, self._pending = self._pending, []
+                    self._flush_requested = False
+                    closing = self._closing
+                if batch:
+                    try:
+                        _write(connection, batch)
+                    except sqlite3.Error as exc:
+                        # The batch is dropped; flush reports the failure.
+                        self._error = exc
+                with self._condition:
+                    self._written += len(batch)
+                    self._condition.notify_all()
+                if closing and not self._pending:
+                    break
+        finally:
+            connection.close()
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # With WAL, NORMAL only risks the last transactions on power loss, never corruption.
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute("PRAGMA busy_timeout=5000")
+    return connection
+
+
+def _write(connection: sqlite3.Connection, batch: List[Row]) -> None:
+    totals: Dict[Tuple[str, str], List] = {}
+    for player, game, outcome, bet, net, chips_after, played_at in batch:
+        entry = totals.get((player, game))
+        if entry is None:
+            entry = totals[(player, game)] = [player, game, 0, 0, 0, 0, 0, 0, chips_after, played_at]
+        result = GAME_RESULTS[game][outcome]
+        entry[2] += 1
+        entry[3 if result > 0 else 4 if result < 0 else 5] += 1
+        entry[6] += net
+        entry[7] += bet
+        entry[8] = max(entry[8], chips_after)
+        entry[9] = played_at
+
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        connection.executemany(_INSERT_ROUND, batch)
+        connection.executemany(_UPSERT_TOTALS, totals.values())
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    connection.execute("COMMIT")
+
+
+def _totals(row: Tuple) -> Dict:
+    stats = dict(zip(_TOTAL_COLUMNS, row))
+    stats["win_rate"] = stats["wins"] / stats["rounds"] if stats["rounds"] else 0.0
+    return stats
+
+
+__all__ = ["DB_PATH", "GAME_RESULTS", "ResultsStore"]
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import os
+import re
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Protocol, Tuple
+
+SPILL_DIR = Path(__file__).resolve().parent.parent / ".cache" / "sessions"
+
+_SESSION_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class SnapshotGame(Protocol):
+    def snapshot(self) -> bytes: ...
+
+    def restore(self, data: bytes) -> None: ...
+
+
+class SessionStore:
+    """Keeps recently used games in memory and spills idle ones to disk.
+
+    At most ``max_live`` games stay in memory, in least-recently-used order.
+    Games idle for longer than ``idle_seconds`` are written to ``directory``
+    as compressed snapshots and rebuilt by ``get`` on the next interaction.
+
+    A snapshot only captures the game as it is when it is spilled, so a game
+    that is still being changed must not be spilled. Take it with ``checkout``
+    for as long as it is used; checked-out games are never spilled, and the
+    store may exceed ``max_live`` until they are returned.
+
+    Snapshots are taken under the store's lock but compressed and written
+    after it is released, so one session's disk I/O never holds up another's
+    checkout. Snapshot files untouched for ``max_spill_age`` seconds belong to
+    abandoned sessions and are deleted by ``spill_idle``.
+    """
+
+    def __init__(
+        self,
+        directory: Path = SPILL_DIR,
+        max_live: int = 64,
+        idle_seconds: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+        max_spill_age: float = 7 * 24 * 3600.0,
+    ) -> None:
+        if max_live <= 0:
+            raise ValueError("max_live must be a positive integer")
+
+        self.directory = Path(directory)
+        self.max_live = max_live
+        self.idle_seconds = idle_seconds
+        self.max_spill_age = max_spill_age
+        self._clock = clock
+        self._live: "OrderedDict[str, Tuple[SnapshotGame, float]]" = OrderedDict()
+        # Open checkouts per session id.
+        self._in_use: Dict[str, int] = {}
+        # Snapshots taken but not yet on disk; ``get`` rehydrates from these first.
+        self._unwritten: Dict[str, bytes] = {}
+        self._next_cleanup = clock()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    def get(self, session_id: str, factory: Callable[[], SnapshotGame]) -> SnapshotGame:
+        """The game of ``session_id``: live, rehydrated from disk, or new.
+
+        The game may be spilled as soon as this returns; use ``checkout`` to
+        keep changing it.
+        """
+
+        with self._lock:
+            game = self._take(session_id, factory)
+            spilled = self._evict()
+        self._write(spilled)
+        return game
+
+    @contextmanager
+    def checkout(self, session_id: str, factory: Callable[[], SnapshotGame]) -> Iterator[SnapshotGame]:
+        """Like ``get``, but the game stays in memory until the block exits."""
+
+        with self._lock:
+            game = self._take(session_id, factory)
+            self._in_use[session_id] = self._in_use.get(session_id, 0) + 1
+            spilled = self._evict()
+        self._write(spilled)
+        try:
+            yield game
+        finally:
+            with self._lock:
+                remaining = self._in_use.pop(session_id) - 1
+                if remaining:
+                    self._in_use[session_id] = remaining
+                spilled = self._evict()
+            self._write(spilled)
+
+    def discard(self, session_id: str) -> None:
+        path = self._path(session_id)
+        with self._lock:
+            self._live.pop(session_id, None)
+            self._unwritten.pop(session_id, None)
+            if path.exists():
+                path.unlink()
+
+    def spill_idle(self) -> int:
+        """Spill every game idle past the threshold; returns how many were spilled.
+
+        At most once per ``idle_seconds`` this also removes stale snapshot files.
+        """
+
+        now = self._clock()
+        deadline = now - self.idle_seconds
+        spilled: List[Tuple[str, bytes]] = []
+        with self._lock:
+            for session_id, (game, last_used) in list(self._live.items()):
+                if last_used > deadline:
+                    break
+                if session_id not in self._in_use:
+                    spilled.append(self._spill(session_id, game))
+            cleanup = now >= self._next_cleanup
+            if cleanup:
+                self._next_cleanup = now + self.idle_seconds
+        self._write(spilled)
+        if cleanup:
+            self.remove_stale()
+        return len(spilled)
+
+    def remove_stale(self) -> int:
+        """Delete snapshot files older than ``max_spill_age``; returns how many."""
+
+        if not self.directory.is_dir():
+            return 0
+        deadline = time.time() - self.max_spill_age
+        removed = 0
+        for path in self.directory.iterdir():
+            if not path.name.endswith((".snapshot", ".tmp")):
+                continue
+            # Checked again under the lock: the session may be rehydrating it right now.
+            with self._lock:
+                try:
+                    if path.stat().st_mtime < deadline:
+                        path.unlink()
+                        removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+    @property
+    def live_count(self) -> int:
+        return len(self._live)
+
+    def is_spilled(self, session_id: str) -> bool:
+        return session_id in self._unwritten or self._path(session_id).exists()
+
+    # ------------------------------------------------------------------
+    def _take(self, session_id: str, factory: Callable[[], SnapshotGame]) -> SnapshotGame:
+        path = self._path(session_id)
+        entry = self._live.pop(session_id, None)
+        if entry is None:
+            game = factory()
+            data = self._unwritten.pop(session_id, None)
+            if data is None and path.exists():
+                data = zlib.decompress(path.read_bytes())
+            if data is not None:
+                try:
+                    game.restore(data)
+                except ValueError:
+                    # Written by an older layout: start the session over rather
+                    # than failing on every request.
+                    game = factory()
+            if path.exists():
+                path.unlink()
+        else:
+            game = entry[0]
+        self._live[session_id] = (game, self._clock())
+        return game
+
+    def _evict(self) -> List[Tuple[str, bytes]]:
+        excess = len(self._live) - self.max_live
+        if excess <= 0:
+            return []
+        idle = [session_id for session_id in self._live if session_id not in self._in_use]
+        return [self._spill(session_id, self._live[session_id][0]) for session_id in idle[:excess]]
+
+    def _spill(self, session_id: str, game: SnapshotGame) -> Tuple[str, bytes]:
+        """Take the game's snapshot; the caller passes it to ``_write`` after unlocking."""
+
+        del self._live[session_id]
+        data = game.snapshot()
+        self._unwritten[session_id] = data
+        return session_id, data
+
+    def _write(self, spilled: List[Tuple[str, bytes]]) -> None:
+        """Compress and write snapshots outside the lock.
+
+        A snapshot is only moved into place if it is still the session's
+        latest; one that was rehydrated or spilled again meanwhile is dropped.
+        """
+
+        for session_id, data in spilled:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                dir=self.directory, prefix=f".{session_id}.", suffix=".tmp", delete=False
+            ) as file:
+                temporary = Path(file.name)
+                try:
+                    file.write(zlib.compress(data))
+                except BaseException:
+                    file.close()
+                    temporary.unlink()
+                    raise
+            with self._lock:
+                latest = self._unwritten.get(session_id) is data
+                if latest:
+                    os.replace(temporary, self._path(session_id))
+                    del self._unwritten[session_id]
+            if not latest:
+                temporary.unlink()
+
+    def _path(self, session_id: str) -> Path:
+        if not _SESSION_ID.match(session_id):
+            raise ValueError("session_id may only contain letters, digits, '-' and '_'")
+        return self.directory / f"{session_id}.snapshot"
+
+
+__all__ = ["SessionStore", "SnapshotGame"]
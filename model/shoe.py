@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import random
+import struct
+from typing import Callable, Optional, Tuple
+
+from model import instrumentation
+
+CARDS_PER_DECK = 52
+RANKS_PER_SUIT = 13
+# Hi-Lo count tag per rank index (A, 2, ..., 10, J, Q, K): low cards +1, tens and aces -1.
+HI_LO_TAGS = (-1, 1, 1, 1, 1, 1, 0, 0, 0, -1, -1, -1, -1)
+
+_CODE_RANKS = bytes(code % RANKS_PER_SUIT for code in range(CARDS_PER_DECK))
+_CODE_TAGS = tuple(HI_LO_TAGS[rank] for rank in _CODE_RANKS)
+_REMAINING = struct.Struct("<I")
+
+
+class Shoe:
+    """Multi-deck shoe storing card codes (``0``-``51``) in a bytearray.
+
+    Cards are dealt from the end of the buffer. Reshuffling restores the
+    ordered decks in place and shuffles them, so no objects are allocated
+    however many decks the shoe holds. Codes are ``suit * 13 + rank``.
+
+    Undealt cards per rank and the Hi-Lo running count of the dealt cards
+    are updated on every draw, so reading them never scans the shoe.
+    """
+
+    def __init__(
+        self,
+        decks: int = 1,
+        rng: Optional[random.Random] = None,
+        cut_card: Optional[int] = None,
+        penetration: Optional[float] = None,
+    ) -> None:
+        if decks <= 0:
+            raise ValueError("decks must be a positive integer")
+        if cut_card is not None and penetration is not None:
+            raise ValueError("Specify either cut_card or penetration, not both")
+
+        self.decks = decks
+        self._rng = rng or random.Random()
+        self._ordered = bytes(range(CARDS_PER_DECK)) * decks
+        self._cards = bytearray(self._ordered)
+        self._remaining = 0
+        self._rank_counts = [0] * RANKS_PER_SUIT
+        self.running_count = 0
+        # Called after every reshuffle, e.g. to log it.
+        self.on_shuffle: Optional[Callable[[], None]] = None
+
+        if penetration is not None:
+            if not 0 < penetration <= 1:
+                raise ValueError("penetration must be in the range (0, 1]")
+            cut_card = round(self.size * (1 - penetration))
+        cut_card = cut_card or 0
+        if not 0 <= cut_card < self.size:
+            raise ValueError("cut_card must be smaller than the shoe size")
+        self.cut_card = cut_card
+
+    # ------------------------------------------------------------------
+    @property
+    def size(self) -> int:
+        return len(self._cards)
+
+    @property
+    def remaining(self) -> int:
+        return self._remaining
+
+    @property
+    def needs_shuffle(self) -> bool:
+        return self._remaining < self.cut_card or self._remaining == 0
+
+    def __len__(self) -> int:
+        return self._remaining
+
+    @property
+    def rank_counts(self) -> Tuple[int, ...]:
+        """Undealt cards per rank index, from the ace to the king."""
+
+        return tuple(self._rank_counts)
+
+    def remaining_codes(self) -> memoryview:
+        """Read-only view of the undealt codes, next card last."""
+
+        return memoryview(self._cards)[: self._remaining].toreadonly()
+
+    # ------------------------------------------------------------------
+    def shuffle(self) -> None:
+        self._cards[:] = self._ordered
+        self._rng.shuffle(self._cards)
+        self._remaining = len(self._cards)
+        self._rank_counts = [self.decks * 4] * RANKS_PER_SUIT
+        self.running_count = 0
+        if self.on_shuffle is not None:
+            self.on_shuffle()
+
+    def discard(self) -> None:
+        """Drop the undealt cards so the next deal starts a fresh shoe."""
+
+        self._remaining = 0
+        self._recount()
+
+    def snapshot(self) -> bytes:
+        """The undealt codes; decks and cut card are configuration, not state."""
+
+        return bytes(self._cards[: self._remaining])
+
+    def restore(self, codes: bytes) -> None:
+        if len(codes) > self.size or any(code >= CARDS_PER_DECK for code in codes):
+            raise ValueError("Snapshot does not fit this shoe")
+        self._cards[: len(codes)] = codes
+        self._remaining = len(codes)
+        self._recount()
+
+    def draw(self) -> int:
+        """Deal the next code, starting a fresh shoe first if this one is empty."""
+
+        if self._remaining == 0:
+            self.shuffle()
+        self._remaining -= 1
+        code = self._cards[self._remaining]
+        self._rank_counts[_CODE_RANKS[code]] -= 1
+        self.running_count += _CODE_TAGS[code]
+        return code
+
+    def _recount(self) -> None:
+        counts = [0] * RANKS_PER_SUIT
+        for code in self._cards[: self._remaining]:
+            counts[_CODE_RANKS[code]] += 1
+        self._rank_counts = counts
+        # A full shoe counts to zero, so the dealt cards count to minus the undealt ones.
+        self.running_count = -sum(tag * count for tag, count in zip(HI_LO_TAGS, counts))
+
+
+class ContinuousShoe(Shoe):
+    """Shoe of a continuous shuffling machine: never reshuffled, cards go back in.
+
+    Every draw takes a uniformly random undealt card by swapping it with the
+    last undealt slot, so dealt cards collect at the end of the buffer and
+    ``collect`` returns them all at once. Draws cost the same however many
+    cards are left, and there is no periodic shuffle.
+    """
+
+    def __init__(self, decks: int = 1, rng: Optional[random.Random] = None) -> None:
+        super().__init__(decks, rng=rng)
+        self.discard()
+
+    @property
+    def needs_shuffle(self) -> bool:
+        return False
+
+    def shuffle(self) -> None:
+        self.discard()
+        if self.on_shuffle is not None:
+            self.on_shuffle()
+
+    def discard(self) -> None:
+        """Return every card to the machine, including any still on the table."""
+
+        self._cards[:] = self._ordered
+        self._remaining = len(self._cards)
+        self._rank_counts = [self.decks * 4] * RANKS_PER_SUIT
+        self.running_count = 0
+
+    def collect(self) -> None:
+        """Put the cards dealt since the last collection back into the machine."""
+
+        counts = self._rank_counts
+        for code in self._cards[self._remaining :]:
+            counts[_CODE_RANKS[code]] += 1
+        self._remaining = len(self._cards)
+        self.running_count = 0
+
+    def snapshot(self) -> bytes:
+        # Slot order decides future draws, so the dealt tail is kept as well.
+        return _REMAINING.pack(self._remaining) + bytes(self._cards)
+
+    def restore(self, codes: bytes) -> None:
+        if len(codes) != _REMAINING.size + self.size:
+            raise ValueError("Snapshot does not fit this shoe")
+        remaining = _REMAINING.unpack_from(codes)[0]
+        cards = codes[_REMAINING.size :]
+        if remaining > self.size or sorted(cards) != sorted(self._ordered):
+            raise ValueError("Snapshot does not fit this shoe")
+        self._cards[:] = cards
+        self._remaining = remaining
+        self._recount()
+
+    def draw(self) -> int:
+        remaining = self._remaining
+        if remaining == 0:
+            raise RuntimeError("Every card is on the table")
+        cards = self._cards
+        index = self._rng.randrange(remaining)
+        remaining -= 1
+        code = cards[index]
+        cards[index] = cards[remaining]
+        cards[remaining] = code
+        self._remaining = remaining
+        self._rank_counts[_CODE_RANKS[code]] -= 1
+        self.running_count += _CODE_TAGS[code]
+        return code
+
+
+instrumentation.instrument(Shoe, "draw", "shoe.draw")
+instrumentation.instrument(Shoe, "shuffle", "shoe.shuffle")
+instrumentation.instrument(ContinuousShoe, "draw", "shoe.continuous_draw")
+instrumentation.instrument(ContinuousShoe, "collect", "shoe.collect")
+
+
+__all__ = ["CARDS_PER_DECK", "ContinuousShoe", "HI_LO_TAGS", "RANKS_PER_SUIT", "Shoe"]
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import random
+import struct
+from array import array
+from typing import Optional, Tuple
+
+MAGIC = b"CGS1"
+
+_INT = struct.Struct("<q")
+_LENGTH = struct.Struct("<I")
+_DOUBLE = struct.Struct("<d")
+
+
+class SnapshotWriter:
+    """Builds a compact binary snapshot out of integers, strings and blobs."""
+
+    def __init__(self, kind: bytes) -> None:
+        self._parts = [MAGIC, _LENGTH.pack(len(kind)), kind]
+
+    def write_int(self, value: int) -> None:
+        self._parts.append(_INT.pack(value))
+
+    def write_blob(self, data: bytes) -> None:
+        self._parts.append(_LENGTH.pack(len(data)))
+        self._parts.append(bytes(data))
+
+    def write_text(self, value: Optional[str]) -> None:
+        if value is None:
+            self.write_int(-1)
+        else:
+            encoded = value.encode("utf-8")
+            self.write_int(len(encoded))
+            self._parts.append(encoded)
+
+    def getvalue(self) -> bytes:
+        return b"".join(self._parts)
+
+
+class SnapshotReader:
+    """Reads back the fields written by ``SnapshotWriter``, in the same order."""
+
+    def __init__(self, data: bytes, kind: bytes) -> None:
+        self._data = memoryview(data)
+        self._offset = 0
+        if bytes(self._take(len(MAGIC))) != MAGIC:
+            raise ValueError("Not a game snapshot")
+        stored_kind = bytes(self._take(self._read_length()))
+        if stored_kind != kind:
+            raise ValueError(f"Snapshot holds a {stored_kind.decode()} game, not {kind.decode()}")
+
+    def read_int(self) -> int:
+        return _INT.unpack(self._take(_INT.size))[0]
+
+    def read_blob(self) -> bytes:
+        return bytes(self._take(self._read_length()))
+
+    def read_text(self) -> Optional[str]:
+        length = self.read_int()
+        if length < 0:
+            return None
+        return bytes(self._take(length)).decode("utf-8")
+
+    def _read_length(self) -> int:
+        return _LENGTH.unpack(self._take(_LENGTH.size))[0]
+
+    def _take(self, size: int) -> memoryview:
+        end = self._offset + size
+        if end > len(self._data):
+            raise ValueError("Snapshot is truncated")
+        chunk = self._data[self._offset : end]
+        self._offset = end
+        return chunk
+
+
+def snapshot_kind(data: bytes) -> bytes:
+    """The kind tag a snapshot was written with."""
+
+    if data[: len(MAGIC)] != MAGIC:
+        raise ValueError("Not a game snapshot")
+    length = _LENGTH.unpack_from(data, len(MAGIC))[0]
+    start = len(MAGIC) + _LENGTH.size
+    return bytes(data[start : start + length])
+
+
+def pack_int_array(values, typecode: str = "q") -> bytes:
+    return array(typecode, values).tobytes()
+
+
+def unpack_int_array(data: bytes, typecode: str = "q") -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    return values
+
+
+def pack_rng_state(rng: random.Random) -> bytes:
+    version, internal, gauss_next = rng.getstate()
+    header = _INT.pack(version) + _DOUBLE.pack(gauss_next if gauss_next is not None else float("nan"))
+    return header + pack_int_array(internal, "I")
+
+
+def unpack_rng_state(data: bytes) -> Tuple[int, Tuple[int, ...], Optional[float]]:
+    version = _INT.unpack_from(data, 0)[0]
+    gauss_next: Optional[float] = _DOUBLE.unpack_from(data, _INT.size)[0]
+    if gauss_next != gauss_next:
+        gauss_next = None
+    internal = tuple(unpack_int_array(data[_INT.size + _DOUBLE.size :], "I"))
+    return version, internal, gauss_next
+
+
+__all__ = [
+    "SnapshotReader",
+    "SnapshotWriter",
+    "pack_int_array",
+    "pack_rng_state",
+    "snapshot_kind",
+    "unpack_int_array",
+    "unpack_rng_state",
+]
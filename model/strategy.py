@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from model.blackjack import CARDS, DEALER_STAND_TOTAL, BlackjackGame
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "strategy"
+TABLE_FORMAT = 1
+
+# Infinite-shoe probability of drawing each value, ace first.
+VALUE_PROBABILITIES = tuple(
+    sum(1 for card in CARDS if card.base_value == value) / len(CARDS) for value in range(1, 11)
+)
+
+Cell = Tuple[int, bool, int]
+
+
+@dataclass(frozen=True)
+class StrategyRules:
+    """Rule parameters that change the hit/stand table.
+
+    The number of decks is deliberately not one of them: the table is built for
+    an infinite shoe, see ``recommend``.
+    """
+
+    dealer_stand_total: int = DEALER_STAND_TOTAL
+    dealer_peek: bool = True
+
+    def __post_init__(self) -> None:
+        if not 17 <= self.dealer_stand_total <= 21:
+            raise ValueError("dealer_stand_total must be between 17 and 21")
+
+    @property
+    def cache_key(self) -> str:
+        payload = json.dumps({"format": TABLE_FORMAT, **asdict(self)}, sort_keys=True)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class StrategyTable:
+    """Stand and hit expected values per (player total, soft flag, dealer upcard)."""
+
+    def __init__(self, rules: StrategyRules, cells: Dict[Cell, Tuple[float, float]]) -> None:
+        self.rules = rules
+        self._cells = cells
+
+    def expected_values(self, total: int, soft: bool, upcard_value: int) -> Tuple[float, float]:
+        try:
+            return self._cells[(total, soft, upcard_value)]
+        except KeyError as exc:
+            kind = "soft" if soft else "hard"
+            raise ValueError(f"No strategy entry for {kind} {total} against {upcard_value}") from exc
+
+    def action(self, total: int, soft: bool, upcard_value: int) -> str:
+        stand_ev, hit_ev = self.expected_values(total, soft, upcard_value)
+        return "hit" if hit_ev > stand_ev else "stand"
+
+    # ------------------------------------------------------------------
+    def to_payload(self) -> Dict:
+        return {
+            "format": TABLE_FORMAT,
+            "rules": asdict(self.rules),
+            "cells": [
+                [total, soft, upcard, stand_ev, hit_ev]
+                for (total, soft, upcard), (stand_ev, hit_ev) in sorted(self._cells.items())
+            ],
+        }
+
+    @classmethod
+    def from_payload(cls, payload: Dict) -> "StrategyTable":
+        if payload.get("format") != TABLE_FORMAT:
+            raise ValueError("Unsupported strategy table format")
+        rules = StrategyRules(**payload["rules"])
+        cells = {
+            (total, soft, upcard): (stand_ev, hit_ev)
+            for total, soft, upcard, stand_ev, hit_ev in payload["cells"]
+        }
+        return cls(rules, cells)
+
+    @classmethod
+    def compute(cls, rules: StrategyRules) -> "StrategyTable":
+        cells: Dict[Cell, Tuple[float, float]] = {}
+        for upcard in range(1, 11):
+            cells.update(_upcard_cells(upcard, _dealer_distribution(upcard, rules)))
+        return cls(rules, cells)
+
+
+def load_table(rules: StrategyRules = StrategyRules(), cache_dir: Optional[Path] = None) -> StrategyTable:
+    """Return the table for ``rules``, computing and caching it on first use."""
+
+    return _load_table(rules, Path(cache_dir) if cache_dir is not None else CACHE_DIR)
+
+
+@lru_cache(maxsize=8)
+def _load_table(rules: StrategyRules, cache_dir: Path) -> StrategyTable:
+    cache_path = cache_dir / f"strategy_{rules.cache_key}.json"
+    if cache_path.exists():
+        try:
+            return StrategyTable.from_payload(json.loads(cache_path.read_text(encoding="utf-8")))
+        except (ValueError, KeyError, TypeError):
+            pass
+
+    table = StrategyTable.compute(rules)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps(table.to_payload()), encoding="utf-8")
+    except OSError:
+        pass
+    return table
+
+
+def recommend(game: BlackjackGame, table: Optional[StrategyTable] = None) -> str:
+    """Return ``"hit"`` or ``"stand"`` for the current decision in ``game``.
+
+    This is infinite-shoe basic strategy: ``game.decks`` and the cards already
+    dealt are ignored. A finite shoe can flip a few marginal cells, such as hard
+    16 against a ten; ``dealer_odds`` reflects the composition of the actual shoe.
+    """
+
+    upcard = game.dealer_upcard
+    if not game.is_player_turn or upcard is None:
+        raise RuntimeError("A recommendation is only available during the player turn")
+    table = table or load_table()
+    return table.action(game.player_total, game.player_is_soft, upcard.base_value)
+
+
+# ----------------------------------------------------------------------
+def _dealer_distribution(upcard: int, rules: StrategyRules) -> Tuple[float, ...]:
+    """Probabilities of dealer finals 17..21 followed by bust, for an infinite shoe."""
+
+    @lru_cache(maxsize=None)
+    def resolve(hard_total: int, has_ace: bool) -> Tuple[float, ...]:
+        total = hard_total + 10 if has_ace and hard_total + 10 <= 21 else hard_total
+        result = [0.0] * 6
+        if total > 21:
+            result[5] = 1.0
+        elif total >= rules.dealer_stand_total:
+            result[total - 17] = 1.0
+        else:
+            for index, probability in enumerate(VALUE_PROBABILITIES):
+                branch = resolve(hard_total + index + 1, has_ace or index == 0)
+                for slot, value in enumerate(branch):
+                    result[slot] += probability * value
+        return tuple(result)
+
+    totals = [0.0] * 6
+    weight = 0.0
+    for index, probability in enumerate(VALUE_PROBABILITIES):
+        hole = index + 1
+        if rules.dealer_peek and {upcard, hole} == {1, 10}:
+            continue
+        weight += probability
+        branch = resolve(upcard + hole, 1 in (upcard, hole))
+        for slot, value in enumerate(branch):
+            totals[slot] += probability * value
+    return tuple(total / weight for total in totals)
+
+
+def _upcard_cells(upcard: int, dealer: Tuple[float, ...]) -> Dict[Cell, Tuple[float, float]]:
+    @lru_cache(maxsize=None)
+    def best(total: int, soft: bool) -> float:
+        return max(_stand_ev(total, dealer), _hit_ev(total, soft, best))
+
+    cells: Dict[Cell, Tuple[float, float]] = {}
+    for soft, lowest in ((False, 4), (True, 12)):
+        for total in range(lowest, 22):
+            cells[(total, soft, upcard)] = (_stand_ev(total, dealer), _hit_ev(total, soft, best))
+    return cells
+
+
+def _stand_ev(total: int, dealer: Tuple[float, ...]) -> float:
+    if total > 21:
+        return -1.0
+    ev = dealer[5]
+    for slot, probability in enumerate(dealer[:5]):
+        dealer_total = slot + 17
+        if total > dealer_total:
+            ev += probability
+        elif total < dealer_total:
+            ev -= probability
+    return ev
+
+
+def _hit_ev(total: int, soft: bool, best: Callable[[int, bool], float]) -> float:
+    hard_total = total - 10 if soft else total
+    ev = 0.0
+    for index, probability in enumerate(VALUE_PROBABILITIES):
+        new_hard = hard_total + index + 1
+        has_ace = soft or index == 0
+        new_soft = has_ace and new_hard + 10 <= 21
+        new_total = new_hard + 10 if new_soft else new_hard
+        ev += probability * (-1.0 if new_total > 21 else best(new_total, new_soft))
+    return ev
+
+
+__all__ = ["StrategyRules", "StrategyTable", "load_table", "recommend"]
@@ -0,0 +1,248 @@
+"""Headless multi-table game server on localhost, for load testing the models.
+
+Start it with ``python -m model.table_server --port 8765``. Clients send one
+command per line and get one reply line per command, in order::
+
+    OPEN blackjack [seed]        -> OK {"table": 1, ...}
+    OPEN highlow [seed]          -> OK {"table": 2, ...}
+    <table> BET <amount>         (blackjack)
+    <table> HIT | STAND | NEXT   (blackjack)
+    <table> PLAY High|Low <bet>  (high-low)
+    <table> RESET | STATE | CLOSE
+    STATS                        -> OK {"actions": ..., "p50_ms": ..., ...}
+
+Replies are ``OK <json>`` or ``ERR <message>``. Commands received during one
+event-loop tick are executed together in a single batch.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from array import array
+from itertools import count
+from typing import Dict, List, Optional, Tuple, Union
+
+from model.blackjack import BlackjackGame
+from model.High_and_Low import HighLowGame
+
+Game = Union[BlackjackGame, HighLowGame]
+
+# Latency samples kept for the percentiles; older ones are overwritten.
+LATENCY_SAMPLES = 100_000
+
+
+class TableServer:
+    """Hosts many game tables and runs their actions in per-tick batches."""
+
+    def __init__(self, highlow_decks: int = 20) -> None:
+        self.highlow_decks = highlow_decks
+        self.tables: Dict[int, Game] = {}
+        self._table_ids = count(1)
+        self._pending: List[Tuple[str, asyncio.Future, float]] = []
+        self._flush_scheduled = False
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.reset_stats()
+
+    # ------------------------------------------------------------------
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Start listening; returns the bound port."""
+
+        self._server = await asyncio.start_server(self._serve, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def reset_stats(self) -> None:
+        self.actions = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self._started = time.perf_counter()
+        self._latencies = array("d")
+
+    def stats(self) -> Dict:
+        """Throughput since ``reset_stats`` and queue-to-reply latency percentiles."""
+
+        elapsed = time.perf_counter() - self._started
+        latencies = sorted(self._latencies)
+        return {
+            "tables": len(self.tables),
+            "actions": self.actions,
+            "actions_per_sec": self.actions / elapsed if elapsed else 0.0,
+            "batches": self.batches,
+            "mean_batch": self.actions / self.batches if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+        }
+
+    # ------------------------------------------------------------------
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                future = loop.create_future()
+                # Undecodable bytes end up in an unknown command, which is answered with ERR.
+                command = line.decode("utf-8", errors="replace").strip()
+                self._pending.append((command, future, time.perf_counter()))
+                if not self._flush_scheduled:
+                    self._flush_scheduled = True
+                    loop.call_soon(self._flush)
+                writer.write(await future)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _flush(self) -> None:
+        batch, self._pending = self._pending, []
+        self._flush_scheduled = False
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+        latencies = self._latencies
+        for line, future, queued in batch:
+            try:
+                reply = "OK " + json.dumps(self.execute(line))
+            except (ValueError, RuntimeError) as exc:
+                reply = f"ERR {exc}"
+            except Exception as exc:
+                # A bug in one command must not leave the rest of the batch waiting forever.
+                reply = f"ERR {type(exc).__name__}: {exc}"
+            self.actions += 1
+            if len(latencies) < LATENCY_SAMPLES:
+                latencies.append(time.perf_counter() - queued)
+            else:
+                latencies[self.actions % LATENCY_SAMPLES] = time.perf_counter() - queued
+            if not future.cancelled():
+                future.set_result((reply + "\n").encode("utf-8"))
+
+    # ------------------------------------------------------------------
+    def execute(self, line: str) -> Dict:
+        """Run one protocol command and return its reply payload."""
+
+        words = line.split()
+        if not words:
+            raise ValueError("Empty command")
+        if words[0] == "OPEN":
+            return self._open(words[1:])
+        if words[0] == "STATS":
+            return self.stats()
+
+        table_id = int(words[0])
+        game = self.tables.get(table_id)
+        if game is None:
+            raise ValueError(f"Unknown table {table_id}")
+        command = words[1] if len(words) > 1 else ""
+        arguments = words[2:]
+
+        if command == "CLOSE":
+            del self.tables[table_id]
+            return {"table": table_id, "closed": True}
+        if command == "RESET":
+            game.reset()
+        elif command == "STATE":
+            pass
+        elif isinstance(game, BlackjackGame):
+            self._blackjack_action(game, command, arguments)
+        else:
+            self._highlow_action(game, command, arguments)
+        return _state(table_id, game)
+
+    def _open(self, arguments: List[str]) -> Dict:
+        kind = arguments[0] if arguments else ""
+        seed = int(arguments[1]) if len(arguments) > 1 else None
+        if kind == "blackjack":
+            game: Game = BlackjackGame(rng=random.Random(seed))
+        elif kind == "highlow":
+            if seed is None:
+                seed = random.getrandbits(32)
+            game = HighLowGame.generated(seed, decks=self.highlow_decks)
+        else:
+            raise ValueError("OPEN needs 'blackjack' or 'highlow'")
+        table_id = next(self._table_ids)
+        self.tables[table_id] = game
+        return _state(table_id, game)
+
+    @staticmethod
+    def _blackjack_action(game: BlackjackGame, command: str, arguments: List[str]) -> None:
+        if command == "BET":
+            if len(arguments) != 1:
+                raise ValueError("BET needs one amount")
+            game.start_round(int(arguments[0]))
+        elif command == "HIT":
+            game.hit()
+        elif command == "STAND":
+            game.stand()
+        elif command == "NEXT":
+            game.next_round()
+        else:
+            raise ValueError(f"Unknown blackjack command '{command}'")
+
+    @staticmethod
+    def _highlow_action(game: HighLowGame, command: str, arguments: List[str]) -> None:
+        if command != "PLAY" or len(arguments) != 2:
+            raise ValueError("High-Low tables only accept 'PLAY High|Low <bet>'")
+        game.play_round(arguments[0], int(arguments[1]))
+
+
+def _state(table_id: int, game: Game) -> Dict:
+    if isinstance(game, BlackjackGame):
+        return {
+            "table": table_id,
+            "state": game.state,
+            "chips": game.chips,
+            "player_total": game.player_total,
+            "outcome": game.round_outcome,
+        }
+    return {
+        "table": table_id,
+        "chips": game.chips,
+        "round": game.round_number,
+        "finished": game.is_finished,
+    }
+
+
+def percentile(ordered: List[float], percent: float) -> float:
+    """Nearest-rank percentile of already sorted values; 0.0 when empty."""
+
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, math.ceil(percent / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+async def serve(host: str, port: int) -> None:
+    server = TableServer()
+    bound = await server.start(host, port)
+    # Printed for launchers that start the server on port 0.
+    print(f"LISTENING {bound}", flush=True)
+    await asyncio.Event().wait()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Headless multi-table game server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+__all__ = ["TableServer", "percentile", "serve"]
+
+
+if __name__ == "__main__":
+    main()
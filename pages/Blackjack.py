@@ -1,6 +1,16 @@
-﻿import streamlit as st
+﻿import uuid
+from contextlib import contextmanager
+from functools import partial
+from typing import Iterator
 
-from model.blackjack import BlackjackGame
+import streamlit as st
+
+from model.blackjack import CARDS, BlackjackGame
+from model.dealer_odds import dealer_odds
+from model.strategy import recommend
+from ui import common
+
+common.start_render()
 
 st.title("ブラックジャック")
 
@@ -27,6 +37,18 @@ RANK_LABELS = {
     "K": "K (キング)",
 }
 
+CARD_LABELS = {
+    card: f"{SUIT_LABELS[card.suit]}の{RANK_LABELS[card.rank]}" for card in CARDS
+}
+CARD_LABELS_BY_NAME = {card.label(): label for card, label in CARD_LABELS.items()}
+
+HISTORY_PAGE_SIZE = 20
+
+# Fragments an action reruns: those showing the round, plus the history and
+# ranking once the round is over. Everything else keeps its last output.
+ROUND_FRAGMENTS = ("blackjack_stats", "blackjack_table", "blackjack_actions")
+RESULT_FRAGMENTS = ROUND_FRAGMENTS + ("blackjack_history", "blackjack_leaderboard")
+
 OUTCOME_MESSAGES = {
     "player_blackjack": "ブラックジャック！ あなたの勝利です。",
     "player_win": "あなたの勝ちです。",
@@ -57,6 +79,11 @@ OUTCOME_STATUS = {
     "dealer_blackjack": st.error,
 }
 
+ACTION_LABELS = {
+    "hit": "ヒット",
+    "stand": "スタンド",
+}
+
 ERROR_MESSAGES = {
     "Bet must be a positive integer": "ベット額は1以上の整数を入力してください。",
     "Bet cannot exceed current chips": "所持チップを超えるベットはできません。",
@@ -67,12 +94,25 @@ ERROR_MESSAGES = {
 }
 
 
-def ensure_game() -> None:
-    if "blackjack_game" not in st.session_state:
-        st.session_state.blackjack_game = BlackjackGame()
+def init_session() -> None:
+    if "blackjack_session_id" not in st.session_state:
+        st.session_state.blackjack_session_id = uuid.uuid4().hex
         st.session_state.blackjack_message = None
     if "blackjack_message" not in st.session_state:
         st.session_state.blackjack_message = None
+    if "blackjack_continuous" not in st.session_state:
+        st.session_state.blackjack_continuous = False
+
+
+@contextmanager
+def use_game() -> Iterator[BlackjackGame]:
+    """The session's game; it is never spilled while the block runs."""
+
+    init_session()
+    factory = partial(BlackjackGame, continuous_shuffle=st.session_state.blackjack_continuous)
+    with common.checkout_game(st.session_state.blackjack_session_id, factory) as game:
+        game.on_round = common.results_store().recorder(st.session_state.player_name, "blackjack")
+        yield game
 
 
 def translate_error(message: str) -> str:
@@ -80,16 +120,11 @@ def translate_error(message: str) -> str:
 
 
 def card_label(card) -> str:
-    suit = SUIT_LABELS.get(card.suit, card.suit)
-    rank = RANK_LABELS.get(card.rank, card.rank)
-    return f"{suit}の{rank}"
+    return CARD_LABELS[card]
 
 
 def to_japanese_label(label: str) -> str:
-    if " of " not in label:
-        return label
-    rank, suit = label.split(" of ", 1)
-    return f"{SUIT_LABELS.get(suit, suit)}の{RANK_LABELS.get(rank, rank)}"
+    return CARD_LABELS_BY_NAME.get(label, label)
 
 
 def hand_text(cards) -> str:
@@ -98,6 +133,14 @@ def hand_text(cards) -> str:
     return "、".join(card_label(card) for card in cards)
 
 
+def dealer_odds_text(odds) -> str:
+    parts = []
+    for result, probability in odds.items():
+        label = "バースト" if result == "bust" else result
+        parts.append(f"{label}: {probability:.1%}")
+    return " / ".join(parts)
+
+
 def format_history_hand(card_labels, total: int) -> str:
     if not card_labels:
         return "なし"
@@ -105,126 +148,252 @@ def format_history_hand(card_labels, total: int) -> str:
     return f"{joined}（合計: {total}）"
 
 
-ensure_game()
-game: BlackjackGame = st.session_state.blackjack_game
-
-col_chips, col_cards, col_reset = st.columns([1, 1, 1])
-col_chips.metric("現在のチップ", f"{game.chips}")
-col_cards.metric("山札の残り枚数", str(game.cards_remaining))
-if col_reset.button("ゲームをリセット"):
-    game.reset()
-    st.session_state.blackjack_message = None
-    st.rerun()
-
-message = st.session_state.blackjack_message
-if message:
-    st.info(message)
-
-if game.state == "BETTING":
-    st.subheader("ベット額を決めてください")
-    if game.is_bankrupt:
-        st.error("チップがありません。ゲームをリセットして再挑戦してください。")
-    else:
-        max_bet = max(1, game.chips)
-        default_bet = min(10, max_bet)
-        with st.form("bet_form", clear_on_submit=True):
-            bet_value = st.number_input(
-                "ベット額",
-                min_value=1,
-                max_value=max_bet,
-                value=default_bet,
-                step=1,
-                format="%d",
-            )
-            deal = st.form_submit_button("カードを配る")
-        if deal:
-            try:
-                game.start_round(int(bet_value))
-            except ValueError as exc:
-                st.error(translate_error(str(exc)))
-            else:
-                st.session_state.blackjack_message = None
-                st.rerun()
-
-if game.state in {"PLAYER_TURN", "ROUND_OVER"}:
-    st.subheader("ディーラー")
-    if game.is_player_turn:
-        upcard = game.dealer_upcard
-        if upcard is None:
-            st.write("-")
-        else:
-            st.write(f"{card_label(upcard)} と伏せ札1枚")
-    else:
-        st.write(hand_text(game.dealer_cards))
-        st.caption(f"合計: {game.dealer_total}")
-
-    st.subheader("あなたの手札")
-    st.write(hand_text(game.player_cards))
-    st.caption(f"合計: {game.player_total}")
-
-if game.state == "PLAYER_TURN":
-    action_hit, action_stand = st.columns(2)
-    if action_hit.button("ヒット"):
+def history_row(game: BlackjackGame, number: int):
+    """Translated history row for round ``number``, built once per round."""
+
+    stats = game.history_store
+    state = common.derived_state(game)
+    if state.get("history_generation") != (stats, stats.generation):
+        state["history_generation"] = (stats, stats.generation)
+        state["history_rows"] = {}
+    cache = state["history_rows"]
+    row = cache.get(number)
+    if row is None:
+        entry = stats.row(number)
+        row = {
+            "ラウンド": number,
+            "結果": OUTCOME_LABELS.get(entry["outcome"], entry["outcome"]),
+            "ベット": entry["bet"],
+            "収支": entry["delta"],
+            "残りチップ": entry["chips_after"],
+        }
+        cache[number] = row
+        oldest = stats.total_rounds - len(stats)
+        if len(cache) > len(stats):
+            for stale in [key for key in cache if key <= oldest]:
+                del cache[stale]
+    return row
+
+
+@common.timed_fragment("blackjack_leaderboard")
+def render_leaderboard(player: str) -> None:
+    common.render_leaderboard("blackjack", player)
+
+
+# ----------------------------------------------------------------------
+# Callbacks. Each one changes the game, then reruns only the fragments whose
+# output changed instead of the whole page.
+def rerun_after_action(game: BlackjackGame) -> None:
+    common.rerun(*(RESULT_FRAGMENTS if game.is_round_over else ROUND_FRAGMENTS))
+
+
+def deal() -> None:
+    with use_game() as game:
         try:
-            game.hit()
-        except RuntimeError as exc:
-            st.error(translate_error(str(exc)))
-        st.rerun()
-    if action_stand.button("スタンド"):
+            game.start_round(int(st.session_state.blackjack_bet))
+        except ValueError as exc:
+            st.session_state.blackjack_error = translate_error(str(exc))
+        else:
+            st.session_state.blackjack_message = None
+        rerun_after_action(game)
+
+
+def take_action(action: str) -> None:
+    with use_game() as game:
         try:
-            game.stand()
+            getattr(game, action)()
         except RuntimeError as exc:
-            st.error(translate_error(str(exc)))
-        st.rerun()
-
-if game.is_round_over:
-    outcome = game.round_outcome
-    status_fn = OUTCOME_STATUS.get(outcome, st.info)
-    status_fn(OUTCOME_MESSAGES.get(outcome, "ラウンドが終了しました。"))
-
-    record = game.last_record
-    if record:
-        delta = record["delta"]
-        if delta > 0:
-            delta_text = f"+{delta}"
-        elif delta == 0:
-            delta_text = "±0"
-        else:
-            delta_text = str(delta)
-        st.write(
-            f"ベット額: {record['bet']} / 収支: {delta_text} / 現在のチップ: {record['chips_after']}"
-        )
-        st.caption(
-            f"あなた: {format_history_hand(record['player_cards'], record['player_total'])}"
-            f" ｜ ディーラー: {format_history_hand(record['dealer_cards'], record['dealer_total'])}"
-        )
-
-    col_next, col_shuffle = st.columns([1, 1])
-    if col_next.button("次のラウンドへ"):
+            st.session_state.blackjack_error = translate_error(str(exc))
+        rerun_after_action(game)
+
+
+def next_round() -> None:
+    with use_game() as game:
         try:
             game.next_round()
         except RuntimeError as exc:
-            st.error(translate_error(str(exc)))
+            st.session_state.blackjack_error = translate_error(str(exc))
         else:
             st.session_state.blackjack_message = None
-            st.rerun()
-    if col_shuffle.button("山札をリセット"):
+        common.rerun("blackjack_table", "blackjack_actions")
+
+
+def reset_shoe() -> None:
+    with use_game() as game:
         game.reset_shoe()
-        st.session_state.blackjack_message = "次のディール時に山札をリセットします。"
-        st.rerun()
-
-if game.history:
-    st.divider()
-    st.subheader("プレイ履歴")
-    history_rows = []
-    for idx, entry in enumerate(game.history, start=1):
-        history_rows.append(
-            {
-                "ラウンド": idx,
-                "結果": OUTCOME_LABELS.get(entry["outcome"], entry["outcome"]),
-                "ベット": entry["bet"],
-                "収支": entry["delta"],
-                "残りチップ": entry["chips_after"],
-            }
-        )
-    st.table(history_rows)
+    st.session_state.blackjack_message = "次のディール時に山札をリセットします。"
+    common.rerun("blackjack_actions", "blackjack_stats")
+
+
+def reset_game() -> None:
+    with use_game() as game:
+        game.reset()
+    st.session_state.blackjack_message = None
+
+
+def switch_shuffler() -> None:
+    common.session_store().discard(st.session_state.blackjack_session_id)
+    st.session_state.blackjack_continuous = st.session_state.blackjack_continuous_toggle
+    st.session_state.blackjack_message = None
+    # A new game changes every part of the page.
+    common.rerun()
+
+
+# ----------------------------------------------------------------------
+# Fragments
+@common.timed_fragment("blackjack_stats")
+def render_stats() -> None:
+    with use_game() as game:
+        col_chips, col_cards = st.columns(2)
+        col_chips.metric("現在のチップ", f"{game.chips}")
+        col_cards.metric("山札の残り枚数", str(game.cards_remaining))
+        col_cards.caption(f"カウント (Hi-Lo): {game.running_count:+d} ｜ トゥルーカウント: {game.true_count:+.1f}")
+
+
+@common.timed_fragment("blackjack_table")
+def render_table() -> None:
+    with use_game() as game:
+        if game.state not in {"PLAYER_TURN", "ROUND_OVER"}:
+            return
+
+        st.subheader("ディーラー")
+        if game.is_player_turn:
+            upcard = game.dealer_upcard
+            if upcard is None:
+                st.write("-")
+            else:
+                st.write(f"{card_label(upcard)} と伏せ札1枚")
+                st.caption(f"ディーラーの最終合計の確率 ｜ {dealer_odds_text(dealer_odds(game))}")
+        else:
+            st.write(hand_text(game.dealer_cards))
+            st.caption(f"合計: {game.dealer_total}")
+
+        st.subheader("あなたの手札")
+        st.write(hand_text(game.player_cards))
+        st.caption(f"合計: {game.player_total}")
+        if game.is_player_turn:
+            st.caption(
+                f"おすすめの行動: {ACTION_LABELS[recommend(game)]}（基本戦略）",
+                help="無限デッキを前提にした基本戦略です。デッキ数や配られた札は考慮しません。",
+            )
+
+        if not game.is_round_over:
+            return
+        outcome = game.round_outcome
+        status_fn = OUTCOME_STATUS.get(outcome, st.info)
+        status_fn(OUTCOME_MESSAGES.get(outcome, "ラウンドが終了しました。"))
+
+        record = game.last_record
+        if record:
+            delta = record["delta"]
+            if delta > 0:
+                delta_text = f"+{delta}"
+            elif delta == 0:
+                delta_text = "±0"
+            else:
+                delta_text = str(delta)
+            st.write(
+                f"ベット額: {record['bet']} / 収支: {delta_text} / 現在のチップ: {record['chips_after']}"
+            )
+            st.caption(
+                f"あなた: {format_history_hand(record['player_cards'], record['player_total'])}"
+                f" ｜ ディーラー: {format_history_hand(record['dealer_cards'], record['dealer_total'])}"
+            )
+
+
+@common.timed_fragment("blackjack_actions")
+def render_actions() -> None:
+    with use_game() as game:
+        error = st.session_state.pop("blackjack_error", None)
+        if error:
+            st.error(error)
+        message = st.session_state.blackjack_message
+        if message:
+            st.info(message)
+
+        if game.state == "BETTING":
+            st.subheader("ベット額を決めてください")
+            st.toggle(
+                "シャッフルマシン（毎ラウンド札を戻して連続シャッフル）",
+                value=game.continuous_shuffle,
+                key="blackjack_continuous_toggle",
+                on_change=switch_shuffler,
+                help="切り替えるとゲームがリセットされます。",
+            )
+            if game.is_bankrupt:
+                st.error("チップがありません。ゲームをリセットして再挑戦してください。")
+                return
+            max_bet = max(1, game.chips)
+            default_bet = min(10, max_bet)
+            with st.form("bet_form", clear_on_submit=True):
+                st.number_input(
+                    "ベット額",
+                    min_value=1,
+                    max_value=max_bet,
+                    value=default_bet,
+                    step=1,
+                    format="%d",
+                    key="blackjack_bet",
+                )
+                st.form_submit_button("カードを配る", on_click=deal)
+        elif game.state == "PLAYER_TURN":
+            for column, (action, label) in zip(st.columns(len(ACTION_LABELS)), ACTION_LABELS.items()):
+                column.button(label, on_click=take_action, args=(action,))
+        elif game.is_round_over:
+            col_next, col_shuffle = st.columns([1, 1])
+            col_next.button("次のラウンドへ", on_click=next_round)
+            # A shuffling machine never needs a fresh shoe.
+            if not game.continuous_shuffle:
+                col_shuffle.button("山札をリセット", on_click=reset_shoe)
+
+
+@common.timed_fragment("blackjack_history")
+def render_history() -> None:
+    with use_game() as game:
+        stats = game.history_store
+        if not stats.total_rounds:
+            return
+
+        st.divider()
+        st.subheader("プレイ履歴")
+        col_rounds, col_rate, col_net, col_streak = st.columns(4)
+        col_rounds.metric("ラウンド数", str(stats.total_rounds))
+        col_rate.metric("勝率", f"{stats.win_rate:.1%}")
+        col_net.metric("通算収支", f"{stats.net:+d}")
+        if stats.current_streak > 0:
+            col_streak.metric("連勝中", f"{stats.current_streak}")
+        elif stats.current_streak < 0:
+            col_streak.metric("連敗中", f"{-stats.current_streak}")
+        else:
+            col_streak.metric("連勝・連敗", "0")
+        common.render_analytics(common.bankroll_analytics(game), OUTCOME_LABELS)
+
+        page_count = -(-len(stats) // HISTORY_PAGE_SIZE)
+        page = 1
+        if page_count > 1:
+            page = st.number_input(
+                "ページ（新しい順）",
+                min_value=1,
+                max_value=page_count,
+                value=1,
+                step=1,
+                key="blackjack_history_page",
+            )
+            st.caption(f"{HISTORY_PAGE_SIZE}件ずつ表示 ｜ 全{page_count}ページ")
+        newest = stats.total_rounds - (int(page) - 1) * HISTORY_PAGE_SIZE
+        oldest = max(newest - HISTORY_PAGE_SIZE, stats.total_rounds - len(stats))
+        st.table([history_row(game, number) for number in range(newest, oldest, -1)])
+
+
+common.player_name()
+init_session()
+
+col_stats, col_reset = st.columns([2, 1])
+with col_stats:
+    render_stats()
+col_reset.button("ゲームをリセット", on_click=reset_game)
+render_table()
+render_actions()
+render_history()
+render_leaderboard(st.session_state.player_name)
+common.render_debug_panel("blackjack")
@@ -1,110 +1,242 @@
-﻿import streamlit as st
+﻿import uuid
+from contextlib import contextmanager
+from functools import partial
+from typing import Iterator
 
-from model.High_and_Low import load_sample_game
+import streamlit as st
+
+from model.High_and_Low import HighLowGame, load_sample_game
+from ui import common
+
+common.start_render()
 
 st.title("High and Low")
 
+HISTORY_PAGE_SIZE = 20
+OUTCOME_LABELS = {"win": "勝ち", "lose": "負け", "draw": "引き分け"}
+
+# Fragments a played round reruns; the rest of the page keeps its last output.
+PLAY_FRAGMENTS = ("highlow_status", "highlow_round", "highlow_history", "highlow_leaderboard")
 
-def ensure_game() -> None:
-    if "highlow_game" not in st.session_state:
-        st.session_state.highlow_game = load_sample_game()
+
+def init_session() -> None:
+    if "highlow_session_id" not in st.session_state:
+        st.session_state.highlow_session_id = uuid.uuid4().hex
         st.session_state.game_started = False
-        st.session_state.last_result = None
+    if "highlow_seed" not in st.session_state:
+        st.session_state.highlow_seed = None
 
 
-def reset_game() -> None:
-    st.session_state.highlow_game.reset()
-    st.session_state.game_started = False
-    st.session_state.last_result = None
-    st.rerun()
+@contextmanager
+def use_game() -> Iterator[HighLowGame]:
+    """The session's game; it is never spilled while the block runs."""
 
+    init_session()
+    # A seed selects a generated game; without one the sample data is replayed.
+    seed = st.session_state.highlow_seed
+    factory = load_sample_game if seed is None else partial(HighLowGame.generated, seed)
+    with common.checkout_game(st.session_state.highlow_session_id, factory) as game:
+        game.on_round = common.results_store().recorder(st.session_state.player_name, "highlow")
+        yield game
 
-ensure_game()
-game = st.session_state.highlow_game
 
-if not st.session_state.game_started:
-    st.write(f"開始前の所持チップ: {game.initial_chips}枚")
-    st.info("Startボタンを押すとサンプルデータに従ってゲームが進行します。")
-    if st.button("Start"):
-        game.reset()
-        st.session_state.game_started = True
-        st.rerun()
-    st.stop()
+def reset_game(game: HighLowGame) -> None:
+    game.reset()
+    st.session_state.game_started = False
+    st.rerun()
 
-st.metric("所持チップ", f"{game.chips} 枚")
-
-last_result = st.session_state.last_result
-if last_result:
-    delta = last_result["delta"]
-    if delta > 0:
-        notify = st.success
-        delta_text = f"+{delta}"
-    elif delta < 0:
-        notify = st.error
-        delta_text = str(delta)
-    else:
-        notify = st.info
-        delta_text = "±0"
-
-    notify(
-        f"ラウンド{last_result['round']} 結果: {last_result['outcome'].upper()} "
-        f"(結果カード: {last_result['result_card']})\n"
-        f"チップ変動: {delta_text} → 現在: {last_result['chips_after']}枚"
-    )
-
-if game.is_finished:
-    st.success("全3ラウンド終了！")
-    st.write(f"最終所持チップ: {game.chips}枚")
-    if game.history:
-        st.dataframe(game.history, use_container_width=True)
-    if st.button("リセット"):
-        reset_game()
-    st.stop()
 
-if game.chips <= 0:
-    st.error("チップが残っていません。リセットしてください。")
-    if st.button("リセット", key="reset_no_chips"):
-        reset_game()
+@common.timed_fragment("highlow_leaderboard")
+def render_leaderboard(player: str) -> None:
+    common.render_leaderboard("highlow", player)
+
+
+def play() -> None:
+    """Play the submitted round, then rerun only what it changed."""
+
+    with use_game() as game:
+        try:
+            game.play_round(st.session_state.highlow_choice, int(st.session_state.highlow_bet))
+        except ValueError as exc:
+            st.session_state.highlow_error = str(exc)
+            common.rerun("highlow_round")
+        if game.is_finished or game.chips <= 0:
+            # The page switches to its end-of-game layout.
+            common.rerun()
+        common.rerun(*PLAY_FRAGMENTS)
+
+
+@common.timed_fragment("highlow_status")
+def render_status() -> None:
+    with use_game() as game:
+        st.metric("所持チップ", f"{game.chips} 枚")
+
+        # Read back from the history, so nothing outside the game refers to its deck.
+        last_row = game.history_store.last()
+        if last_row is None:
+            return
+        last_result = game.history_entry(last_row)
+        delta = last_result["delta"]
+        if delta > 0:
+            notify = st.success
+            delta_text = f"+{delta}"
+        elif delta < 0:
+            notify = st.error
+            delta_text = str(delta)
+        else:
+            notify = st.info
+            delta_text = "±0"
+
+        notify(
+            f"ラウンド{last_result['round']} 結果: {last_result['outcome'].upper()} "
+            f"(結果カード: {last_result['result_card']})\n"
+            f"チップ変動: {delta_text} → 現在: {last_result['chips_after']}枚"
+        )
+
+
+@common.timed_fragment("highlow_round")
+def render_round() -> None:
+    with use_game() as game:
+        if game.current_round is None:
+            return
+
+        if game.total_rounds is None:
+            st.subheader(f"ラウンド {game.round_number}")
+        else:
+            st.subheader(f"ラウンド {game.round_number} / {game.total_rounds}")
+        base_card = game.expose_base_card()
+        st.write(f"ベースカード: {base_card}")
+        remaining_deck = game.deck
+        remaining_cards = ", ".join(map(str, remaining_deck)) if remaining_deck else "なし"
+        st.write(f"残り札: {remaining_cards}")
+        if game.deck_size:
+            odds = game.odds(base_card)
+            st.caption(
+                f"High: {odds.high:.1%} / Low: {odds.low:.1%} / 引き分け: {odds.draw:.1%}"
+                f" ｜ おすすめ: {odds.recommended_choice}"
+                f" ｜ ケリー基準のベット: {odds.kelly_bet(game.chips)}枚"
+            )
+
+        max_bet = int(game.chips)
+        default_bet = min(10, max_bet) if max_bet > 0 else 1
+
+        with st.form("round_form", clear_on_submit=False):
+            st.number_input(
+                "ベットするチップ数",
+                min_value=1,
+                max_value=max(max_bet, 1),
+                value=default_bet,
+                step=1,
+                format="%d",
+                key="highlow_bet",
+            )
+            st.radio("HighかLowかを選んでください", ("High", "Low"), horizontal=True, key="highlow_choice")
+            st.form_submit_button("結果を見る", on_click=play)
+
+        error = st.session_state.pop("highlow_error", None)
+        if error:
+            st.error(error)
+
+
+@common.timed_fragment("highlow_history")
+def render_history() -> None:
+    with use_game() as game:
+        stats = game.history_store
+        if not stats.total_rounds:
+            return
+
+        st.divider()
+        st.write("これまでの結果")
+        st.caption(
+            f"勝率: {stats.win_rate:.1%} ｜ 通算収支: {stats.net:+d} ｜ 最長連勝: {stats.longest_win_streak}"
+        )
+        common.render_analytics(common.bankroll_analytics(game), OUTCOME_LABELS)
+        render_history_table(game)
+
+
+def render_history_table(game: HighLowGame) -> None:
+    """One page of the stored rounds, newest first, built from the history columns."""
+
+    stats = game.history_store
+    page_count = -(-len(stats) // HISTORY_PAGE_SIZE)
+    page = 1
+    if page_count > 1:
+        page = st.number_input(
+            "ページ（新しい順）",
+            min_value=1,
+            max_value=page_count,
+            value=1,
+            step=1,
+            key="highlow_history_page",
+        )
+        st.caption(f"{HISTORY_PAGE_SIZE}件ずつ表示 ｜ 全{page_count}ページ")
+    newest = stats.total_rounds - (int(page) - 1) * HISTORY_PAGE_SIZE
+    oldest = max(newest - HISTORY_PAGE_SIZE, stats.total_rounds - len(stats))
+    rows = []
+    for number in range(newest, oldest, -1):
+        entry = game.history_entry(stats.row(number))
+        # The remaining deck is O(deck) per row; the round panel already shows the current one.
+        del entry["remaining_deck"]
+        rows.append(entry)
+    st.dataframe(rows, use_container_width=True)
+
+
+def finish_page() -> None:
+    render_leaderboard(st.session_state.player_name)
+    common.render_debug_panel("highlow")
     st.stop()
 
-current_round = game.current_round
-if current_round is None:
-    st.stop()
 
-st.subheader(f"ラウンド {game.round_number} / {game.total_rounds}")
-base_card = game.expose_base_card()
-st.write(f"ベースカード: {base_card}")
-remaining_cards = ", ".join(map(str, game.deck)) if game.deck else "なし"
-st.write(f"残り札: {remaining_cards}")
-
-max_bet = int(game.chips)
-default_bet = min(10, max_bet) if max_bet > 0 else 1
-
-with st.form("round_form", clear_on_submit=False):
-    bet_value = st.number_input(
-        "ベットするチップ数",
-        min_value=1,
-        max_value=max(max_bet, 1),
-        value=default_bet,
-        step=1,
-        format="%d",
-    )
-    choice = st.radio("HighかLowかを選んでください", ("High", "Low"), horizontal=True)
-    submitted = st.form_submit_button("結果を見る")
-
-if submitted:
-    try:
-        result = game.play_round(choice, int(bet_value))
-    except ValueError as exc:
-        st.error(str(exc))
-    else:
-        st.session_state.last_result = result
-        st.rerun()
-
-if game.history:
-    st.divider()
-    st.write("これまでの結果")
-    st.dataframe(game.history, use_container_width=True)
-
-if st.button("リセット", key="reset_bottom"):
-    reset_game()
+def main(game: HighLowGame) -> None:
+    if not st.session_state.game_started:
+        st.write(f"開始前の所持チップ: {game.initial_chips}枚")
+        mode = st.radio("ゲームの種類", ("サンプルデータ", "ランダム生成"), horizontal=True)
+        if mode == "サンプルデータ":
+            st.info("Startボタンを押すとサンプルデータに従ってゲームが進行します。")
+            seed = None
+        else:
+            st.info("シードから山札を配ります。同じシードなら同じ展開になります。")
+            seed = int(st.number_input("シード", min_value=0, value=1, step=1, format="%d"))
+        if st.button("Start"):
+            if seed != st.session_state.highlow_seed:
+                common.session_store().discard(st.session_state.highlow_session_id)
+                st.session_state.highlow_seed = seed
+            else:
+                game.reset()
+            st.session_state.game_started = True
+            st.rerun()
+        finish_page()
+
+    render_status()
+
+    if game.is_finished:
+        st.success(f"全{game.round_number - 1}ラウンド終了！")
+        st.write(f"最終所持チップ: {game.chips}枚")
+        if game.history_store.total_rounds:
+            common.render_analytics(common.bankroll_analytics(game), OUTCOME_LABELS)
+            render_history_table(game)
+        if st.button("リセット"):
+            reset_game(game)
+        finish_page()
+
+    if game.chips <= 0:
+        st.error("チップが残っていません。リセットしてください。")
+        if st.button("リセット", key="reset_no_chips"):
+            reset_game(game)
+        finish_page()
+
+    if game.current_round is None:
+        finish_page()
+
+    render_round()
+    render_history()
+
+    if st.button("リセット", key="reset_bottom"):
+        reset_game(game)
+
+    finish_page()
+
+
+common.player_name()
+with use_game() as game:
+    main(game)
@@ -0,0 +1,85 @@
+import random
+
+import numpy as np
+import pytest
+
+from model.analytics import BankrollAnalytics
+from model.history_store import HistoryStore
+
+OUTCOMES = ("win", "lose", "push")
+RESULTS = {"win": 1, "lose": -1}
+
+
+def play(history, rng, rounds):
+    chips = history.chips
+    for _ in range(rounds):
+        outcome = rng.choice(OUTCOMES)
+        bet = rng.randint(1, 10)
+        delta = bet * RESULTS.get(outcome, 0)
+        chips += delta
+        history.append(outcome, bet, delta, chips)
+
+
+def assert_same_aggregates(capped, full):
+    assert capped.total_rounds == full.total_rounds
+    assert capped.net == full.net
+    assert capped.wins == full.wins
+    assert capped.peak_chips == full.peak_chips
+    assert capped.max_drawdown == full.max_drawdown
+    assert capped.win_rate_interval() == full.win_rate_interval()
+    assert capped.outcome_breakdown() == full.outcome_breakdown()
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_capped_columns_keep_the_latest_rounds(seed):
+    rng = random.Random(seed)
+    history = HistoryStore(OUTCOMES, RESULTS, capacity=500, initial_chips=100)
+    capped = BankrollAnalytics(history, max_rounds=50)
+    full = BankrollAnalytics(history, max_rounds=10_000)
+
+    for _ in range(60):
+        play(history, rng, rng.randint(0, 120))
+        capped.update()
+        full.update()
+
+        assert_same_aggregates(capped, full)
+        kept = len(capped)
+        assert min(len(full), 50) <= kept <= 100
+        assert all(len(column) <= 100 for column in capped._columns.values())
+        assert np.array_equal(capped.rounds, full.rounds[len(full) - kept :])
+        assert np.array_equal(capped.bankroll, full.bankroll[len(full) - kept :])
+        assert np.array_equal(capped.drawdown, full.drawdown[len(full) - kept :])
+
+
+def test_batch_larger_than_the_cap():
+    history = HistoryStore(OUTCOMES, RESULTS, capacity=1000, initial_chips=100)
+    analytics = BankrollAnalytics(history, max_rounds=50)
+    play(history, random.Random(0), 30)
+    analytics.update()
+    play(history, random.Random(1), 400)
+    analytics.update()
+
+    assert analytics.total_rounds == 430
+    assert len(analytics) == 50
+    assert list(analytics.rounds) == list(range(381, 431))
+    assert list(analytics.bankroll) == history.column("chips_after")[-50:]
+    rounds, chips, _ = analytics.curve(10)
+    assert rounds[-1] == 430 and chips[-1] == history.chips
+
+
+def test_reset_clears_the_columns():
+    history = HistoryStore(OUTCOMES, RESULTS, capacity=100, initial_chips=100)
+    analytics = BankrollAnalytics(history, max_rounds=20)
+    play(history, random.Random(2), 70)
+    analytics.update()
+    history.clear(100)
+    play(history, random.Random(3), 5)
+    analytics.update()
+
+    assert analytics.total_rounds == len(analytics) == 5
+    assert list(analytics.rounds) == [1, 2, 3, 4, 5]
+
+
+def test_rejects_invalid_cap():
+    with pytest.raises(ValueError):
+        BankrollAnalytics(HistoryStore(OUTCOMES, RESULTS), max_rounds=0)
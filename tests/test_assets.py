@@ -0,0 +1,58 @@
+import threading
+from pathlib import Path
+
+import pytest
+
+from model import assets
+
+pytestmark = pytest.mark.skipif(assets.Image is None, reason="needs Pillow")
+
+
+def test_concurrent_first_use_builds_each_variant_once(tmp_path):
+    barrier = threading.Barrier(6)
+    paths, errors = [], []
+
+    def visit():
+        barrier.wait()
+        try:
+            paths.append(assets.variant_path("High_and_Low_pic.png", 240, output_dir=tmp_path))
+        except Exception as exc:  # pragma: no cover - the failure being tested
+            errors.append(exc)
+
+    threads = [threading.Thread(target=visit) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(set(paths)) == 1 and paths[0].exists()
+    assert not [path for path in tmp_path.iterdir() if path.name.startswith(".")]
+    assert assets.clean(tmp_path) == []
+
+
+def test_variant_names_follow_the_content(tmp_path):
+    source = tmp_path / "picture.png"
+    assets.Image.new("RGB", (400, 200), "red").save(source)
+    first = assets.variant_name(source, 320, "webp")
+    assets.Image.new("RGB", (400, 200), "blue").save(source)
+    assert assets.variant_name(source, 320, "webp") != first
+
+
+def test_pick_width():
+    assert assets.pick_width(100) == 160
+    assert assets.pick_width(320) == 320
+    assert assets.pick_width(5000) == max(assets.WIDTHS)
+
+
+def test_clean_removes_stale_variants_only(tmp_path):
+    source = tmp_path / "picture.png"
+    assets.Image.new("RGB", (400, 200), "red").save(source)
+    output = tmp_path / "out"
+    manifest = assets.build([source], output)
+    stale = output / "picture-000000000000-w160.webp"
+    stale.write_bytes(b"old")
+    assert assets.clean(output) == [stale]
+    built = [name for entry in manifest.values() for names in entry.values() for name in names.values()]
+    assert all((output / name).exists() for name in built)
+    assert Path(output / assets.MANIFEST).exists()
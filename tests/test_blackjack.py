@@ -0,0 +1,170 @@
+import itertools
+import random
+
+import pytest
+
+from model.blackjack import CARDS, RANKS, BlackjackGame, Hand, hand_value
+from model.shoe import CARDS_PER_DECK, HI_LO_TAGS
+
+ACES = [card for card in CARDS if card.rank == "A"]
+
+
+def best_total(cards):
+    """Highest total of at most 21 over every way of counting the aces, else the lowest."""
+
+    hard = sum(card.base_value for card in cards if card.rank != "A")
+    aces = sum(1 for card in cards if card.rank == "A")
+    totals = {hard + sum(values) for values in itertools.product((1, 11), repeat=aces)}
+    playable = [total for total in totals if total <= 21]
+    return max(playable) if playable else min(totals)
+
+
+def assert_agrees(hand, cards):
+    assert list(hand) == cards
+    assert hand.total == hand_value(cards) == best_total(cards)
+    hard = sum(card.base_value for card in cards)
+    # Soft exactly when one ace is being counted as 11.
+    assert hand.is_soft == (hand_value(cards) == hard + 10)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_totals_agree_with_hand_value_after_every_append(seed):
+    rng = random.Random(seed)
+    for _ in range(200):
+        # Weighting aces up gives plenty of two-, three- and four-ace hands.
+        pool = CARDS + tuple(ACES) * rng.randint(0, 6)
+        hand, cards = Hand(), []
+        assert_agrees(hand, cards)
+        for _ in range(rng.randint(1, 10)):
+            card = rng.choice(pool)
+            hand.append(card)
+            cards.append(card)
+            assert_agrees(hand, cards)
+
+
+@pytest.mark.parametrize("count", range(1, 12))
+def test_all_ace_hands(count):
+    cards = [ACES[index % len(ACES)] for index in range(count)]
+    hand = Hand(cards)
+    assert_agrees(hand, cards)
+    assert hand.total == count + 10
+    assert hand.is_soft
+
+
+def test_constructor_matches_appends():
+    rng = random.Random(7)
+    cards = [rng.choice(CARDS) for _ in range(8)]
+    built = Hand(cards)
+    appended = Hand()
+    for card in cards:
+        appended.append(card)
+    assert (built.total, built.is_soft, list(built)) == (appended.total, appended.is_soft, list(appended))
+
+
+def upcard_policy(total, soft, upcard_value):
+    """Hits soft hands below 18, and hard hands below 17 against a 7 or better or below 13 otherwise."""
+
+    if soft:
+        return "hit" if total < 18 else "stand"
+    return "hit" if total < (17 if upcard_value >= 7 or upcard_value == 1 else 13) else "stand"
+
+
+def varying_bet(chips):
+    return max(1, min(chips, chips // 10 + 3))
+
+
+def play_public(game, rounds, policy, bet_policy):
+    for _ in range(rounds):
+        if game.chips <= 0:
+            return
+        game.start_round(bet_policy(game.chips))
+        upcard_value = game.dealer_upcard.base_value
+        while game.is_player_turn and policy(game.player_total, game.player_is_soft, upcard_value) == "hit":
+            game.hit()
+        if game.is_player_turn:
+            game.stand()
+        game.next_round()
+
+
+@pytest.mark.parametrize("continuous", [False, True])
+@pytest.mark.parametrize("decks", [1, 2, 6])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_run_rounds_matches_the_public_actions(seed, decks, continuous):
+    def new_game():
+        return BlackjackGame(
+            initial_chips=300, rng=random.Random(seed), decks=decks, continuous_shuffle=continuous
+        )
+
+    headless = new_game()
+    public = new_game()
+    summary = headless.run_rounds(400, upcard_policy, varying_bet, record_history=True)
+    play_public(public, 400, upcard_policy, varying_bet)
+
+    assert summary.rounds_played == public.history_store.total_rounds
+    assert summary.final_chips == headless.chips == public.chips
+    assert list(headless.history_store.rows()) == list(public.history_store.rows())
+    assert headless._shoe.snapshot() == public._shoe.snapshot()
+    assert headless._shoe.rank_counts == public._shoe.rank_counts
+    assert headless.running_count == public.running_count
+    assert headless._rng.getstate() == public._rng.getstate()
+
+    # Both keep dealing from the same shoe afterwards.
+    play_public(headless, 20, upcard_policy, varying_bet)
+    play_public(public, 20, upcard_policy, varying_bet)
+    assert list(headless.history_store.rows()) == list(public.history_store.rows())
+
+
+def test_hands_are_read_only():
+    game = BlackjackGame(rng=random.Random(5))
+    game.start_round(10)
+    cards = game.player_cards
+    assert isinstance(cards, tuple) and isinstance(game.dealer_cards, tuple)
+    assert not hasattr(cards, "append")
+    total = game.player_total
+    assert game.player_cards == cards and game.player_total == total
+
+
+def visible_hands(game):
+    dealer = game.dealer_cards[:1] if game.is_player_turn else game.dealer_cards
+    return game.player_cards, dealer
+
+
+def hi_lo(cards):
+    return sum(HI_LO_TAGS[RANKS.index(card.rank)] for card in cards)
+
+
+@pytest.mark.parametrize("decks", [1, 2, 6])
+def test_running_and_true_count_match_the_cards_seen(decks):
+    game = BlackjackGame(initial_chips=10_000, rng=random.Random(decks), decks=decks)
+    seen = []
+    game._shoe.on_shuffle = seen.clear
+    shuffles = 0
+
+    def check(counted=(0, 0)):
+        hands = visible_hands(game)
+        for hand, already in zip(hands, counted):
+            seen.extend(hand[already:])
+        assert game.running_count == hi_lo(seen)
+        # The hole card is unseen while hidden, even though it has been dealt.
+        unseen = game.cards_remaining + len(game.dealer_cards) - len(hands[1])
+        assert unseen == decks * CARDS_PER_DECK - len(seen)
+        assert game.true_count == pytest.approx(hi_lo(seen) * CARDS_PER_DECK / unseen)
+        return tuple(len(hand) for hand in hands)
+
+    for _ in range(decks * 40):
+        remaining = game.cards_remaining
+        game.start_round(10)
+        shuffles += game.cards_remaining > remaining
+        counted = check()
+        while game.is_player_turn and game.player_total < 15:
+            game.hit()
+            counted = check(counted)
+        if game.is_player_turn:
+            game.stand()
+        check(counted)
+        game.next_round()
+    assert shuffles >= 2
+
+    game.reset_shoe()
+    game.start_round(10)
+    assert game.running_count == hi_lo(card for hand in visible_hands(game) for card in hand)
@@ -0,0 +1,88 @@
+import random
+from typing import Dict, List
+
+import numpy as np
+import pytest
+
+from model import blackjack_sim
+from model.blackjack import OUTCOMES, BlackjackGame
+from model.blackjack_sim import OUTCOME_CODES, simulate_rounds
+
+
+class ReplayRandom(random.Random):
+    """RNG whose shuffles lay out the shoe in recorded orders, one per call."""
+
+    def __init__(self, orders: List[bytes]) -> None:
+        super().__init__(0)
+        self._orders = iter(orders)
+
+    def shuffle(self, cards) -> None:
+        # The engine deals from the front of its row, ``Shoe`` from the end.
+        cards[:] = next(self._orders)[::-1]
+
+
+def record_shuffles(monkeypatch) -> Dict[int, List[bytes]]:
+    """Capture every card order the engine shuffles, per table."""
+
+    orders: Dict[int, List[bytes]] = {}
+    shuffle = blackjack_sim._Shoes.shuffle
+
+    def recording(self, lanes: np.ndarray) -> None:
+        shuffle(self, lanes)
+        for lane in lanes:
+            orders.setdefault(int(lane), []).append(self.cards[lane].tobytes())
+
+    monkeypatch.setattr(blackjack_sim._Shoes, "shuffle", recording)
+    return orders
+
+
+def play_scalar(orders: List[bytes], rounds: int, bet: int, stand_on: int):
+    game = BlackjackGame(initial_chips=bet * rounds * 2, rng=ReplayRandom(orders))
+    outcomes, deltas = [], []
+    for _ in range(rounds):
+        chips = game.chips
+        game.start_round(bet)
+        while game.is_player_turn and game.player_total < stand_on:
+            game.hit()
+        if game.is_player_turn:
+            game.stand()
+        outcomes.append(OUTCOME_CODES[game.round_outcome])
+        deltas.append(game.chips - chips)
+        game.next_round()
+    return outcomes, deltas
+
+
+@pytest.mark.parametrize(
+    ("seed", "tables", "rounds", "stand_on"),
+    [(0, 1, 300, 17), (1, 8, 120, 17), (2, 5, 150, 12), (3, 4, 100, 21)],
+)
+def test_matches_blackjack_game(monkeypatch, seed, tables, rounds, stand_on):
+    orders = record_shuffles(monkeypatch)
+    result = simulate_rounds(rounds, tables, bet=3, stand_on=stand_on, seed=seed)
+
+    for table in range(tables):
+        outcomes, deltas = play_scalar(orders[table], rounds, bet=3, stand_on=stand_on)
+        assert result.outcomes[table].tolist() == outcomes
+        assert result.deltas[table].tolist() == deltas
+
+
+def test_covers_every_outcome():
+    result = simulate_rounds(2000, 4, seed=5)
+    counts = result.outcome_counts
+    assert set(counts) == set(OUTCOMES)
+    assert all(counts.values())
+    assert sum(counts.values()) == result.total_rounds == 8000
+
+
+def test_same_seed_same_result():
+    first = simulate_rounds(50, 3, seed=7)
+    second = simulate_rounds(50, 3, seed=7)
+    assert np.array_equal(first.outcomes, second.outcomes)
+    assert np.array_equal(first.deltas, second.deltas)
+
+
+@pytest.mark.parametrize("arguments", [{"rounds": 0}, {"tables": 0}, {"bet": 0}, {"stand_on": 22}])
+def test_rejects_invalid_arguments(arguments):
+    values = {"rounds": 10, "tables": 1, "bet": 1, "stand_on": 17, **arguments}
+    with pytest.raises(ValueError):
+        simulate_rounds(values.pop("rounds"), **values)
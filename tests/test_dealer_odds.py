@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from model.blackjack import DEALER_STAND_TOTAL, BlackjackGame
+from model.dealer_odds import DEALER_RESULTS, composition_key, dealer_final_distribution, dealer_odds
+
+
+def brute_force(total, has_ace, counts, refill):
+    """Dealer final-total probabilities by plain recursion over every draw."""
+
+    soft_total = total + 10 if has_ace and total + 10 <= 21 else total
+    if soft_total > 21:
+        return {"bust": 1.0}
+    if soft_total >= DEALER_STAND_TOTAL:
+        return {str(soft_total): 1.0}
+    if not any(counts):
+        counts = refill
+    result = dict.fromkeys(DEALER_RESULTS, 0.0)
+    remaining = sum(counts)
+    for index, count in enumerate(counts):
+        if count:
+            after = list(counts)
+            after[index] -= 1
+            branch = brute_force(total + index + 1, has_ace or index == 0, after, refill)
+            for outcome, probability in branch.items():
+                result[outcome] += count / remaining * probability
+    return result
+
+
+def player_turn_game(decks, seed):
+    rng = random.Random(seed)
+    while True:
+        game = BlackjackGame(decks=decks, rng=random.Random(rng.random()))
+        game.start_round(10)
+        if game.is_player_turn:
+            return game
+
+
+@pytest.mark.parametrize("decks", [16, 20, 64])
+def test_large_shoes(decks):
+    game = player_turn_game(decks, seed=decks)
+    assert max(game.fresh_shoe_composition) > 255
+
+    odds = dealer_odds(game)
+    assert set(odds) == set(DEALER_RESULTS)
+    assert sum(odds.values()) == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("upcard", [1, 6, 10])
+def test_matches_brute_force(upcard):
+    counts = (2, 1, 1, 0, 2, 1, 0, 1, 1, 3)
+    refill = (1, 1, 1, 1, 1, 1, 1, 1, 1, 4)
+    expected = dict.fromkeys(DEALER_RESULTS, 0.0)
+    for index, count in enumerate(counts):
+        after = list(counts)
+        after[index] -= 1
+        branch = brute_force(upcard + index + 1, 1 in (upcard, index + 1), after, refill) if count else {}
+        for outcome, probability in branch.items():
+            expected[outcome] += count / sum(counts) * probability
+
+    odds = dealer_final_distribution(upcard, counts, refill)
+    assert odds == pytest.approx(expected)
+
+
+def test_composition_key():
+    assert composition_key([255] * 10) != composition_key([511] * 10)
+    assert len(composition_key([4] * 9 + [16])) == 20
+    with pytest.raises(ValueError):
+        composition_key([0] * 9)
+    with pytest.raises(ValueError):
+        composition_key([0] * 9 + [70_000])
+    with pytest.raises(ValueError):
+        composition_key([0] * 9 + [-1])
@@ -0,0 +1,104 @@
+import random
+
+import pytest
+
+from model import event_log
+from model.blackjack import BlackjackGame
+from model.event_log import EventLog
+
+
+def stand_on_17(total, soft, upcard_value):
+    return "hit" if total < 17 else "stand"
+
+
+def flat_bet(chips):
+    return min(10, chips)
+
+
+def play_public(game, rounds):
+    for _ in range(rounds):
+        if game.is_bankrupt:
+            return
+        game.start_round(flat_bet(game.chips))
+        while game.is_player_turn and stand_on_17(game.player_total, game.player_is_soft, 0) == "hit":
+            game.hit()
+        if game.is_player_turn:
+            game.stand()
+        game.next_round()
+
+
+def round_trip(log):
+    return EventLog.from_bytes(log.to_bytes())
+
+
+@pytest.mark.parametrize("continuous", [False, True])
+@pytest.mark.parametrize("record_history", [False, True])
+def test_replay_matches_run_rounds(continuous, record_history):
+    game = BlackjackGame(
+        initial_chips=500, rng=random.Random(3), decks=2, record_events=True, continuous_shuffle=continuous
+    )
+    play_public(game, 5)
+    game.run_rounds(50, stand_on_17, flat_bet, record_history=record_history)
+    play_public(game, 3)
+    game.reset_shoe()
+    game.run_rounds(20, stand_on_17, flat_bet, record_history=record_history)
+
+    replayed = BlackjackGame.replay(round_trip(game.events))
+    assert replayed.snapshot() == game.snapshot()
+    assert replayed.history_store.total_rounds == game.history_store.total_rounds
+    assert replayed.last_record == game.last_record
+
+
+def test_replay_until_matches_the_game_at_that_point():
+    game = BlackjackGame(rng=random.Random(8), record_events=True)
+    play_public(game, 4)
+    midway = game.snapshot()
+    count = len(game.events)
+    play_public(game, 4)
+
+    assert BlackjackGame.replay(round_trip(game.events), until=count).snapshot() == midway
+
+
+def test_events_round_trip():
+    log = EventLog(initial_chips=100, decks=6, cut_card=52, continuous=True)
+    log.seed(2**64 - 1)
+    log.bet(300)
+    log.append(event_log.HIT)
+    log.append(event_log.STAND)
+    log.append(event_log.NEXT)
+    log.run(False)
+    log.append(event_log.RUN_END)
+
+    decoded = round_trip(log)
+    assert (decoded.initial_chips, decoded.decks, decoded.cut_card, decoded.continuous) == (100, 6, 52, True)
+    assert list(decoded) == list(log)
+    assert decoded.describe() == [
+        f"seed {2**64 - 1}",
+        "bet 300",
+        "hit",
+        "stand",
+        "next",
+        "run 0",
+        "run_end",
+    ]
+    assert len(decoded) == 7
+
+
+def test_rejects_bad_logs():
+    log = EventLog(100, 1, 0)
+    with pytest.raises(ValueError):
+        log.append(event_log.BET)
+    with pytest.raises(ValueError):
+        log.append(99)
+    with pytest.raises(ValueError):
+        log.bet(-1)
+    with pytest.raises(ValueError):
+        EventLog.from_bytes(b"BJE2")
+    with pytest.raises(ValueError):
+        EventLog.from_bytes(b"XXXX" + log.to_bytes()[4:])
+
+    log.bet(1000)
+    with pytest.raises(ValueError):
+        list(EventLog.from_bytes(log.to_bytes()[:-1]))
+    with pytest.raises(ValueError):
+        list(EventLog.from_bytes(log.to_bytes() + bytes([99])))
@@ -0,0 +1,299 @@
+import json
+import os
+from collections import Counter
+from functools import partial
+
+import pytest
+
+from model.High_and_Low import (
+    SNAPSHOT_KIND,
+    STANDARD_DECK,
+    DeckSnapshot,
+    GeneratedRounds,
+    HighLowGame,
+    HighLowOdds,
+    RecordedRound,
+    clear_definition_cache,
+    load_definition,
+    load_sample_game,
+)
+from model.sessions import SessionStore
+from model.snapshot import SnapshotReader
+
+
+def write_jsonl(path, rounds, total_rounds=None, deck=tuple(range(1, 14))):
+    header = {"initial_chips": 100, "deck": list(deck)}
+    if total_rounds is not None:
+        header["total_rounds"] = total_rounds
+    lines = [json.dumps(header)] + [line if isinstance(line, str) else json.dumps(line) for line in rounds]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def test_sample_game_replays_recorded_chips():
+    game = load_sample_game()
+    for choice, bet, chips in (("High", 10, 110), ("Low", 20, 90), ("Low", 30, 120)):
+        game.play_round(choice, bet)
+        assert game.chips == chips
+    assert game.is_finished
+    assert game.history_store.total_rounds == 3
+
+
+@pytest.mark.parametrize("total_rounds", [None, 2])
+def test_malformed_next_round_leaves_current_round_unplayed(tmp_path, total_rounds):
+    path = write_jsonl(
+        tmp_path / "game.jsonl",
+        [{"round": 1, "base_card": 5, "result_card": 9}, '{"round": 2, "base_card": "x"}'],
+        total_rounds,
+    )
+    game = HighLowGame.from_jsonl(path)
+    recorded = []
+    game.on_round = lambda *args: recorded.append(args)
+
+    for _ in range(2):
+        with pytest.raises(ValueError, match="line 3"):
+            game.play_round("High", 10)
+        assert game.chips == 100
+        assert game.history_store.total_rounds == 0
+        assert game.round_number == 1
+        assert game.current_round.round == 1
+        assert game.deck_size == 12  # only the exposed base card is gone
+        assert recorded == []
+
+    game.reset()
+    assert game.deck_size == 13
+
+
+def test_unavailable_result_card_leaves_chips_untouched(tmp_path):
+    path = write_jsonl(
+        tmp_path / "game.jsonl",
+        [{"round": 1, "base_card": 5, "result_card": 9}, {"round": 2, "base_card": 1, "result_card": 2}],
+        deck=(1, 2, 5, 7),
+    )
+    game = HighLowGame.from_jsonl(path)
+    with pytest.raises(ValueError, match="Card 9 is not available"):
+        game.play_round("High", 10)
+    assert game.chips == 100
+    assert game.history_store.total_rounds == 0
+
+
+def test_missing_rounds_are_reported_before_the_last_played_round(tmp_path):
+    path = write_jsonl(tmp_path / "game.jsonl", [{"round": 1, "base_card": 5, "result_card": 9}], total_rounds=2)
+    game = HighLowGame.from_jsonl(path)
+    with pytest.raises(ValueError, match="Expected 2 rounds"):
+        game.play_round("High", 10)
+    assert game.chips == 100
+
+
+def test_snapshot_round_trip_after_a_played_round():
+    game = HighLowGame.generated(seed=4, rounds=10)
+    game.play_round("High", 10)
+    game.expose_base_card()
+    restored = HighLowGame.generated(seed=4, rounds=10)
+    restored.restore(game.snapshot())
+    assert restored.chips == game.chips
+    assert restored.current_round == game.current_round
+    assert restored.deck == game.deck
+    for _ in range(9):
+        assert restored.play_round("Low", 1) == game.play_round("Low", 1)
+    assert restored.is_finished and game.is_finished
+
+
+def test_history_keeps_remaining_deck_lazy():
+    game = HighLowGame.generated(seed=3, decks=2, rounds=20)
+    for _ in range(20):
+        game.play_round("High", 1)
+    history = game.history
+    assert len(history) == 20
+    assert all(isinstance(entry["remaining_deck"], DeckSnapshot) for entry in history)
+    assert len(history[0]["remaining_deck"]) == 104 - 2
+    assert history[-1]["remaining_deck"] == game.deck
+    cards = sorted(history[4]["remaining_deck"].to_list() + game._removed[:10])
+    assert cards == sorted(STANDARD_DECK * 2)
+
+
+def test_snapshot_stores_two_bytes_per_removed_card():
+    deck = (100_000, -3, 7, 7, 12, 2**40)
+    rounds = [
+        RecordedRound.from_payload({"round": 1, "base_card": 2**40, "result_card": -3}),
+        RecordedRound.from_payload({"round": 2, "base_card": 7, "result_card": 100_000}),
+    ]
+    game = HighLowGame(100, rounds, deck)
+    game.play_round("Low", 5)
+    game.play_round("High", 5)
+    reader = SnapshotReader(game.snapshot(), SNAPSHOT_KIND)
+    for _ in range(4):
+        reader.read_int()
+    assert len(reader.read_blob()) == 2 * 4
+
+    restored = HighLowGame(100, rounds, deck)
+    restored.restore(game.snapshot())
+    assert sorted(restored.deck) == [7, 12]
+    assert restored.is_finished
+
+
+def brute_force_odds(deck, base_card):
+    higher = sum(1 for card in deck if card > base_card)
+    lower = sum(1 for card in deck if card < base_card)
+    return higher / len(deck), lower / len(deck), (len(deck) - higher - lower) / len(deck)
+
+
+def assert_odds(game, base_card):
+    odds = game.odds(base_card)
+    assert (odds.high, odds.low, odds.draw) == pytest.approx(brute_force_odds(game.deck, base_card))
+
+
+@pytest.mark.parametrize("seed, decks", [(0, 1), (1, 1), (2, 3)])
+def test_odds_match_a_count_of_the_remaining_deck(seed, decks):
+    game = HighLowGame.generated(seed=seed, decks=decks)
+    while not game.is_finished:
+        base_card = game.expose_base_card()
+        odds = game.odds()
+        assert odds == game.odds(base_card)
+        # Also values missing from the deck, below, between and above its ranks.
+        for value in range(-1, 16):
+            assert_odds(game, value)
+        game.play_round(odds.recommended_choice, 1)
+
+
+def test_odds_with_sparse_card_values():
+    deck = (100_000, -3, 7, 7, 12, 2**40)
+    rounds = [
+        RecordedRound.from_payload({"round": 1, "base_card": 7, "result_card": -3}),
+        RecordedRound.from_payload({"round": 2, "base_card": 12, "result_card": 7}),
+    ]
+    game = HighLowGame(100, rounds, deck)
+    game.expose_base_card()
+    for value in (-4, -3, 0, 7, 8, 12, 100_000, 2**40, 2**41):
+        assert_odds(game, value)
+    assert game.odds() == HighLowOdds(high=3 / 5, low=1 / 5, draw=1 / 5)
+
+
+@pytest.mark.parametrize(
+    "odds, fraction",
+    [
+        (HighLowOdds(high=0.5, low=0.5, draw=0.0), 0.0),
+        (HighLowOdds(high=0.25, low=0.25, draw=0.5), 0.0),
+        (HighLowOdds(high=0.0, low=0.0, draw=1.0), 0.0),
+        (HighLowOdds(high=0.6, low=0.2, draw=0.2), 0.5),
+        (HighLowOdds(high=0.1, low=0.3, draw=0.6), 0.5),
+        (HighLowOdds(high=1.0, low=0.0, draw=0.0), 1.0),
+    ],
+)
+def test_kelly_fraction(odds, fraction):
+    assert odds.kelly_fraction == pytest.approx(fraction)
+    assert odds.kelly_bet(101) == int(101 * fraction)
+    assert odds.kelly_bet(0) == 0
+    assert odds.recommended_choice == ("Low" if odds.low > odds.high else "High")
+
+
+def round_cards(rounds):
+    return [(round_def.round, round_def.base_card, round_def.result_card) for round_def in rounds]
+
+
+def play_out(game):
+    results = []
+    while not game.is_finished:
+        game.expose_base_card()
+        results.append(game.play_round(game.odds().recommended_choice, 1))
+    return results
+
+
+@pytest.mark.parametrize("decks", [1, 4])
+def test_generated_rounds_depend_only_on_the_seed(decks):
+    deck = STANDARD_DECK * decks
+    rounds = round_cards(GeneratedRounds(deck, seed=11))
+    assert round_cards(GeneratedRounds(deck, seed=11)) == rounds
+    assert round_cards(GeneratedRounds(deck, seed=12)) != rounds
+    assert len(rounds) == len(deck) // 2
+    dealt = Counter(card for _, base_card, result_card in rounds for card in (base_card, result_card))
+    assert dealt == Counter(deck)
+
+    generated = GeneratedRounds(deck, seed=11, rounds=5)
+    assert round_cards(generated) == round_cards(generated) == rounds[:5]
+    with pytest.raises(ValueError):
+        GeneratedRounds(deck, seed=11, rounds=len(deck) // 2 + 1)
+
+
+def test_generated_games_replay_the_same_rounds():
+    game = HighLowGame.generated(seed=5, decks=2)
+    results = play_out(game)
+    assert len(results) == game.total_rounds == 52
+    assert play_out(HighLowGame.generated(seed=5, decks=2)) == results
+    game.reset()
+    assert play_out(game) == results
+    assert play_out(HighLowGame.generated(seed=6, decks=2)) != results
+
+
+@pytest.mark.parametrize("played, exposed", [(0, False), (0, True), (7, False), (7, True), (26, False)])
+def test_generated_game_survives_snapshot_and_restore(played, exposed):
+    game = HighLowGame.generated(seed=9, decks=1, history_limit=8)
+    for _ in range(played):
+        game.play_round("High", 2)
+    if exposed:
+        game.expose_base_card()
+
+    restored = HighLowGame.generated(seed=9, decks=1, history_limit=8)
+    restored.restore(game.snapshot())
+    assert restored.snapshot() == game.snapshot()
+    assert (restored.chips, restored.round_number, restored.deck) == (game.chips, game.round_number, game.deck)
+    assert restored.history == game.history
+    assert play_out(restored) == play_out(game)
+    assert restored.snapshot() == game.snapshot()
+
+
+def test_generated_game_survives_a_spill(tmp_path):
+    store = SessionStore(tmp_path, max_live=1)
+    factory = partial(HighLowGame.generated, 3, decks=2)
+    game = store.get("a", factory)
+    for _ in range(10):
+        game.play_round("Low", 1)
+    store.get("b", factory)
+    assert store.is_spilled("a")
+
+    restored = store.get("a", factory)
+    assert restored is not game
+    assert play_out(restored) == play_out(game)
+
+
+def write_definition(path, chips, rounds=1):
+    payload = {
+        "initial_chips": chips,
+        "deck": list(range(1, 14)),
+        "rounds": [{"round": number, "base_card": 5, "result_card": 9} for number in range(1, rounds + 1)],
+    }
+    path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+def set_mtime(path, mtime_ns):
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_load_definition_is_cached_until_the_file_changes(tmp_path):
+    clear_definition_cache()
+    path = tmp_path / "game.json"
+    write_definition(path, 100)
+    set_mtime(path, 1_000_000_000_000_000_000)
+    first = load_definition(path)
+    assert first.initial_chips == 100
+    assert load_definition(path) is first
+    assert load_definition(str(tmp_path / "." / "game.json")) is first
+
+    # Same size and mtime: the stale cached object is still returned.
+    write_definition(path, 200)
+    set_mtime(path, 1_000_000_000_000_000_000)
+    assert load_definition(path) is first
+
+    set_mtime(path, 1_000_000_001_000_000_000)
+    second = load_definition(path)
+    assert second is not first and second.initial_chips == 200
+    assert load_definition(path) is second
+
+    # A rewrite that keeps the mtime but changes the size is noticed too.
+    write_definition(path, 200, rounds=2)
+    set_mtime(path, 1_000_000_001_000_000_000)
+    third = load_definition(path)
+    assert third.total_rounds == 2
+
+    clear_definition_cache()
+    assert load_definition(path) is not third
@@ -0,0 +1,120 @@
+import pytest
+
+from model.history_store import HistoryStore
+
+OUTCOMES = ("win", "lose", "push")
+RESULTS = {"win": 1, "lose": -1}
+
+
+def filled(count, capacity=4, initial_chips=100):
+    """A store after ``count`` rounds: round n bets n, odd ones win, even ones lose, every fifth pushes."""
+
+    store = HistoryStore(
+        OUTCOMES, RESULTS, columns=("cards",), capacity=capacity, initial_chips=initial_chips
+    )
+    chips = initial_chips
+    for number in range(1, count + 1):
+        outcome = "push" if number % 5 == 0 else ("win" if number % 2 else "lose")
+        delta = {"win": number, "lose": -number, "push": 0}[outcome]
+        chips += delta
+        store.append(outcome, number, delta, chips, cards=number + 1)
+    return store
+
+
+def expected_row(number):
+    outcome = "push" if number % 5 == 0 else ("win" if number % 2 else "lose")
+    return {"number": number, "outcome": outcome, "bet": number, "cards": number + 1}
+
+
+def subset(row):
+    return {name: row[name] for name in ("number", "outcome", "bet", "cards")}
+
+
+@pytest.mark.parametrize("count", [0, 1, 3, 4, 5, 8, 11])
+def test_wraparound_keeps_the_newest_rows(count):
+    store = filled(count)
+    kept = list(range(max(1, count - 3), count + 1)) if count else []
+    assert len(store) == len(kept)
+    assert [subset(row) for row in store.rows()] == [expected_row(number) for number in kept]
+    assert [row["number"] for row in store.rows(limit=2, newest_first=True)] == kept[::-1][:2]
+    assert store.column("bet") == kept
+    for size in range(6):
+        assert list(store.tail("bet", size)) == kept[len(kept) - min(size, len(kept)) :]
+    if count:
+        assert subset(store.last()) == expected_row(count)
+    else:
+        assert store.last() is None
+
+
+def test_row_after_eviction():
+    store = filled(11)
+    assert subset(store.row(8)) == expected_row(8)
+    assert subset(store.row(11)) == expected_row(11)
+    for number in (0, 1, 7, 12):
+        with pytest.raises(IndexError):
+            store.row(number)
+
+
+def test_aggregates_cover_evicted_rounds():
+    store = filled(11)
+    # Bets 1..11: wins on odd, losses on even, pushes on 5 and 10.
+    assert store.total_rounds == 11
+    assert (store.wins, store.losses, store.pushes) == (5, 4, 2)
+    assert store.outcome_counts == {"win": 5, "lose": 4, "push": 2}
+    assert store.win_rate == pytest.approx(5 / 11)
+    assert store.net == 1 - 2 + 3 - 4 + 0 - 6 + 7 - 8 + 9 + 0 + 11
+    assert store.chips == 100 + store.net
+    assert store.longest_win_streak == 1 and store.longest_loss_streak == 1
+    assert store.current_streak == 1
+    assert store.peak_chips == 111
+    # From 102 after round 3 down to 91 after round 8.
+    assert store.max_drawdown == 11
+
+
+def test_generation_changes_on_clear_and_restore():
+    store = filled(3)
+    generation = store.generation
+    store.append("win", 1, 1, 200)
+    assert store.generation == generation
+    store.clear(50)
+    assert store.generation == generation + 1
+    assert (len(store), store.total_rounds, store.chips, store.initial_chips) == (0, 0, 50, 50)
+    assert list(store.rows()) == []
+
+    store.restore(filled(6).snapshot())
+    assert store.generation == generation + 2
+
+
+@pytest.mark.parametrize("count", [0, 3, 4, 9])
+def test_snapshot_round_trip(count):
+    original = filled(count)
+    restored = HistoryStore(OUTCOMES, RESULTS, columns=("cards",), capacity=4)
+    restored.restore(original.snapshot())
+    for name in HistoryStore._COUNTERS:
+        assert getattr(restored, name) == getattr(original, name)
+    assert restored.outcome_counts == original.outcome_counts
+    assert list(restored.rows()) == list(original.rows())
+    assert list(restored.tail("cards", 4)) == list(original.tail("cards", 4))
+
+    # Both carry on wrapping in step.
+    for store in (original, restored):
+        store.append("lose", 2, -2, store.chips - 2, cards=3)
+    assert list(restored.rows()) == list(original.rows())
+    assert restored.snapshot() == original.snapshot()
+
+
+def test_restore_rejects_other_layouts():
+    data = filled(3).snapshot()
+    with pytest.raises(ValueError):
+        HistoryStore(OUTCOMES, RESULTS, columns=("cards",), capacity=8).restore(data)
+    with pytest.raises(ValueError):
+        HistoryStore(("win", "lose"), RESULTS, columns=("cards",), capacity=4).restore(data)
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        HistoryStore(OUTCOMES, RESULTS, capacity=0)
+    with pytest.raises(ValueError):
+        HistoryStore(("win",), RESULTS)
+    with pytest.raises(ValueError):
+        filled(0).append("draw", 1, 0, 100)
@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+from model import instrumentation
+from model.blackjack import BlackjackGame, Hand
+from model.High_and_Low import HighLowGame
+
+
+@pytest.fixture(autouse=True)
+def disabled():
+    """Leave the process-wide switch off, whatever the environment started it as."""
+
+    instrumentation.disable()
+    instrumentation.reset()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def class_attributes():
+    return {
+        (owner, attribute): owner.__dict__[attribute]
+        for owner, attribute, _ in instrumentation._targets
+    }
+
+
+def test_disable_restores_the_original_methods():
+    originals = class_attributes()
+    assert (Hand, "total") in originals and (HighLowGame, "play_round") in originals
+
+    instrumentation.enable()
+    patched = class_attributes()
+    assert all(patched[key] is not original for key, original in originals.items())
+    # Enabling twice must not wrap the wrappers.
+    instrumentation.enable()
+    assert class_attributes() == patched
+
+    instrumentation.disable()
+    assert all(class_attributes()[key] is original for key, original in originals.items())
+    assert isinstance(Hand.__dict__["total"], property)
+
+
+def test_metrics_are_recorded_only_while_enabled():
+    game = BlackjackGame(rng=random.Random(1))
+    game.start_round(10)
+    assert instrumentation.report() == []
+
+    instrumentation.enable()
+    if game.is_player_turn:
+        game.stand()
+    game.next_round()
+    game.start_round(10)
+    names = {row["name"] for row in instrumentation.report()}
+    assert {"blackjack.start_round", "shoe.draw"} <= names
+
+    instrumentation.disable()
+    calls = {row["name"]: row["calls"] for row in instrumentation.report()}
+    game.reset()
+    game.start_round(10)
+    instrumentation.record("page.test.render", 1.0)
+    assert {row["name"]: row["calls"] for row in instrumentation.report()} == calls
+
+
+def test_instrumenting_while_enabled_patches_at_once(monkeypatch):
+    monkeypatch.setattr(instrumentation, "_targets", list(instrumentation._targets))
+
+    class Counter:
+        def step(self):
+            return 1
+
+    original = Counter.__dict__["step"]
+    instrumentation.enable()
+    instrumentation.instrument(Counter, "step", "test.step")
+    assert Counter().step() == 1
+    assert Counter.__dict__["step"] is not original
+    instrumentation.disable()
+    assert Counter.__dict__["step"] is original
@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("streamlit")
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from model.results_store import ResultsStore  # noqa: E402
+from model.sessions import SessionStore  # noqa: E402
+from ui import common  # noqa: E402
+
+PAGES = Path(__file__).resolve().parent.parent / "pages"
+
+
+@pytest.fixture(autouse=True)
+def stores(tmp_path, monkeypatch):
+    """Keep the pages' games and results out of the shared .cache directory."""
+
+    sessions = SessionStore(tmp_path / "sessions")
+    results = ResultsStore(tmp_path / "results.sqlite3")
+    monkeypatch.setattr(common, "session_store", lambda: sessions)
+    monkeypatch.setattr(common, "results_store", lambda: results)
+    yield
+    results.close()
+
+
+def click(at, label):
+    next(button for button in at.button if button.label == label).click()
+    return at.run()
+
+
+def metrics(at):
+    return {metric.label: metric.value for metric in at.metric}
+
+
+def test_blackjack_shoe_reset_updates_the_stats():
+    at = AppTest.from_file(str(PAGES / "Blackjack.py"), default_timeout=30).run()
+    at.get("form_submit_button")[0].click()
+    at.run()
+    while any(button.label == "スタンド" for button in at.button):
+        click(at, "スタンド")
+    assert metrics(at)["山札の残り枚数"] != "0"
+
+    # Only the rerun fragments are in the tree afterwards, so the stats must be among them.
+    click(at, "山札をリセット")
+    assert not at.exception
+    assert metrics(at)["山札の残り枚数"] == "0"
+
+
+def test_instrumentation_switch_needs_the_operator_flag(monkeypatch):
+    monkeypatch.delenv(common.DEBUG_PANEL_ENV, raising=False)
+    at = AppTest.from_file(str(PAGES / "High_and_Low.py"), default_timeout=30).run()
+    assert not at.exception
+    assert [toggle.label for toggle in at.sidebar.toggle] == []
+
+    monkeypatch.setenv(common.DEBUG_PANEL_ENV, "1")
+    at.run()
+    assert [toggle.label for toggle in at.sidebar.toggle] == ["計測モード"]
@@ -0,0 +1,33 @@
+import pytest
+
+from model.parallel import DEFAULT_SHARDS, simulate_parallel
+
+
+# Module-level so that worker processes can unpickle them.
+def stand_on_17(total, soft, upcard_value):
+    return "hit" if total < 17 else "stand"
+
+
+def flat_bet(chips):
+    return min(10, chips)
+
+
+def test_default_shards_do_not_depend_on_workers():
+    serial = simulate_parallel(400, stand_on_17, flat_bet, master_seed=5, max_workers=1)
+    pooled = simulate_parallel(400, stand_on_17, flat_bet, master_seed=5, max_workers=3)
+
+    assert len(serial.shards) == DEFAULT_SHARDS
+    assert serial == pooled
+    assert serial.rounds_played == 400
+
+
+def test_shards_split_the_rounds():
+    result = simulate_parallel(10, stand_on_17, flat_bet, master_seed=1, shards=4, max_workers=1)
+    assert [shard.rounds_played for shard in result.shards] == [3, 3, 2, 2]
+    assert sum(result.outcome_counts.values()) == 10
+
+
+@pytest.mark.parametrize("rounds, shards", [(-1, 2), (10, 0)])
+def test_rejects_invalid_arguments(rounds, shards):
+    with pytest.raises(ValueError):
+        simulate_parallel(rounds, stand_on_17, flat_bet, shards=shards, max_workers=1)
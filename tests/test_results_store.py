@@ -0,0 +1,160 @@
+import sqlite3
+import time
+
+import pytest
+
+from model import results_store
+from model.results_store import ResultsStore
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    """Sizes of the batches the writer thread commits."""
+
+    sizes = []
+    write = results_store._write
+
+    def counting(connection, batch):
+        sizes.append(len(batch))
+        write(connection, batch)
+
+    monkeypatch.setattr(results_store, "_write", counting)
+    return sizes
+
+
+def stored_rounds(path):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute("SELECT COUNT(*) FROM rounds").fetchone()[0]
+    finally:
+        connection.close()
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_full_batches_are_written_without_a_flush(tmp_path, batches):
+    store = ResultsStore(tmp_path / "results.sqlite3", batch_size=3, flush_interval=60)
+    try:
+        for chips in (11, 12):
+            store.record("alice", "highlow", "win", 1, 1, chips)
+        time.sleep(0.1)
+        assert batches == [] and store.pending == 2
+
+        store.record("alice", "highlow", "lose", 1, -1, 11)
+        assert wait_for(lambda: batches == [3])
+        assert wait_for(lambda: store.player_stats("alice", "highlow") is not None)
+        assert store.pending == 0
+    finally:
+        store.close()
+
+
+def test_flush_writes_a_partial_batch(tmp_path, batches):
+    store = ResultsStore(tmp_path / "results.sqlite3", batch_size=100, flush_interval=60)
+    try:
+        record = store.recorder("bob", "blackjack")
+        for _ in range(5):
+            record("push", 10, 0, 100)
+        store.flush()
+        assert batches == [5]
+        assert len(store.recent_rounds("bob", "blackjack")) == 5
+    finally:
+        store.close()
+
+
+def test_totals_add_up_across_batches(tmp_path):
+    store = ResultsStore(tmp_path / "results.sqlite3", batch_size=2, flush_interval=60)
+    try:
+        rounds = [
+            ("player_blackjack", 10, 15, 115),
+            ("dealer_win", 20, -20, 95),
+            ("push", 5, 0, 95),
+            ("dealer_bust", 30, 30, 125),
+            ("player_bust", 10, -10, 115),
+        ]
+        for outcome, bet, net, chips in rounds:
+            store.record("carol", "blackjack", outcome, bet, net, chips)
+            store.flush()
+        store.record("carol", "highlow", "draw", 3, 0, 50)
+        store.flush()
+
+        stats = store.player_stats("carol", "blackjack")
+        counted = ("rounds", "wins", "losses", "pushes", "net", "wagered", "best_chips")
+        assert {name: stats[name] for name in counted} == {
+            "rounds": 5,
+            "wins": 2,
+            "losses": 2,
+            "pushes": 1,
+            "net": 15,
+            "wagered": 75,
+            "best_chips": 125,
+        }
+        assert stats["win_rate"] == pytest.approx(0.4)
+        assert store.player_stats("carol", "highlow")["rounds"] == 1
+        assert [row["outcome"] for row in store.recent_rounds("carol", "blackjack", limit=2)] == [
+            "player_bust",
+            "dealer_bust",
+        ]
+    finally:
+        store.close()
+
+
+def test_leaderboard_and_rank(tmp_path):
+    store = ResultsStore(tmp_path / "results.sqlite3")
+    try:
+        for player, net, chips in (("a", 30, 130), ("b", -10, 200), ("c", 50, 150), ("d", 0, 100)):
+            store.record(player, "highlow", "win" if net > 0 else "lose", 10, net, chips)
+        store.record("z", "blackjack", "player_win", 10, 999, 1099)
+        store.flush()
+
+        assert [row["player"] for row in store.leaderboard("highlow")] == ["c", "a", "d", "b"]
+        assert [row["player"] for row in store.leaderboard("highlow", limit=2)] == ["c", "a"]
+        by_chips = store.leaderboard("highlow", order="best_chips")
+        assert [row["player"] for row in by_chips] == ["b", "c", "a", "d"]
+        assert [store.player_stats(player, "highlow")["rank"] for player in "abcd"] == [2, 4, 1, 3]
+        assert store.player_stats("z", "highlow") is None
+        with pytest.raises(ValueError):
+            store.leaderboard("highlow", order="wins")
+    finally:
+        store.close()
+
+
+def test_close_drains_the_queue(tmp_path, batches):
+    path = tmp_path / "results.sqlite3"
+    store = ResultsStore(path, batch_size=1000, flush_interval=60)
+    for number in range(250):
+        store.record("dave", "highlow", "win", 1, 1, 100 + number)
+    store.close()
+    assert sum(batches) == 250
+    assert stored_rounds(path) == 250
+    with pytest.raises(RuntimeError):
+        store.record("dave", "highlow", "win", 1, 1, 100)
+    store.close()
+
+    reopened = ResultsStore(path)
+    try:
+        assert reopened.player_stats("dave", "highlow")["best_chips"] == 349
+    finally:
+        reopened.close()
+
+
+def test_record_validates_rows(tmp_path):
+    store = ResultsStore(tmp_path / "results.sqlite3")
+    try:
+        with pytest.raises(ValueError):
+            store.record("erin", "poker", "win", 1, 1, 1)
+        with pytest.raises(ValueError):
+            store.record("erin", "highlow", "player_win", 1, 1, 1)
+        with pytest.raises(ValueError):
+            store.record("", "highlow", "win", 1, 1, 1)
+        with pytest.raises(ValueError):
+            store.recorder("erin", "poker")
+        assert store.pending == 0
+    finally:
+        store.close()
@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+import zlib
+
+from model import sessions
+from model.blackjack import BlackjackGame
+from model.sessions import SessionStore
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def play(game: BlackjackGame) -> None:
+    game.start_round(5)
+    if game.is_player_turn:
+        game.stand()
+    game.next_round()
+
+
+def test_spilled_game_is_rehydrated(tmp_path):
+    store = SessionStore(tmp_path, max_live=1)
+    game = store.get("a", BlackjackGame)
+    play(game)
+    store.get("b", BlackjackGame)
+    assert store.is_spilled("a")
+    restored = store.get("a", BlackjackGame)
+    assert restored is not game
+    assert restored.chips == game.chips
+    assert restored.history_store.total_rounds == 1
+
+
+def test_checked_out_game_is_not_evicted(tmp_path):
+    store = SessionStore(tmp_path, max_live=1)
+    with store.checkout("a", BlackjackGame) as game:
+        with store.checkout("b", BlackjackGame):
+            pass
+        assert not store.is_spilled("a")
+        # Changes made after other sessions came and went must not be lost.
+        play(game)
+        play(game)
+    assert store.live_count == 1
+    assert store.is_spilled("b")
+
+    store.get("b", BlackjackGame)
+    assert store.is_spilled("a")
+    restored = store.get("a", BlackjackGame)
+    assert restored.chips == game.chips
+    assert restored.history_store.total_rounds == 2
+
+
+def test_nested_checkouts_release_on_the_last_exit(tmp_path):
+    store = SessionStore(tmp_path, max_live=1)
+    with store.checkout("a", BlackjackGame) as game:
+        with store.checkout("a", BlackjackGame) as same:
+            assert same is game
+        store.get("b", BlackjackGame)
+        assert not store.is_spilled("a")
+    store.get("c", BlackjackGame)
+    assert store.is_spilled("a")
+
+
+def test_spill_idle_skips_checked_out_games(tmp_path):
+    clock = Clock()
+    store = SessionStore(tmp_path, idle_seconds=10, clock=clock)
+    store.get("a", BlackjackGame)
+    with store.checkout("b", BlackjackGame):
+        clock.now = 60
+        assert store.spill_idle() == 1
+        assert store.is_spilled("a")
+        assert not store.is_spilled("b")
+    assert store.spill_idle() == 1
+    assert store.is_spilled("b")
+
+
+def test_discard_while_checked_out(tmp_path):
+    store = SessionStore(tmp_path, max_live=1)
+    with store.checkout("a", BlackjackGame) as game:
+        play(game)
+        store.discard("a")
+    assert store.live_count == 0
+    assert store.get("a", BlackjackGame).history_store.total_rounds == 0
+
+
+def test_spill_writes_do_not_hold_the_lock(tmp_path, monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+
+    compress = zlib.compress
+
+    def slow_compress(data):
+        # Only the first spill, that of "a", stalls.
+        if not started.is_set():
+            started.set()
+            release.wait(5)
+        return compress(data)
+
+    monkeypatch.setattr(sessions.zlib, "compress", slow_compress)
+    store = SessionStore(tmp_path, max_live=1)
+    play(store.get("a", BlackjackGame))
+    writer = threading.Thread(target=store.get, args=("b", BlackjackGame))
+    writer.start()
+    try:
+        assert started.wait(5)
+        # "a" is being written: other sessions go ahead, and "a" comes back from memory.
+        begun = time.monotonic()
+        with store.checkout("c", BlackjackGame):
+            pass
+        restored = store.get("a", BlackjackGame)
+        assert time.monotonic() - begun < 1
+        assert restored.history_store.total_rounds == 1
+    finally:
+        release.set()
+        writer.join()
+    # The outdated write was dropped rather than moved into place.
+    assert not (tmp_path / "a.snapshot").exists()
+    assert [path.name for path in tmp_path.iterdir() if path.name.endswith(".tmp")] == []
+
+
+def test_spill_idle_removes_abandoned_snapshots(tmp_path):
+    clock = Clock()
+    store = SessionStore(tmp_path, max_live=1, idle_seconds=10, clock=clock, max_spill_age=3600)
+    play(store.get("old", BlackjackGame))
+    store.get("new", BlackjackGame)
+    store.get("other", BlackjackGame)
+    stale = time.time() - 7200
+    os.utime(tmp_path / "old.snapshot", (stale, stale))
+
+    assert store.spill_idle() == 0
+    assert not store.is_spilled("old")
+    assert store.is_spilled("new")
+
+    # Cleanup runs at most once per idle_seconds.
+    os.utime(tmp_path / "new.snapshot", (stale, stale))
+    store.spill_idle()
+    assert store.is_spilled("new")
+    clock.now = 10
+    store.spill_idle()
+    assert not store.is_spilled("new")
+
+
+def test_unreadable_snapshot_starts_over(tmp_path):
+    store = SessionStore(tmp_path)
+    (tmp_path / "a.snapshot").write_bytes(zlib.compress(b"not a snapshot"))
+    game = store.get("a", BlackjackGame)
+    assert game.history_store.total_rounds == 0
+    assert not store.is_spilled("a")
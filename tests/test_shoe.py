@@ -0,0 +1,168 @@
+import math
+import random
+
+import pytest
+
+from model.shoe import CARDS_PER_DECK, HI_LO_TAGS, RANKS_PER_SUIT, ContinuousShoe, Shoe
+
+ROUNDS = 10_000
+CARDS_PER_ROUND = 5
+# Largest |z| accepted over all the cells of one comparison. With a few hundred
+# cells the chance that an unbiased shoe exceeds it is well below 1e-3.
+Z_TOLERANCE = 4.5
+
+
+def continuous_rounds(decks, seed):
+    shoe = ContinuousShoe(decks, rng=random.Random(seed))
+    for _ in range(ROUNDS):
+        yield [shoe.draw() for _ in range(CARDS_PER_ROUND)]
+        shoe.collect()
+
+
+def shuffled_rounds(decks, seed):
+    shoe = Shoe(decks, rng=random.Random(seed))
+    for _ in range(ROUNDS):
+        shoe.shuffle()
+        yield [shoe.draw() for _ in range(CARDS_PER_ROUND)]
+
+
+def position_counts(rounds):
+    counts = [[0] * CARDS_PER_DECK for _ in range(CARDS_PER_ROUND)]
+    for codes in rounds:
+        for position, code in enumerate(codes):
+            counts[position][code] += 1
+    return counts
+
+
+def two_sample_z(hits_a, hits_b, trials):
+    """z-score of the difference between two proportions out of ``trials`` each."""
+
+    pooled = (hits_a + hits_b) / (2 * trials)
+    spread = math.sqrt(2 * pooled * (1 - pooled) / trials)
+    return (hits_a - hits_b) / trials / spread
+
+
+@pytest.mark.parametrize("decks, seed", [(1, 11), (6, 13)])
+def test_draw_positions_match_uniform_shuffle(decks, seed):
+    continuous = position_counts(continuous_rounds(decks, seed))
+    shuffled = position_counts(shuffled_rounds(decks, seed + 100))
+
+    for position in range(CARDS_PER_ROUND):
+        for code in range(CARDS_PER_DECK):
+            z = two_sample_z(continuous[position][code], shuffled[position][code], ROUNDS)
+            assert abs(z) < Z_TOLERANCE, (position, code, z)
+
+
+@pytest.mark.parametrize("decks, seed", [(1, 21), (6, 22)])
+def test_round_statistics_match_uniform_shuffle(decks, seed):
+    """Dependence within a round: repeated ranks and the Hi-Lo count of the round."""
+
+    def statistics(rounds):
+        pairs = 0
+        counts = []
+        for codes in rounds:
+            ranks = [code % RANKS_PER_SUIT for code in codes]
+            pairs += len(ranks) != len(set(ranks))
+            counts.append(sum(HI_LO_TAGS[rank] for rank in ranks))
+        return pairs, counts
+
+    pairs_continuous, counts_continuous = statistics(continuous_rounds(decks, seed))
+    pairs_shuffled, counts_shuffled = statistics(shuffled_rounds(decks, seed + 100))
+
+    assert abs(two_sample_z(pairs_continuous, pairs_shuffled, ROUNDS)) < Z_TOLERANCE
+
+    mean_continuous = sum(counts_continuous) / ROUNDS
+    mean_shuffled = sum(counts_shuffled) / ROUNDS
+    variance = sum((count - mean_shuffled) ** 2 for count in counts_shuffled) / (ROUNDS - 1)
+    z = (mean_continuous - mean_shuffled) / math.sqrt(2 * variance / ROUNDS)
+    assert abs(z) < Z_TOLERANCE
+
+
+@pytest.mark.parametrize("decks, seed", [(1, 31), (2, 32)])
+def test_consecutive_rounds_match_uniform_shuffle(decks, seed):
+    """Cards put back by ``collect`` come out again as often as after a fresh shuffle."""
+
+    def repeats(rounds):
+        # hits[i][j]: rounds whose i-th card is the previous round's j-th card.
+        hits = [[0] * CARDS_PER_ROUND for _ in range(CARDS_PER_ROUND)]
+        previous = None
+        for codes in rounds:
+            if previous is not None:
+                for i, code in enumerate(codes):
+                    for j, earlier in enumerate(previous):
+                        hits[i][j] += code == earlier
+            previous = codes
+        return hits
+
+    continuous = repeats(continuous_rounds(decks, seed))
+    shuffled = repeats(shuffled_rounds(decks, seed + 100))
+    for i in range(CARDS_PER_ROUND):
+        for j in range(CARDS_PER_ROUND):
+            z = two_sample_z(continuous[i][j], shuffled[i][j], ROUNDS - 1)
+            assert abs(z) < Z_TOLERANCE, (i, j, z)
+
+
+def test_collect_returns_every_card():
+    rng = random.Random(4)
+    shoe = ContinuousShoe(2, rng=random.Random(3))
+    full = shoe.rank_counts
+    for _ in range(50):
+        for _ in range(rng.randint(1, 20)):
+            shoe.draw()
+        shoe.collect()
+        assert shoe.rank_counts == full
+        assert shoe.remaining == shoe.size
+        assert shoe.running_count == 0
+        assert sorted(shoe.remaining_codes()) == sorted(bytes(range(CARDS_PER_DECK)) * 2)
+
+
+def hi_lo(codes):
+    return sum(HI_LO_TAGS[code % RANKS_PER_SUIT] for code in codes)
+
+
+@pytest.mark.parametrize("decks", [1, 3])
+def test_running_count_follows_the_dealt_cards(decks):
+    shoe = Shoe(decks, rng=random.Random(decks))
+    dealt = []
+    # Runs through two and a half shoes, so the count restarts at each reshuffle.
+    for _ in range(shoe.size * 5 // 2):
+        if shoe.remaining == 0:
+            dealt = []
+        dealt.append(shoe.draw())
+        assert shoe.running_count == hi_lo(dealt)
+        assert shoe.remaining == shoe.size - len(dealt)
+    # Hi-Lo is balanced: a fully dealt shoe counts to zero.
+    assert hi_lo(bytes(range(CARDS_PER_DECK))) == 0
+
+
+def test_running_count_after_discard_restore_and_shuffle():
+    shoe = Shoe(2, rng=random.Random(6))
+    dealt = [shoe.draw() for _ in range(40)]
+    count = shoe.running_count
+    assert count == hi_lo(dealt)
+
+    restored = Shoe(2)
+    restored.restore(shoe.snapshot())
+    assert restored.running_count == count
+    assert restored.rank_counts == shoe.rank_counts
+
+    shoe.discard()
+    assert (shoe.remaining, shoe.running_count) == (0, 0)
+    restored.shuffle()
+    assert restored.running_count == 0
+    assert restored.rank_counts == (8,) * RANKS_PER_SUIT
+
+
+def test_continuous_running_count_restarts_on_collect():
+    shoe = ContinuousShoe(2, rng=random.Random(9))
+    for round_size in (4, 7, 3):
+        dealt = [shoe.draw() for _ in range(round_size)]
+        assert shoe.running_count == hi_lo(dealt)
+        shoe.collect()
+        assert shoe.running_count == 0
+    dealt = [shoe.draw() for _ in range(5)]
+    restored = ContinuousShoe(2)
+    restored.restore(shoe.snapshot())
+    assert restored.running_count == shoe.running_count == hi_lo(dealt)
+    shoe.discard()
+    assert shoe.running_count == 0
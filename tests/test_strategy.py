@@ -0,0 +1,108 @@
+import json
+import random
+
+import pytest
+
+from model import strategy
+from model.blackjack import BlackjackGame
+from model.strategy import StrategyRules, StrategyTable, load_table, recommend
+
+UPCARDS = (2, 3, 4, 5, 6, 7, 8, 9, 10, 1)
+# Hit/stand basic strategy for an infinite shoe, dealer standing on soft 17,
+# one character per upcard in UPCARDS order.
+HARD_CHART = {
+    11: "HHHHHHHHHH",
+    12: "HHSSSHHHHH",
+    13: "SSSSSHHHHH",
+    16: "SSSSSHHHHH",
+    17: "SSSSSSSSSS",
+}
+SOFT_CHART = {
+    17: "HHHHHHHHHH",
+    18: "SSSSSSSHHH",
+    19: "SSSSSSSSSS",
+}
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    strategy._load_table.cache_clear()
+    yield
+    strategy._load_table.cache_clear()
+
+
+@pytest.fixture(scope="module")
+def table():
+    return StrategyTable.compute(StrategyRules())
+
+
+@pytest.mark.parametrize("soft, chart", [(False, HARD_CHART), (True, SOFT_CHART)])
+def test_table_matches_basic_strategy(table, soft, chart):
+    for total, row in chart.items():
+        actions = "".join(table.action(total, soft, upcard)[0].upper() for upcard in UPCARDS)
+        assert actions == row, (total, soft)
+
+
+def test_table_values(table):
+    # Hard 16 against a ten is the closest call of the chart.
+    stand_ev, hit_ev = table.expected_values(16, False, 10)
+    assert stand_ev == pytest.approx(-0.5404, abs=1e-4)
+    assert hit_ev == pytest.approx(-0.5398, abs=1e-4)
+    # Standing on 21 never loses; standing below 17 only wins when the dealer busts.
+    for upcard in UPCARDS:
+        assert table.expected_values(21, False, upcard)[0] > 0
+        low_stand_ev = table.expected_values(4, False, upcard)[0]
+        assert low_stand_ev == pytest.approx(table.expected_values(16, False, upcard)[0])
+    with pytest.raises(ValueError):
+        table.expected_values(3, False, 10)
+
+
+def test_rules_change_the_table_and_its_cache_key():
+    hits_soft_17 = StrategyRules(dealer_stand_total=18)
+    assert hits_soft_17.cache_key != StrategyRules().cache_key
+    assert StrategyRules(dealer_peek=False).cache_key != StrategyRules().cache_key
+    changed = StrategyTable.compute(hits_soft_17).expected_values(17, False, 10)
+    assert changed != StrategyTable.compute(StrategyRules()).expected_values(17, False, 10)
+    with pytest.raises(ValueError):
+        StrategyRules(dealer_stand_total=16)
+
+
+def test_tables_are_loaded_from_the_cache_dir(tmp_path, monkeypatch):
+    rules = StrategyRules()
+    computed = load_table(rules, cache_dir=tmp_path)
+    cache_path = tmp_path / f"strategy_{rules.cache_key}.json"
+    assert json.loads(cache_path.read_text(encoding="utf-8")) == computed.to_payload()
+
+    def no_compute(rules):
+        raise AssertionError("the table should come from the cache file")
+
+    strategy._load_table.cache_clear()
+    monkeypatch.setattr(StrategyTable, "compute", no_compute)
+    loaded = load_table(rules, cache_dir=tmp_path)
+    assert loaded.to_payload() == computed.to_payload()
+    # The in-process cache returns the same object without reading the file again.
+    cache_path.unlink()
+    assert load_table(rules, cache_dir=tmp_path) is loaded
+
+
+def test_unreadable_cache_file_is_recomputed(tmp_path):
+    rules = StrategyRules()
+    cache_path = tmp_path / f"strategy_{rules.cache_key}.json"
+    cache_path.write_text(json.dumps({"format": 0, "cells": []}), encoding="utf-8")
+    table = load_table(rules, cache_dir=tmp_path)
+    assert table.action(16, False, 10) == "hit"
+    assert json.loads(cache_path.read_text(encoding="utf-8")) == table.to_payload()
+
+
+def test_recommend(tmp_path):
+    table = load_table(cache_dir=tmp_path)
+    game = BlackjackGame(rng=random.Random(2))
+    with pytest.raises(RuntimeError):
+        recommend(game, table)
+    while True:
+        game.start_round(1)
+        if game.is_player_turn:
+            break
+        game.next_round()
+    expected = table.action(game.player_total, game.player_is_soft, game.dealer_upcard.base_value)
+    assert recommend(game, table) == expected
@@ -0,0 +1,120 @@
+import asyncio
+import json
+
+import pytest
+
+from model.table_server import TableServer, percentile
+
+
+async def exchange(port, lines):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"".join(lines))
+    await writer.drain()
+    # A reply that never comes fails the test instead of hanging it.
+    replies = [(await asyncio.wait_for(reader.readline(), 5)).decode("utf-8").rstrip("\n") for _ in lines]
+    writer.close()
+    await writer.wait_closed()
+    return replies
+
+
+async def converse(server, lines):
+    """Sends every line at once over one connection and returns the decoded replies."""
+
+    port = await server.start()
+    try:
+        return await exchange(port, lines)
+    finally:
+        await server.close()
+
+
+async def converse_concurrently(server, clients):
+    """One connection per client, all sending at once; one reply list per client."""
+
+    port = await server.start()
+    try:
+        return await asyncio.gather(*(exchange(port, lines) for lines in clients))
+    finally:
+        await server.close()
+
+
+def payload(reply):
+    status, _, body = reply.partition(" ")
+    assert status == "OK", reply
+    return json.loads(body)
+
+
+def test_protocol():
+    server = TableServer(highlow_decks=1)
+    replies = asyncio.run(
+        converse(
+            server,
+            [
+                b"OPEN blackjack 1\n",
+                b"OPEN highlow 2\n",
+                b"1 BET 10\n",
+                b"2 PLAY High 5\n",
+                b"2 STATE\n",
+                b"1 CLOSE\n",
+                b"1 STATE\n",
+                b"OPEN poker\n",
+                b"\n",
+            ],
+        )
+    )
+    assert payload(replies[0])["table"] == 1
+    assert payload(replies[1])["table"] == 2
+    assert payload(replies[2])["state"] != "betting"
+    assert payload(replies[3])["round"] == payload(replies[4])["round"]
+    assert payload(replies[5]) == {"table": 1, "closed": True}
+    assert replies[6] == "ERR Unknown table 1"
+    assert replies[7].startswith("ERR ")
+    assert replies[8] == "ERR Empty command"
+
+
+def test_undecodable_line_gets_an_error_reply():
+    replies = asyncio.run(converse(TableServer(), [b"\xff\xfe OPEN\n", b"OPEN blackjack\n"]))
+    assert replies[0].startswith("ERR ")
+    assert payload(replies[1])["table"] == 1
+
+
+def test_commands_of_one_tick_share_a_batch():
+    server = TableServer()
+    clients = [[b"OPEN blackjack %d\n" % seed, b"STATS\n"] for seed in range(20)]
+    replies = asyncio.run(converse_concurrently(server, clients))
+    tables = sorted(payload(first)["table"] for first, _ in replies)
+    assert tables == list(range(1, 21))
+    assert server.actions == 40
+    assert server.batches < 20
+    assert server.largest_batch > 1
+
+
+def test_unexpected_errors_do_not_strand_the_batch(monkeypatch):
+    server = TableServer()
+    execute = server.execute
+
+    def failing(line):
+        if line == "STATS":
+            raise KeyError("boom")
+        return execute(line)
+
+    monkeypatch.setattr(server, "execute", failing)
+    replies = asyncio.run(converse(server, [b"OPEN blackjack\n", b"STATS\n", b"1 STATE\n"]))
+    assert payload(replies[0])["table"] == 1
+    assert replies[1].startswith("ERR KeyError")
+    assert payload(replies[2])["table"] == 1
+
+
+@pytest.mark.parametrize(
+    "percent, expected",
+    [(0, 1.0), (10, 1.0), (11, 2.0), (50, 5.0), (51, 6.0), (99, 10.0), (100, 10.0)],
+)
+def test_percentile_is_nearest_rank(percent, expected):
+    assert percentile([float(value) for value in range(1, 11)], percent) == expected
+
+
+def test_percentile_edge_cases():
+    assert percentile([], 50) == 0.0
+    assert percentile([3.0], 99) == 3.0
+    # Nearest rank rounds up: the 99th percentile of 150 samples is the 149th.
+    ordered = [float(value) for value in range(150)]
+    assert percentile(ordered, 99) == 148.0
@@ -0,0 +1,223 @@
+"""Streamlit helpers shared by the game pages.
+
+The stores are cached per process, so every page and session shares one
+``SessionStore`` and one ``ResultsStore`` (a single SQLite writer thread).
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid
+import weakref
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, Mapping
+
+import streamlit as st
+
+from model import instrumentation
+from model.analytics import BankrollAnalytics
+from model.results_store import ResultsStore
+from model.sessions import SessionStore, SnapshotGame
+
+LEADERBOARD_SIZE = 10
+CHART_POINTS = 500
+DEBUG_FRAGMENT = "debug_panel"
+# Instrumentation patches the model classes for the whole process, so only an
+# operator may switch it: the sidebar toggle appears only when this is set.
+DEBUG_PANEL_ENV = "CARD_GAMES_DEBUG_PANEL"
+
+# Page-side views built from a game, such as its analytics. They live only as
+# long as the game object, so spilling a game frees them too; session_state
+# would keep them, and through them the game's history, alive.
+_derived: "weakref.WeakKeyDictionary[Any, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+_derived_lock = threading.Lock()
+
+
+@st.cache_resource
+def session_store() -> SessionStore:
+    return SessionStore()
+
+
+@st.cache_resource
+def results_store() -> ResultsStore:
+    return ResultsStore()
+
+
+@contextmanager
+def checkout_game(session_id: str, factory: Callable[[], SnapshotGame]) -> Iterator[SnapshotGame]:
+    """The session's game, kept out of the spill until the block exits.
+
+    Another session's rerun may spill idle games at any time, so every read or
+    change of the game has to happen inside this block.
+    """
+
+    store = session_store()
+    store.spill_idle()
+    with store.checkout(session_id, factory) as game:
+        yield game
+
+
+def player_name() -> str:
+    """Name the rounds are recorded under, shared by every page of the session."""
+
+    if "player_name" not in st.session_state:
+        st.session_state.player_name = f"ゲスト{uuid.uuid4().hex[:6]}"
+    name = st.sidebar.text_input("プレイヤー名", value=st.session_state.player_name, max_chars=32)
+    if name.strip():
+        st.session_state.player_name = name.strip()
+    return st.session_state.player_name
+
+
+# ----------------------------------------------------------------------
+def derived_state(game) -> Dict[str, Any]:
+    """Cache of views derived from ``game``, dropped together with the game.
+
+    Values must not refer back to the game, or it would never be freed.
+    """
+
+    with _derived_lock:
+        state = _derived.get(game)
+        if state is None:
+            state = _derived[game] = {}
+        return state
+
+
+def bankroll_analytics(game) -> BankrollAnalytics:
+    """Analytics of the game's history, brought up to date with the new rounds only."""
+
+    state = derived_state(game)
+    analytics = state.get("analytics")
+    if analytics is None or analytics.history is not game.history_store:
+        analytics = state["analytics"] = BankrollAnalytics(game.history_store)
+    analytics.update()
+    return analytics
+
+
+def render_analytics(analytics: BankrollAnalytics, outcome_labels: Mapping[str, str]) -> None:
+    low, high = analytics.win_rate_interval()
+    col_drawdown, col_interval = st.columns(2)
+    col_drawdown.metric("最大ドローダウン", f"{analytics.max_drawdown}")
+    col_interval.metric("勝率の95%信頼区間", f"{low:.1%} 〜 {high:.1%}")
+    rounds, chips, peaks = analytics.curve(CHART_POINTS)
+    st.line_chart({"ラウンド": rounds, "チップ": chips, "最高値": peaks}, x="ラウンド")
+    breakdown = analytics.outcome_breakdown()
+    st.bar_chart(
+        {
+            "結果": [outcome_labels[outcome] for outcome in breakdown],
+            "ラウンド数": [entry["rounds"] for entry in breakdown.values()],
+        },
+        x="結果",
+        y="ラウンド数",
+    )
+
+
+def render_leaderboard(game: str, player: str) -> None:
+    """Top players of ``game`` across every session, with ``player``'s own rank."""
+
+    store = results_store()
+    leaders = store.leaderboard(game, limit=LEADERBOARD_SIZE)
+    if not leaders:
+        return
+
+    st.divider()
+    st.subheader("ランキング（全プレイヤー）")
+    mine = store.player_stats(player, game)
+    if mine:
+        st.caption(
+            f"{player}: {mine['rank']}位 ｜ 通算{mine['rounds']}ラウンド"
+            f" ｜ 勝率: {mine['win_rate']:.1%} ｜ 通算収支: {mine['net']:+d}"
+        )
+    st.table(
+        [
+            {
+                "順位": rank,
+                "プレイヤー": entry["player"],
+                "通算収支": entry["net"],
+                "ラウンド数": entry["rounds"],
+                "勝率": f"{entry['win_rate']:.1%}",
+            }
+            for rank, entry in enumerate(leaders, start=1)
+        ]
+    )
+    st.caption("結果は数秒以内にランキングへ反映されます。")
+
+
+# ----------------------------------------------------------------------
+# Render timing. A full run is timed from ``start_render`` at the top of the
+# page, a fragment rerun from the callback that asked for it; either way the
+# debug panel runs last and records the elapsed time.
+def start_render() -> None:
+    st.session_state.setdefault("render_started", time.perf_counter())
+
+
+def rerun(*fragments: str) -> None:
+    """``st.rerun`` from a callback: the whole page, or only ``fragments``.
+
+    With instrumentation on, the debug panel is rerun after the fragments so
+    that the click is timed end to end.
+    """
+
+    if instrumentation.is_enabled():
+        st.session_state.render_started = time.perf_counter()
+        if fragments:
+            fragments += (DEBUG_FRAGMENT,)
+    st.rerun(fragments or "app")
+
+
+def timed_fragment(key: str) -> Callable[[Callable[..., None]], Callable[..., None]]:
+    """``st.fragment(key=key)`` that records each run as ``page.<key>.render``."""
+
+    def decorate(function: Callable[..., None]) -> Callable[..., None]:
+        @wraps(function)
+        def timed(*args: Any, **kwargs: Any) -> None:
+            if not instrumentation.is_enabled():
+                return function(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                function(*args, **kwargs)
+            finally:
+                instrumentation.record(f"page.{key}.render", time.perf_counter() - started)
+
+        return st.fragment(timed, key=key)
+
+    return decorate
+
+
+@st.fragment(key=DEBUG_FRAGMENT)
+def render_debug_panel(page: str) -> None:
+    """Model instrumentation results with the last render time.
+
+    The switch and the reset button are shown only when ``DEBUG_PANEL_ENV`` is
+    set; otherwise the panel just reports while instrumentation is on.
+    """
+
+    started = st.session_state.pop("render_started", None)
+    operator = bool(os.environ.get(DEBUG_PANEL_ENV))
+    enabled = instrumentation.is_enabled()
+    if operator:
+        enabled = st.sidebar.toggle("計測モード", value=enabled)
+        if enabled != instrumentation.is_enabled():
+            (instrumentation.enable if enabled else instrumentation.disable)()
+    if not enabled:
+        return
+
+    if started is not None:
+        elapsed = time.perf_counter() - started
+        instrumentation.record(f"page.{page}.render", elapsed)
+        st.session_state.render_elapsed = elapsed
+    if "render_elapsed" in st.session_state:
+        st.sidebar.metric("直近の描画時間", f"{st.session_state.render_elapsed * 1000:.1f} ms")
+    st.sidebar.caption("計測はアプリ全体で共有されます。")
+    st.sidebar.dataframe(instrumentation.report(), use_container_width=True)
+    st.sidebar.download_button(
+        "計測結果をJSONで保存",
+        instrumentation.to_json(),
+        file_name="instrumentation.json",
+        mime="application/json",
+    )
+    if operator and st.sidebar.button("計測値をリセット"):
+        instrumentation.reset()
+        st.rerun()